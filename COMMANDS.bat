@@ -74,7 +74,7 @@ REM Run Flask locally
 python app.py
 
 REM OR test with gunicorn (same as Render will use)
-gunicorn --workers 2 --worker-class sync --timeout 60 app:app
+gunicorn
 
 
 REM ============================================================
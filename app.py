@@ -1,44 +1,74 @@
 # eventhive/app.py
 
-from flask import Flask
-from config import Config
-from models.models import db
-from flask_migrate import Migrate
+import os
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
 from flask_login import LoginManager
-
-# Create and configure the app
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Initialize database and migration engine
-db.init_app(app)
-migrate = Migrate(app, db)
+from config import Config
+from models.models import db, User
 
 # Initialize Flask-Login
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = 'auth.login' # Redirect to login page if user is not authenticated
 
 # This function is required by Flask-Login to load a user
-from models.models import User
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-# Import and register blueprints
-from routes.events import events_bp
-from routes.auth import auth_bp
-from routes.dashboard import dashboard_bp
-# from routes.dashboard import dashboard_bp # We'll create these later
-from routes.qr import qr_bp             
-
-app.register_blueprint(events_bp)
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(dashboard_bp)
-# app.register_blueprint(dashboard_bp, url_prefix='/dashboard')
-app.register_blueprint(qr_bp, url_prefix='/qr')
-
-@app.cli.command("create-admin")
+    from utils.user_cache import load_cached_user
+    return load_cached_user(int(user_id))
+
+
+def create_app(config_class=Config):
+    """
+    Creates and configures the app. Modules that only some requests need, such
+    as the QR encoder and the form classes, are imported when first used.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+
+    # Compiled templates are cached on disk for the next process to start
+    from utils.template_cache import init_template_cache
+    init_template_cache(app)
+
+    # Initialize database and Flask-Login
+    db.init_app(app)
+    login_manager.init_app(app)
+
+    # Flask-Migrate imports all of Alembic; only the `flask` command needs it
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # Import and register blueprints
+    from routes.events import events_bp
+    from routes.auth import auth_bp
+    from routes.dashboard import dashboard_bp
+    from routes.qr import qr_bp
+    from routes.metrics import metrics_bp
+
+    app.register_blueprint(events_bp)
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(qr_bp, url_prefix='/qr')
+    app.register_blueprint(metrics_bp)
+
+    # Time SQL, template rendering and QR encoding per request (Server-Timing, /metrics)
+    from utils.metrics import init_metrics
+    init_metrics(app)
+
+    # Optionally flag queries repeated within one request (N+1 patterns)
+    from utils.nplusone import init_nplusone
+    init_nplusone(app)
+
+    for command in (create_admin, rebuild_event_stats, qr_pregen, purge_deleted_events_command,
+                    import_data, warmup):
+        app.cli.add_command(command)
+
+    return app
+
+@click.command("create-admin")
+@with_appcontext
 def create_admin():
     """Creates a new admin user."""
     import getpass
@@ -56,7 +86,155 @@ def create_admin():
     db.session.add(admin)
     db.session.commit()
     print(f"Admin user {username} created successfully!")
+
+
+@click.command("rebuild-event-stats")
+@with_appcontext
+def rebuild_event_stats():
+    """Recomputes every event's registration and attendance counters."""
+    from models.models import EventStats
+    EventStats.rebuild()
+    db.session.commit()
+    print(f"Rebuilt counters for {EventStats.query.count()} events.")
+
+
+@click.command("qr-pregen")
+@click.option('--event', 'event_id', type=int, required=True, help='ID of the event to render codes for.')
+@click.option('--chunk-size', default=500, show_default=True, help='Registrations fetched per batch.')
+@click.option('--processes', type=int, default=None, help='Encoder processes (defaults to the CPU count).')
+@click.option('--zip', 'zip_path', type=click.Path(dir_okay=False), default=None,
+              help='Also pack every code of the event into this zip file for printing.')
+@with_appcontext
+def qr_pregen(event_id, chunk_size, processes, zip_path):
+    """Renders every attendee's QR code for an event ahead of time."""
+    import multiprocessing
+    import time
+    import zipfile
+    from models.models import Event, registrations
+    from utils.qr_utils import qr_payload, qr_digest, qr_cache_path, render_qr_png, write_cache_file
+
+    event = db.session.get(Event, event_id)
+    if event is None:
+        print(f"Error: Event {event_id} does not exist.")
+        return
+
+    # Stream the registrations instead of loading the whole attendee list
+    user_ids = db.session.execute(
+        db.select(registrations.c.user_id)
+        .where(registrations.c.event_id == event.id)
+        .order_by(registrations.c.user_id)
+        .execution_options(yield_per=chunk_size)
+    ).scalars()
+
+    archive = zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) if zip_path else None
+    rendered = skipped = 0
+    started = time.perf_counter()
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for chunk in user_ids.partitions(chunk_size):
+                jobs = [(user_id, qr_payload(user_id, event.id)) for user_id in chunk]
+                paths = [qr_cache_path(qr_digest(data)) for _, data in jobs]
+                missing = [(data, path) for (_, data), path in zip(jobs, paths) if not os.path.exists(path)]
+                skipped += len(jobs) - len(missing)
+
+                # Fan the CPU-bound encoding out over the pool; files are written here
+                pngs = pool.imap(render_qr_png, [data for data, _ in missing], chunksize=16)
+                for (_, path), png in zip(missing, pngs):
+                    write_cache_file(path, png)
+                    rendered += 1
+
+                if archive:
+                    for (user_id, _), path in zip(jobs, paths):
+                        archive.write(path, f"event{event.id}_user{user_id}.png")
+
+                elapsed = time.perf_counter() - started
+                print(f"  {rendered + skipped} codes ({rendered} rendered, {skipped} already cached) "
+                      f"- {rendered / elapsed if elapsed else 0:.1f} codes/sec")
+    finally:
+        if archive:
+            archive.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {rendered} rendered, {skipped} skipped in {elapsed:.2f}s "
+          f"({rendered / elapsed if elapsed else 0:.1f} codes/sec).")
+    if zip_path:
+        print(f"Wrote {rendered + skipped} codes to {zip_path}.")
+
+
+@click.command("purge-deleted-events")
+@click.option('--chunk-size', default=None, type=int, help='Rows deleted per transaction (defaults to EVENT_PURGE_CHUNK_SIZE).')
+@with_appcontext
+def purge_deleted_events_command(chunk_size):
+    """Deletes the rows of every soft-deleted event, in chunks."""
+    import time
+    from utils.purge import purge_deleted_events
+    started = time.perf_counter()
+    event_ids = purge_deleted_events(chunk_size or current_app.config['EVENT_PURGE_CHUNK_SIZE'], current_app.config['EVENT_PURGE_PAUSE'])
+    print(f"Purged {len(event_ids)} deleted events in {time.perf_counter() - started:.2f}s.")
+
+
+@click.command("import")
+@click.argument('kind', type=click.Choice(['users', 'events', 'registrations']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format (guessed from the file extension by default).')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows validated and written per transaction.')
+@click.option('--processes', type=int, default=None, help='Password hashing processes (defaults to the CPU count).')
+@click.option('--dry-run', is_flag=True, help='Validate every row and report errors without writing anything.')
+@click.option('--errors-file', type=click.Path(dir_okay=False), default=None,
+              help='Write every rejected row, with its line number and reason, to this JSONL file.')
+@click.option('--max-errors', default=20, show_default=True, help='Rejected rows to print.')
+@with_appcontext
+def import_data(kind, path, fmt, batch_size, processes, dry_run, errors_file, max_errors):
+    """Bulk-imports users, events or registrations from a CSV or JSONL file.
+
+    \b
+    users:         username, email, password (or password_hash), role (Student or Organizer)
+    events:        title, description, location, event_date (ISO 8601), organizer, capacity
+    registrations: user (username or email), event_id, attended
+    """
+    import json
+    from utils.bulk_import import run_import
+
+    def progress(report):
+        print(f"  {report.rows} rows ({report.imported} {'valid' if dry_run else 'imported'}, "
+              f"{len(report.errors)} rejected) - {report.rate:.0f} rows/sec")
+
+    report = run_import(kind, path, fmt=fmt, batch_size=batch_size, dry_run=dry_run,
+                        processes=processes, progress=progress)
+
+    for error in report.errors[:max_errors]:
+        print(f"  line {error['line']}: {error['error']}")
+    if len(report.errors) > max_errors:
+        print(f"  ... and {len(report.errors) - max_errors} more rejected rows")
+    if errors_file:
+        with open(errors_file, 'w') as f:
+            for error in report.errors:
+                f.write(json.dumps(error, default=str) + '\n')
+
+    verb = 'Validated' if dry_run else 'Imported'
+    print(f"{verb} {report.imported} of {report.rows} {kind} in {report.elapsed:.2f}s "
+          f"({report.rate:.0f} rows/sec, {report.batches} batches"
+          + (f", {report.hash_seconds:.2f}s hashing passwords" if report.hash_seconds else '') + ").")
+    if report.errors:
+        raise SystemExit(1)
+
+
+@click.command("warmup")
+@with_appcontext
+def warmup():
+    """Compiles every template into the bytecode cache, so new workers skip compiling them."""
+    from utils.template_cache import precompile_templates
+    compiled, seconds = precompile_templates(current_app)
+    directory = current_app.config['JINJA_BYTECODE_CACHE_DIR']
+    print(f"Compiled {compiled} templates in {seconds:.2f}s"
+          + (f" into {directory}." if directory else " (JINJA_BYTECODE_CACHE_DIR is not set, so nothing was saved)."))
+
+
+# The app served by gunicorn (app:app), wsgi.py and asgi.py
+app = create_app()
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
-    app.run(debug=False)
\ No newline at end of file
+    app.run(debug=False)
@@ -0,0 +1,45 @@
+# eventhive/asgi.py
+"""
+ASGI entry point. The scanner's check-in endpoints are served by the async
+app in routes/async_qr.py; every other request goes to the Flask app, which
+runs on a pool of ASGI_WSGI_THREADS threads per worker.
+
+    gunicorn --workers 2 --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT asgi:app
+
+The WSGI entry point (app:app, as in the Procfile) keeps working and serves
+the same URLs with the synchronous views.
+"""
+
+import logging
+from a2wsgi import WSGIMiddleware
+from app import app as flask_app
+from routes.async_qr import CheckinApp
+from utils.async_db import dispose_async_engine
+
+logger = logging.getLogger(__name__)
+
+checkin_app = CheckinApp(flask_app)
+wsgi_app = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_THREADS'])
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            try:
+                await dispose_async_engine()
+            except Exception:
+                logger.exception("Could not close the async database engine")
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    elif checkin_app.handles(scope):
+        await checkin_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -0,0 +1 @@
+# eventhive/benchmarks/__init__.py
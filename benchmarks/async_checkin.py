@@ -0,0 +1,91 @@
+# eventhive/benchmarks/async_checkin.py
+"""
+Check-in benchmark: the synchronous views (gunicorn sync workers on app:app)
+against the async check-in app (uvicorn workers on asgi:app).
+
+Both servers get the same number of workers and the same check-in burst (see
+benchmarks.scenarios.checkin_burst), sent by many concurrent scanners, each
+against a fresh event. Reports p50/p95/p99 latency and throughput per route.
+
+    python -m benchmarks.async_checkin
+    python -m benchmarks.async_checkin --scanners 300 --workers 2 --scale 2 --output checkin.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+SERVERS = {
+    'sync': ('sync', 'app:app'),
+    'async': ('uvicorn.workers.UvicornWorker', 'asgi:app'),
+}
+
+
+def parse_args():
+    from benchmarks.seed import add_arguments
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--scanners', type=int, default=200, help='Concurrent scanner clients.')
+    parser.add_argument('--workers', type=int, default=2, help='Server worker processes, for both servers.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplies the number of scans.')
+    parser.add_argument('--server', action='append', dest='servers', choices=sorted(SERVERS),
+                        help='Server to run; repeatable (defaults to both).')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    return parser.parse_args()
+
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = parse_args()
+
+    from benchmarks.suite import prepare_environment, print_scenario, summarize
+    prepare_environment(args.database_url)
+
+    from app import app
+    from models.models import db
+    from benchmarks.drivers import GunicornDriver
+    from benchmarks.scenarios import checkin_burst
+    from benchmarks.seed import seed_database
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        data = seed_database(db, args.users, args.events, args.registrations, args.feedback,
+                             organizers=args.organizers, seed=args.seed)
+
+    rng = random.Random(args.seed)
+    results = {}
+    for name in args.servers or list(SERVERS):
+        worker_class, target = SERVERS[name]
+        with app.app_context():
+            requests = checkin_burst(db, data, rng, args.scale)
+        driver = GunicornDriver(app, args.scanners, workers=args.workers, worker_class=worker_class, target=target)
+        try:
+            elapsed, samples = driver.run(requests)
+        finally:
+            driver.close()
+        results[name] = summarize(elapsed, samples)
+        print_scenario(f'{name} ({target}, {args.workers} x {worker_class}, {args.scanners} scanners)', results[name])
+
+    if len(results) == len(SERVERS):
+        print("\nasync against sync:")
+        for label, route in results['async']['routes'].items():
+            before = results['sync']['routes'].get(label)
+            if before:
+                print(f"  {label:40} p95 {before['p95_ms']} -> {route['p95_ms']} ms, "
+                      f"{before['throughput_rps']} -> {route['throughput_rps']} req/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'scanners': args.scanners, 'workers': args.workers, 'scale': args.scale,
+                       'servers': results}, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    return 1 if any(result['errors'] for result in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
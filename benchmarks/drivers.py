@@ -0,0 +1,174 @@
+# eventhive/benchmarks/drivers.py
+"""
+Ways of sending a scenario's requests: in-process through the Flask test
+client, or over HTTP to gunicorn started locally on the benchmark database.
+Both log users in by signing a session cookie, so no password is hashed.
+"""
+
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_QUERIES = re.compile(r'desc="(\d+) quer')
+
+
+def queries_from(server_timing):
+    """Reads the query count reported in a Server-Timing header (None if absent)."""
+    match = _QUERIES.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+class Driver:
+    """Sends requests from a thread pool and times each one."""
+
+    def __init__(self, app, threads):
+        self.app = app
+        self.threads = threads
+        self._serializer = app.session_interface.get_signing_serializer(app)
+        self._cookies = {}
+
+    def session_cookie(self, user_id):
+        if user_id not in self._cookies:
+            self._cookies[user_id] = self._serializer.dumps({'_user_id': str(user_id), '_fresh': True})
+        return self._cookies[user_id]
+
+    def send(self, method, path, cookie, body):
+        """Returns the status code and Server-Timing header of one request."""
+        raise NotImplementedError
+
+    def run(self, requests):
+        """
+        Fires the requests concurrently.
+        :return: The wall-clock seconds taken and a list of
+            (route label, status, seconds, queries) samples in request order.
+        """
+        for _, _, _, user_id, _ in requests:
+            if user_id is not None:
+                self.session_cookie(user_id)
+
+        def timed(request):
+            label, method, path, user_id, body = request
+            cookie = self._cookies.get(user_id)
+            started = time.perf_counter()
+            try:
+                status, server_timing = self.send(method, path, cookie, body)
+            except Exception:
+                status, server_timing = 0, None
+            return label, status, time.perf_counter() - started, queries_from(server_timing)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            samples = list(pool.map(timed, requests))
+        return time.perf_counter() - started, samples
+
+    def close(self):
+        pass
+
+
+class TestClientDriver(Driver):
+    """Calls the WSGI app in this process; measures the app without any server or network."""
+
+    name = 'testclient'
+
+    def send(self, method, path, cookie, body):
+        client = self.app.test_client()
+        if cookie is not None:
+            client.set_cookie(self.app.config.get('SESSION_COOKIE_NAME', 'session'), cookie)
+        response = client.open(path, method=method, json=body)
+        response.close()
+        return response.status_code, response.headers.get('Server-Timing')
+
+
+class GunicornDriver(Driver):
+    """
+    Starts gunicorn on a free local port with the same configuration and talks HTTP to it.
+    :param target: The app gunicorn serves, e.g. 'asgi:app' with an ASGI worker class.
+    :param profile: Start the server profile of gunicorn.conf.py (chosen through env) instead.
+    """
+
+    name = 'gunicorn'
+
+    def __init__(self, app, threads, workers=2, worker_class='sync', env=None, target='app:app', profile=False):
+        super().__init__(app, threads)
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if profile:
+            # gunicorn.conf.py picks the workers, worker class and app from env
+            options = ['--config', 'gunicorn.conf.py']
+        else:
+            # An empty config file keeps gunicorn.conf.py from being loaded
+            options = ['--config', os.devnull, '--workers', str(workers), '--worker-class', worker_class, target]
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{self.port}', '--log-level', 'warning', *options],
+            cwd=root, env=dict(os.environ, **(env or {})),
+        )
+        self._wait_until_ready()
+
+    def _wait_until_ready(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'gunicorn exited with status {self.process.returncode}')
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.1)
+        self.close()
+        raise RuntimeError(f'gunicorn did not start listening on port {self.port} within {timeout}s')
+
+    def send(self, method, path, cookie, body):
+        cookie_name = self.app.config.get('SESSION_COOKIE_NAME', 'session')
+        headers = {'Cookie': f'{cookie_name}={cookie}'} if cookie is not None else {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        # Sync workers close the connection after each response, so connect per request
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status, response.getheader('Server-Timing')
+        finally:
+            conn.close()
+
+    def memory(self):
+        """Returns the resident and proportional set sizes (PSS splits shared pages) of the master and each worker, in KiB."""
+        def usage(pid):
+            sizes = {}
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                for line in f:
+                    name, _, value = line.partition(':')
+                    if name in ('Rss', 'Pss'):
+                        sizes[name.lower()] = int(value.split()[0])
+            return sizes
+
+        workers = []
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                try:
+                    with open(f'/proc/{entry}/stat') as f:
+                        ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                    if ppid == self.process.pid:
+                        workers.append(usage(entry))
+                except (OSError, ValueError, IndexError):
+                    continue
+        return {'master': usage(self.process.pid), 'workers': workers}
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
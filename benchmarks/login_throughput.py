@@ -0,0 +1,104 @@
+# eventhive/benchmarks/login_throughput.py
+"""
+Login throughput benchmark.
+
+Posts concurrent logins through the login view for each password hashing
+policy and reports logins per second, with and without the bounded verifier.
+A final run logs in users whose hashes predate the current policy, which
+measures the one-off cost of the transparent rehash.
+
+    python -m benchmarks.login_throughput --logins 200 --threads 8
+    python -m benchmarks.login_throughput --policy pbkdf2:sha256:600000 --policy scrypt:16384:8:1
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_POLICIES = ['pbkdf2:sha256:600000', 'pbkdf2:sha256:1000000', 'scrypt:16384:8:1', 'scrypt:32768:8:1']
+PASSWORD = 'bench-password'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--policy', action='append', dest='policies',
+                        help='Hash method to measure; repeatable (defaults to a pbkdf2/scrypt sweep).')
+    parser.add_argument('--logins', type=int, default=200, help='Logins per policy and mode.')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent client threads.')
+    parser.add_argument('--verifier-workers', type=int, default=2,
+                        help='Pool size used for the bounded-verifier runs.')
+    parser.add_argument('--database-url', default=None,
+                        help='Database to run against (defaults to a throwaway SQLite file). Its tables are dropped.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    policies = args.policies or DEFAULT_POLICIES
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'logins.db')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from werkzeug.security import generate_password_hash
+    from app import app
+    from models.models import db, User
+    import utils.passwords as passwords
+
+    # Leave room for every thread to wait, so the runs measure throughput rather than shedding
+    app.config.update(WTF_CSRF_ENABLED=False, PASSWORD_HASH_MAX_PENDING=args.threads,
+                      PASSWORD_HASH_TIMEOUT=600)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(db.insert(User), [
+            {'username': f'bench-user-{i}', 'email': f'user{i}@bench.example.com', 'role': 'Student'}
+            for i in range(args.logins)
+        ])
+        db.session.commit()
+
+    def seed_hashes(method):
+        # Every user shares one hash; salts do not change the verification cost
+        with app.app_context():
+            db.session.execute(db.update(User).values(password_hash=generate_password_hash(PASSWORD, method=method)))
+            db.session.commit()
+
+    def log_in(i):
+        client = app.test_client()
+        response = client.post('/auth/login', data={'email': f'user{i}@bench.example.com', 'password': PASSWORD})
+        return response.status_code
+
+    def run(method, workers, stored_method=None):
+        seed_hashes(stored_method or method)
+        app.config.update(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_WORKERS=workers)
+        passwords._verifier.reset()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            statuses = list(pool.map(log_in, range(args.logins)))
+        elapsed = time.perf_counter() - started
+
+        failures = sum(1 for status in statuses if status != 302)
+        mode = f'pool x{workers}' if workers else 'inline'
+        label = f'{stored_method} -> {method}' if stored_method else method
+        print(f"{label:<44} {mode:<9} {args.logins / elapsed:>10.1f} {elapsed / args.logins * 1000:>9.1f} {failures:>8}")
+
+    print(f"{args.logins} logins per run, {args.threads} client threads")
+    print(f"{'policy':<44} {'verifier':<9} {'logins/s':>10} {'ms/login':>9} {'failures':>8}")
+    for method in policies:
+        run(method, workers=0)
+        run(method, workers=args.verifier_workers)
+
+    # Rehash on login: stored under the first policy, configured for the last
+    if len(policies) > 1:
+        run(policies[-1], workers=0, stored_method=policies[0])
+        with app.app_context():
+            stale = sum(1 for (pwhash,) in db.session.query(User.password_hash) if passwords.needs_rehash(pwhash))
+        print(f"hashes left on the old policy after the rehash run: {stale}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
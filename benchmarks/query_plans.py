@@ -0,0 +1,240 @@
+# eventhive/benchmarks/query_plans.py
+"""
+Query-plan regression check.
+
+Drives every hot route against a database seeded by benchmarks/seed.py (plus a
+full event with a waitlist), captures the SQL each one
+issues, and runs EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (PostgreSQL, with
+sequential scans disabled) on it. Exits non-zero if a statement that filters or
+joins on a table has to read that table in full, so it can gate a deploy.
+tests/test_query_plans.py runs the same check on SQLite with the test suite.
+
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --verbose
+    python -m benchmarks.query_plans --database-url postgresql://localhost/eventhive_plans
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+
+# Filtered whole-table reads accepted on purpose, keyed by (scenario, table), with the reason
+EXPECTED_FULL_SCANS = {}
+
+
+def parse_args():
+    from benchmarks.seed import add_arguments
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    # Enough rows for realistic plans, few enough to seed in seconds
+    parser.set_defaults(users=500, registrations=2500, feedback=1000)
+    parser.add_argument('--verbose', action='store_true', help='Print every plan, not only regressions.')
+    return parser.parse_args()
+
+
+def add_waitlist(db, data, size=20):
+    """
+    Fills the most popular upcoming event to capacity and queues students for it,
+    since seed_database leaves every waitlist empty.
+    :return: The ID of the full event, one of its attendees, and a student not yet queued for it.
+    """
+    from models.models import Event, EventStats, Waitlist, registrations
+
+    event_id, registered = (
+        db.session.query(EventStats.event_id, EventStats.registered_count)
+        .filter(EventStats.event_id.in_(data['upcoming_events']))
+        .order_by(EventStats.registered_count.desc(), EventStats.event_id)
+        .first()
+    )
+    db.session.execute(db.update(Event).where(Event.id == event_id).values(capacity=registered))
+    attendees = {user_id for (user_id,) in db.session.query(registrations.c.user_id).filter_by(event_id=event_id)}
+    others = [student for student in data['students'] if student not in attendees]
+    db.session.execute(db.insert(Waitlist), [{'user_id': user_id, 'event_id': event_id} for user_id in others[:size]])
+    db.session.commit()
+    return event_id, min(attendees), others[size]
+
+
+def explain(db, statement, parameters):
+    """Returns the plan of a statement as a list of human-readable lines."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+            return [row[3] for row in rows]
+        conn.exec_driver_sql('SET enable_seqscan = off')
+        (plan,), = conn.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).fetchall()
+        plan = plan if isinstance(plan, list) else json.loads(plan)
+        lines = []
+
+        def walk(node, depth):
+            node_type = node['Node Type']
+            if node_type in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in node:
+                node_type = 'Full Index Scan'
+            label = node_type + (f" on {node['Relation Name']}" if 'Relation Name' in node else '')
+            lines.append('  ' * depth + label)
+            for child in node.get('Plans', []):
+                walk(child, depth + 1)
+        walk(plan[0]['Plan'], 0)
+        return lines
+
+
+def full_scans(plan, statement, tables):
+    """
+    Returns the tables a plan reads in full although the statement filters them or joins them in.
+    SQLite reports such reads as 'SCAN <table>' (possibly through an index, in index order);
+    indexed lookups are 'SEARCH'. Reading an unfiltered table in full, e.g. for a COUNT or
+    the first page of a listing, is expected.
+    """
+    found = []
+    for line in plan:
+        match = re.match(r'\s*SCAN (\w+)(?: USING .*)?$', line) or \
+            re.match(r'\s*(?:Seq Scan|Full Index Scan) on (\w+)', line)
+        if match is None or match.group(1) not in tables:
+            continue
+        table = match.group(1)
+        filtered = re.search(rf'\b(?:WHERE|AND|OR)\s+\(?"?{table}"?\.', statement, re.IGNORECASE)
+        joined = re.search(rf'\bJOIN\s+"?{table}"?\s+ON\b', statement, re.IGNORECASE)
+        if filtered or joined:
+            found.append(table)
+    return found
+
+
+def check_plans(app, users, events, registrations, feedback, organizers=None, seed=1, verbose=False):
+    """
+    Seeds the app's empty database with benchmarks/seed.py, drives every hot
+    route once and explains the statements each one issued.
+    :return: The number of statements that read a table they filter or join in full.
+    """
+    from sqlalchemy import event as sa_event
+    from models.models import db, Event, Feedback, registrations as registrations_table
+    from utils.qr_utils import qr_payload
+    from benchmarks.seed import PASSWORD, seed_database
+
+    # Caches would hide the queries being checked
+    app.config.update(WTF_CSRF_ENABLED=False, RENDER_CACHE_BACKEND='none', USER_CACHE_TTL=0,
+                      QR_PREGENERATE=False)
+
+    with app.app_context():
+        data = seed_database(db, users, events, registrations, feedback, organizers=organizers, seed=seed)
+        full_event, attendee_of_full, newcomer = add_waitlist(db, data)
+        tables = set(db.metadata.tables)
+        students = data['students']
+        student = students[0]
+        organizer = data['organizers'][0]
+        admin = data['admin']
+        upcoming = data['upcoming_events'][-1]
+        # A past event the student registered for but has not reviewed, so the feedback form is shown
+        reviewed = db.select(Feedback.event_id).where(Feedback.user_id == student)
+        past = db.session.query(registrations_table.c.event_id).filter(
+            registrations_table.c.user_id == student, registrations_table.c.event_id.in_(data['past_events']),
+            registrations_table.c.event_id.not_in(reviewed)
+        ).limit(1).scalar() or data['past_events'][0]
+        own_event, attendee = (
+            db.session.query(Event.id, registrations_table.c.user_id)
+            .join(registrations_table, registrations_table.c.event_id == Event.id)
+            .filter(Event.organizer_id == organizer)
+            .order_by(Event.id.desc())
+            .first()
+        )
+        checkin = qr_payload(attendee, own_event)
+        victim = students[1]
+        doomed_event = data['past_events'][len(data['past_events']) // 2]
+
+    scenarios = [
+        ('home page', None, 'get', '/', {}),
+        ('events list', None, 'get', '/events', {}),
+        ('events list as student', student, 'get', '/events', {}),
+        ('event search', None, 'get', '/events/search?q=workshop+room', {}),
+        ('search autocomplete', None, 'get', '/events/autocomplete?q=wor', {}),
+        ('login', None, 'post', '/auth/login', {'data': {'email': 'student0@bench.example.com',
+                                                         'password': PASSWORD}}),
+        ('register', student, 'post', f'/register/{upcoming}', {}),
+        ('unregister', student, 'post', f'/unregister/{upcoming}', {}),
+        ('join waitlist', newcomer, 'post', f'/register/{full_event}', {}),
+        ('unregister from full event', attendee_of_full, 'post', f'/unregister/{full_event}', {}),
+        ('student dashboard', student, 'get', '/student_dashboard', {}),
+        ('feedback form', student, 'get', f'/feedback/{past}', {}),
+        ('organizer dashboard', organizer, 'get', '/organizer_dashboard', {}),
+        ('organizer event panel', organizer, 'get', f'/organizer_dashboard/events/{own_event}/panel', {}),
+        ('scanner page', organizer, 'get', '/qr/scan', {}),
+        ('check-in', organizer, 'post', '/qr/verify_attendance', {'json': {'qr_data': checkin}}),
+        ('batch check-in', organizer, 'post', '/qr/verify_attendance_batch', {'json': {'scans': [checkin]}}),
+        ('admin dashboard', admin, 'get', '/admin_dashboard', {}),
+        ('admin dashboard next page', admin, 'get', '/admin_dashboard?users_after=WzEwXQ&events_after=WzEwMF0', {}),
+        ('edit event', admin, 'post', f'/edit_event/{upcoming}',
+         {'data': {'title': 'Edited', 'description': 'Edited description', 'location': 'Hall',
+                   'event_date': '2031-01-01T10:00', 'capacity': '60'}}),
+        ('delete user', admin, 'post', f'/delete_user/{victim}', {}),
+        ('delete event', admin, 'post', f'/delete_event/{doomed_event}', {}),
+    ]
+
+    captured = []
+    capturing = [False]
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing[0] and not executemany and statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT')):
+            captured.append((statement, parameters))
+
+    with app.app_context():
+        sa_event.listen(db.engine, 'before_cursor_execute', capture)
+
+    regressions = 0
+    checked = set()
+    for name, user_id, method, path, kwargs in scenarios:
+        client = app.test_client()
+        if user_id is not None:
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+
+        captured.clear()
+        capturing[0] = True
+        response = getattr(client, method)(path, **kwargs)
+        capturing[0] = False
+        print(f"{name} ({method.upper()} {path}): {response.status_code}, {len(captured)} statements")
+
+        with app.app_context():
+            for statement, parameters in captured:
+                if statement.lstrip().upper().startswith('INSERT') and ' SELECT ' not in statement.upper():
+                    continue
+                plan = explain(db, statement, parameters)
+                scans = [table for table in full_scans(plan, statement, tables)
+                         if (name, table) not in EXPECTED_FULL_SCANS]
+                if scans:
+                    regressions += 1
+                if scans or (verbose and statement not in checked):
+                    print(f"  {'FULL SCAN of ' + ', '.join(scans) if scans else 'ok'}: {' '.join(statement.split())[:160]}")
+                    for line in plan:
+                        print(f"      {line}")
+                checked.add(statement)
+
+    with app.app_context():
+        sa_event.remove(db.engine, 'before_cursor_execute', capture)
+
+    print(f"\nChecked {len(checked)} distinct statements: "
+          f"{regressions} full table scan{'s' if regressions != 1 else ''}.")
+    return regressions
+
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'plans.db')
+
+    from app import app
+    from models.models import db
+
+    app.config['QR_CACHE_DIR'] = tempfile.mkdtemp()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    regressions = check_plans(app, args.users, args.events, args.registrations, args.feedback,
+                              organizers=args.organizers, seed=args.seed, verbose=args.verbose)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
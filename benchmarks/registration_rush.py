@@ -0,0 +1,151 @@
+# eventhive/benchmarks/registration_rush.py
+"""
+Registration rush load test.
+
+Fires thousands of simultaneous registrations at one capped event and checks
+that it is never overbooked, that the overflow lands on the waitlist in order,
+and that no request errors. Unregistrations are then fired concurrently to
+check that waitlist promotion keeps the same invariants.
+
+    python -m benchmarks.registration_rush --students 2000 --capacity 150
+    python -m benchmarks.registration_rush --database-url postgresql://localhost/eventhive_bench
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=2000, help='Number of simultaneous registrations.')
+    parser.add_argument('--capacity', type=int, default=150, help='Seats at the event.')
+    parser.add_argument('--threads', type=int, default=64, help='Concurrent client threads.')
+    parser.add_argument('--unregister', type=int, default=50, help='Registered students who then unregister.')
+    parser.add_argument('--database-url', default=None,
+                        help='Database to run against (defaults to a throwaway SQLite file). Its tables are dropped.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'rush.db')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import app
+    from models.models import db, User, Event, EventStats, Waitlist, registrations
+
+    app.config.update(TESTING=False, WTF_CSRF_ENABLED=False, QR_PREGENERATE=False)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        organizer = User(username='rush-organizer', email='organizer@rush.test', role='Organizer')
+        db.session.add(organizer)
+        db.session.flush()
+        event = Event(title='Registration Rush', description='Load test event', location='Main Hall',
+                      event_date=datetime.now() + timedelta(days=7), organizer_id=organizer.id,
+                      capacity=args.capacity, stats=EventStats())
+        db.session.add(event)
+        db.session.execute(db.insert(User), [
+            {'username': f'rush-student-{i}', 'email': f'student{i}@rush.test', 'role': 'Student'}
+            for i in range(args.students)
+        ])
+        db.session.commit()
+        event_id = event.id
+        student_ids = [user_id for (user_id,) in
+                       db.session.query(User.id).filter_by(role='Student').order_by(User.id)]
+
+    errors = []
+    errors_lock = threading.Lock()
+    start = threading.Barrier(min(args.threads, len(student_ids)) or 1)
+
+    def post_as(user_id, path, wait):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        if wait:
+            try:
+                start.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+        try:
+            response = client.post(path)
+            if response.status_code >= 400:
+                raise RuntimeError(f'HTTP {response.status_code}')
+        except Exception as e:
+            with errors_lock:
+                errors.append(f'user {user_id} {path}: {e!r}')
+
+    def fire(user_ids, path, wait):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for user_id in user_ids:
+                pool.submit(post_as, user_id, path, wait)
+        return time.perf_counter() - started
+
+    elapsed = fire(student_ids, f'/register/{event_id}', wait=True)
+    print(f'{len(student_ids)} registrations in {elapsed:.2f}s ({len(student_ids) / elapsed:.0f} req/s)')
+
+    failures = check_invariants(app, db, EventStats, Waitlist, registrations, event_id, args.capacity, len(student_ids))
+
+    with app.app_context():
+        leaving = [user_id for (user_id,) in db.session.query(registrations.c.user_id)
+                   .filter(registrations.c.event_id == event_id).limit(args.unregister)]
+        next_in_line = [user_id for (user_id,) in db.session.query(Waitlist.user_id)
+                        .filter_by(event_id=event_id).order_by(Waitlist.id).limit(len(leaving))]
+
+    elapsed = fire(leaving, f'/unregister/{event_id}', wait=False)
+    print(f'{len(leaving)} unregistrations in {elapsed:.2f}s')
+
+    failures += check_invariants(app, db, EventStats, Waitlist, registrations, event_id, args.capacity,
+                                 len(student_ids) - len(leaving))
+    with app.app_context():
+        registered = {user_id for (user_id,) in db.session.query(registrations.c.user_id)
+                      .filter(registrations.c.event_id == event_id)}
+    not_promoted = [user_id for user_id in next_in_line if user_id not in registered]
+    if not_promoted:
+        failures.append(f'{len(not_promoted)} users at the head of the waitlist were not promoted')
+
+    failures += [f'request failed: {error}' for error in errors[:20]]
+    if len(errors) > 20:
+        failures.append(f'... and {len(errors) - 20} more failed requests')
+
+    if failures:
+        print('FAIL')
+        for failure in failures:
+            print(f'  - {failure}')
+        return 1
+    print('OK: no overbooking, FIFO promotion and no request errors')
+    return 0
+
+
+def check_invariants(app, db, EventStats, Waitlist, registrations, event_id, capacity, candidates):
+    """Returns a list of violated invariants for the event."""
+    failures = []
+    with app.app_context():
+        registered = db.session.query(registrations).filter(registrations.c.event_id == event_id).count()
+        waitlisted = Waitlist.query.filter_by(event_id=event_id).count()
+        counter = db.session.get(EventStats, event_id).registered_count
+
+    expected = min(capacity, candidates)
+    print(f'  registered={registered} counter={counter} waitlisted={waitlisted} (capacity {capacity})')
+    if registered > capacity:
+        failures.append(f'overbooked: {registered} registrations for {capacity} seats')
+    if registered != expected:
+        failures.append(f'expected {expected} registrations, found {registered}')
+    if counter != registered:
+        failures.append(f'counter says {counter} but {registered} rows exist')
+    if registered + waitlisted != candidates:
+        failures.append(f'{candidates - registered - waitlisted} students are neither registered nor waitlisted')
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(main())
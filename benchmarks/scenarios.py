@@ -0,0 +1,99 @@
+# eventhive/benchmarks/scenarios.py
+"""
+Benchmark scenarios. Each one prepares whatever data it needs and returns the
+requests to fire, which the drivers send concurrently in the given order.
+A request is (route label, method, path, user ID or None, JSON body or None).
+"""
+
+from datetime import datetime, timedelta
+from benchmarks.seed import WORDS
+
+
+def anonymous_browsing(db, data, rng, scale):
+    """Visitors who open the home page and the listing, search, and type into the search box."""
+    requests = []
+    for _ in range(int(200 * scale)):
+        word = rng.choice(WORDS)
+        requests += [
+            ('GET /', 'GET', '/', None, None),
+            ('GET /events', 'GET', '/events', None, None),
+            ('GET /events/search', 'GET', f'/events/search?q={word}+{rng.choice(WORDS)}', None, None),
+            ('GET /events/autocomplete', 'GET', f'/events/autocomplete?q={word[:3]}', None, None),
+        ]
+    return requests
+
+
+def registration_rush(db, data, rng, scale):
+    """Students who all refresh the listing and register for one newly announced, capped event."""
+    from models.models import Event, EventStats
+
+    students = rng.sample(data['students'], min(len(data['students']), int(500 * scale)))
+    event = Event(title='Rush Concert', description='Benchmark registration rush', location='Main Hall',
+                  event_date=datetime.now() + timedelta(days=14), organizer_id=data['organizers'][0],
+                  capacity=max(1, len(students) // 4), stats=EventStats())
+    db.session.add(event)
+    db.session.commit()
+
+    requests = []
+    for user_id in students:
+        requests += [
+            ('GET /events (student)', 'GET', '/events', user_id, None),
+            ('POST /register/<id>', 'POST', f'/register/{event.id}', user_id, None),
+        ]
+    return requests
+
+
+def organizer_dashboard(db, data, rng, scale):
+    """Organizers who open their dashboard and expand the attendee panels of a few events."""
+    from models.models import Event
+
+    requests = []
+    for _ in range(int(30 * scale)):
+        organizer = rng.choice(data['organizers'])
+        event_ids = [event_id for (event_id,) in db.session.query(Event.id).filter_by(organizer_id=organizer)]
+        requests.append(('GET /organizer_dashboard', 'GET', '/organizer_dashboard', organizer, None))
+        for event_id in rng.sample(event_ids, min(3, len(event_ids))):
+            requests.append(('GET /organizer_dashboard/events/<id>/panel', 'GET',
+                             f'/organizer_dashboard/events/{event_id}/panel', organizer, None))
+    return requests
+
+
+def checkin_burst(db, data, rng, scale):
+    """
+    Doors opening at a large event: single scans for most attendees, then the
+    scanner's offline queue flushed in batches, with some duplicate scans.
+    """
+    from models.models import Event, EventStats, registrations
+    from utils.qr_utils import qr_payload
+
+    organizer = data['organizers'][0]
+    attendees = rng.sample(data['students'], min(len(data['students']), int(400 * scale)))
+    event = Event(title='Check-in Day', description='Benchmark check-in burst', location='Arena',
+                  event_date=datetime.now() + timedelta(hours=1), organizer_id=organizer, stats=EventStats())
+    db.session.add(event)
+    db.session.flush()
+    db.session.execute(db.insert(registrations), [
+        {'user_id': user_id, 'event_id': event.id, 'attended': False} for user_id in attendees
+    ])
+    EventStats.rebuild([event.id])
+    db.session.commit()
+
+    tokens = [qr_payload(user_id, event.id) for user_id in attendees]
+    split = len(tokens) * 3 // 4
+    requests = [('GET /qr/scan', 'GET', '/qr/scan', organizer, None)]
+    requests += [('POST /qr/verify_attendance', 'POST', '/qr/verify_attendance', organizer, {'qr_data': token})
+                 for token in tokens[:split]]
+    queued = tokens[split:] + rng.sample(tokens, len(tokens) // 20)
+    for start in range(0, len(queued), 25):
+        scans = [{'id': n, 'qr_data': token} for n, token in enumerate(queued[start:start + 25])]
+        requests.append(('POST /qr/verify_attendance_batch', 'POST', '/qr/verify_attendance_batch', organizer,
+                         {'scans': scans}))
+    return requests
+
+
+SCENARIOS = {
+    'anonymous_browsing': anonymous_browsing,
+    'registration_rush': registration_rush,
+    'organizer_dashboard': organizer_dashboard,
+    'checkin_burst': checkin_burst,
+}
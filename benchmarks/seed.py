@@ -0,0 +1,144 @@
+# eventhive/benchmarks/seed.py
+"""
+Synthetic data for benchmarks.
+
+Bulk-generates users, events, registrations and feedback with a fixed random
+seed, so two runs against the same sizes see the same data. Half of the events
+are in the past (and get the feedback), half are upcoming.
+
+    python -m benchmarks.seed --users 5000 --events 500 --registrations 50000 --feedback 10000
+    python -m benchmarks.seed --database-url postgresql://localhost/eventhive_bench --users 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Every seeded account shares this password; its hash is deliberately cheap to compute
+PASSWORD = 'bench-password'
+WORDS = ['python', 'data', 'design', 'career', 'robotics', 'music', 'startup', 'security', 'cloud',
+         'chess', 'photography', 'research', 'hackathon', 'film', 'debate', 'climate', 'poetry', 'finance']
+KINDS = ['Workshop', 'Meetup', 'Talk', 'Seminar', 'Fair', 'Night', 'Bootcamp', 'Social']
+CHUNK = 5000
+
+
+def add_arguments(parser):
+    """Adds the data-size options shared by the seeding command and the suite."""
+    parser.add_argument('--users', type=int, default=2000, help='Students to create.')
+    parser.add_argument('--organizers', type=int, default=None, help='Organizers to create (default users / 50).')
+    parser.add_argument('--events', type=int, default=300, help='Events to create.')
+    parser.add_argument('--registrations', type=int, default=20000, help='Registrations to create.')
+    parser.add_argument('--feedback', type=int, default=4000, help='Feedback rows to create, on past events.')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed.')
+    parser.add_argument('--database-url', default=None,
+                        help='Database to seed (defaults to a throwaway SQLite file). Its tables are dropped.')
+
+
+def _insert(db, table, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(table), rows[start:start + CHUNK])
+
+
+def seed_database(db, users, events, registrations, feedback, organizers=None, seed=1):
+    """
+    Fills an empty database with synthetic data.
+    :return: A dict with the IDs of the admin, organizers, students, past and upcoming events.
+    """
+    from werkzeug.security import generate_password_hash
+    from models.models import User, Event, EventStats, Feedback, registrations as registrations_table
+
+    rng = random.Random(seed)
+    organizers = organizers or max(1, users // 50)
+    password_hash = generate_password_hash(PASSWORD, method='pbkdf2:sha256:1000')
+
+    _insert(db, User, [
+        {'username': 'bench-admin', 'email': 'admin@bench.example.com', 'role': 'Admin',
+         'password_hash': password_hash},
+        *({'username': f'bench-organizer-{i}', 'email': f'organizer{i}@bench.example.com', 'role': 'Organizer',
+           'password_hash': password_hash} for i in range(organizers)),
+        *({'username': f'bench-student-{i}', 'email': f'student{i}@bench.example.com', 'role': 'Student',
+           'password_hash': password_hash} for i in range(users)),
+    ])
+    ids_by_role = {'Admin': [], 'Organizer': [], 'Student': []}
+    for user_id, role in db.session.query(User.id, User.role).order_by(User.id):
+        ids_by_role[role].append(user_id)
+
+    # Events are spread over the year around today; roughly a third have a capacity
+    now = datetime.now().replace(second=0, microsecond=0)
+    rows = []
+    for i in range(events):
+        topic, kind = rng.choice(WORDS), rng.choice(KINDS)
+        rows.append({
+            'title': f'{topic.title()} {kind} {i}',
+            'description': ' '.join(rng.choice(WORDS) for _ in range(40)),
+            'location': f'Building {rng.randint(1, 12)}, Room {rng.randint(100, 450)}',
+            'event_date': now + timedelta(days=i * 365 // max(events, 1) - 182, hours=rng.randint(9, 19)),
+            'organizer_id': ids_by_role['Organizer'][i % organizers],
+            'capacity': rng.choice([None, None, rng.randint(50, 500)]),
+        })
+    _insert(db, Event, rows)
+    dates = db.session.query(Event.id, Event.event_date).order_by(Event.id).all()
+    past = [event_id for event_id, event_date in dates if event_date < now]
+    upcoming = [event_id for event_id, event_date in dates if event_date >= now]
+    event_ids = [event_id for event_id, _ in dates]
+
+    # Distinct (user, event) pairs; popular events draw more registrations
+    students = ids_by_role['Student']
+    pairs = set()
+    limit = min(registrations, len(students) * len(event_ids))
+    while len(pairs) < limit:
+        event_id = event_ids[min(int(rng.paretovariate(1.2)) - 1, len(event_ids) - 1)] if rng.random() < 0.3 \
+            else rng.choice(event_ids)
+        pairs.add((rng.choice(students), event_id))
+    pairs = sorted(pairs)
+    _insert(db, registrations_table, [
+        {'user_id': user_id, 'event_id': event_id, 'attended': event_id in past and rng.random() < 0.7}
+        for user_id, event_id in pairs
+    ])
+
+    past_set = set(past)
+    attended = [pair for pair in pairs if pair[1] in past_set]
+    _insert(db, Feedback, [
+        {'user_id': user_id, 'event_id': event_id, 'rating': rng.randint(1, 5),
+         'comment': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 20)))}
+        for user_id, event_id in rng.sample(attended, min(feedback, len(attended)))
+    ])
+
+    EventStats.rebuild()
+    db.session.commit()
+    return {
+        'admin': ids_by_role['Admin'][0],
+        'organizers': ids_by_role['Organizer'],
+        'students': students,
+        'past_events': past,
+        'upcoming_events': upcoming,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import app
+    from models.models import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        data = seed_database(db, args.users, args.events, args.registrations, args.feedback,
+                             organizers=args.organizers, seed=args.seed)
+
+    print(f"Seeded {os.environ['DATABASE_URL']}: {len(data['students'])} students, "
+          f"{len(data['organizers'])} organizers, {len(data['past_events'])} past and "
+          f"{len(data['upcoming_events'])} upcoming events. Every password is '{PASSWORD}'.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# eventhive/benchmarks/server_profiles.py
+"""
+Throughput and memory of each gunicorn server profile (see gunicorn.conf.py).
+
+Each profile is started from gunicorn.conf.py on the same seeded database and
+sent the same scenario mix over HTTP. Afterwards the resident (RSS) and
+proportional (PSS, shared pages split between the processes using them) memory
+of the master and of each worker is read from /proc, so Linux only. The sync
+profile is also run without preloading, as the old Procfile started it.
+
+    python -m benchmarks.server_profiles
+    python -m benchmarks.server_profiles --workers 4 --gunicorn-threads 8 --output profiles.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+# (label, environment for gunicorn.conf.py)
+RUNS = [
+    ('sync, no preload', {'SERVER_PROFILE': 'sync', 'PRELOAD_APP': 'false'}),
+    ('sync', {'SERVER_PROFILE': 'sync'}),
+    ('gthread', {'SERVER_PROFILE': 'gthread'}),
+    ('asgi', {'SERVER_PROFILE': 'asgi'}),
+]
+
+
+def parse_args():
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.seed import add_arguments
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--scenario', action='append', dest='scenarios', choices=sorted(SCENARIOS),
+                        help='Scenario to send; repeatable (defaults to all of them).')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplies the number of requests per scenario.')
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent client threads.')
+    parser.add_argument('--workers', type=int, default=2, help='WEB_CONCURRENCY for every profile.')
+    parser.add_argument('--gunicorn-threads', type=int, default=4, help='GUNICORN_THREADS for the gthread profile.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    return parser.parse_args()
+
+
+def mean(values):
+    return round(sum(values) / len(values)) if values else None
+
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = parse_args()
+
+    from benchmarks.suite import percentile, prepare_environment
+    prepare_environment(args.database_url)
+
+    from app import app
+    from models.models import db
+    from benchmarks.drivers import GunicornDriver
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.seed import seed_database
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        data = seed_database(db, args.users, args.events, args.registrations, args.feedback,
+                             organizers=args.organizers, seed=args.seed)
+
+    rng = random.Random(args.seed)
+    results = {}
+    for label, env in RUNS:
+        with app.app_context():
+            requests = [request for name in args.scenarios or list(SCENARIOS)
+                        for request in SCENARIOS[name](db, data, rng, args.scale)]
+        env = dict(env, WEB_CONCURRENCY=str(args.workers), GUNICORN_THREADS=str(args.gunicorn_threads),
+                   MAX_REQUESTS='0')
+        driver = GunicornDriver(app, args.threads, env=env, profile=True)
+        try:
+            elapsed, samples = driver.run(requests)
+            memory = driver.memory()
+        finally:
+            driver.close()
+
+        latencies = sorted(seconds for _, _, seconds, _ in samples)
+        workers = memory['workers']
+        results[label] = {
+            'requests': len(samples),
+            'errors': sum(1 for _, status, _, _ in samples if status == 0 or status >= 500),
+            'throughput_rps': round(len(samples) / elapsed, 1),
+            **{f'p{p}_ms': round(percentile(latencies, p) * 1000, 2) for p in (50, 95, 99)},
+            'master_rss_kib': memory['master'].get('rss'),
+            'worker_rss_kib': mean([worker['rss'] for worker in workers]),
+            'worker_pss_kib': mean([worker['pss'] for worker in workers]),
+            'total_pss_kib': memory['master'].get('pss', 0) + sum(worker['pss'] for worker in workers),
+        }
+
+    print(f"\n{args.workers} workers, {args.gunicorn_threads} gthread threads, {args.threads} client threads")
+    print(f"  {'profile':18} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} "
+          f"{'worker RSS MiB':>15} {'worker PSS MiB':>15} {'total PSS MiB':>14}")
+    for label, result in results.items():
+        print(f"  {label:18} {result['throughput_rps']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+              f"{result['p99_ms']:>8} {result['errors']:>7} {result['worker_rss_kib'] / 1024:>15.1f} "
+              f"{result['worker_pss_kib'] / 1024:>15.1f} {result['total_pss_kib'] / 1024:>14.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'workers': args.workers, 'gunicorn_threads': args.gunicorn_threads,
+                       'threads': args.threads, 'profiles': results}, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    return 1 if any(result['errors'] for result in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# eventhive/benchmarks/startup.py
+"""
+Cold start benchmark.
+
+Starts fresh Python processes and reports, as the median over several runs, the
+time to `import app` (which builds the app through create_app) and the time to
+the first response of a few pages. It runs in three modes:
+
+    cold      the bytecode cache directory starts empty, so templates are compiled
+    warm      the bytecode cache was filled by `flask warmup` beforehand
+    disabled  no bytecode cache (JINJA_BYTECODE_CACHE_DIR='')
+
+The render cache is turned off so that every page is actually rendered.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+PATHS = ['/', '/events', '/events/search?q=event', '/auth/login', '/auth/register']
+
+# Modules whose import the app defers until a request needs them
+LAZY_MODULES = ['qrcode', 'PIL.Image', 'flask_migrate', 'wtforms']
+
+# Runs in the fresh process; prints one JSON line of timings
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+responses = {}
+for path in sys.argv[2:]:
+    before = time.perf_counter()
+    status = client.get(path).status_code
+    responses[path] = {'status': status, 'ms': (time.perf_counter() - before) * 1000}
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'responses': responses,
+    'loaded': [name for name in json.loads(sys.argv[1]) if name in sys.modules],
+}))
+'''
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per mode.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    return parser.parse_args()
+
+
+def probe(root, env, paths):
+    """Runs PROBE in a new interpreter; returns its timings and the wall time from spawn to exit."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', PROBE, json.dumps(LAZY_MODULES), *paths],
+                            cwd=root, env=env, capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_ms'] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def interpreter_startup():
+    """Milliseconds for a bare `python -c pass`, the floor under every measurement."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, root)
+    args = parse_args()
+
+    from benchmarks.suite import prepare_environment
+    prepare_environment()
+    workdir = os.path.dirname(os.environ['RENDER_CACHE_PATH'])
+    bytecode_dir = os.path.join(workdir, 'jinja_cache')
+    env = dict(os.environ, RENDER_CACHE_BACKEND='none', SERVER_TIMING='false', METRICS_ENABLED='false',
+               JINJA_BYTECODE_CACHE_DIR=bytecode_dir)
+
+    # A small database with a few events to show
+    subprocess.run([sys.executable, '-m', 'benchmarks.seed', '--users', '20', '--events', '5',
+                    '--registrations', '20', '--feedback', '5', '--database-url', env['DATABASE_URL']],
+                   cwd=root, env=env, check=True, capture_output=True)
+
+    baseline = statistics.median(interpreter_startup() for _ in range(args.runs))
+
+    results = {}
+    for mode in ('cold', 'warm', 'disabled'):
+        runs = []
+        for _ in range(args.runs):
+            shutil.rmtree(bytecode_dir, ignore_errors=True)
+            mode_env = dict(env)
+            if mode == 'warm':
+                subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'warmup'],
+                               cwd=root, env=env, check=True, capture_output=True)
+            elif mode == 'disabled':
+                mode_env['JINJA_BYTECODE_CACHE_DIR'] = ''
+            runs.append(probe(root, mode_env, PATHS))
+
+        results[mode] = {
+            'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+            'first_response_ms': {path: round(statistics.median(run['responses'][path]['ms'] for run in runs), 1)
+                                  for path in PATHS},
+            'statuses': {path: runs[-1]['responses'][path]['status'] for path in PATHS},
+            'process_ms': round(statistics.median(run['process_ms'] for run in runs), 1),
+            'lazy_modules_loaded': runs[-1]['loaded'],
+        }
+
+    print(f"Median of {args.runs} fresh processes (python -c pass: {baseline:.0f} ms)")
+    print(f"  {'mode':10} {'import app':>11} " + ' '.join(f'{path[:22]:>22}' for path in PATHS) + f" {'process':>9}")
+    for mode, result in results.items():
+        print(f"  {mode:10} {result['import_ms']:>8.1f} ms "
+              + ' '.join(f"{result['first_response_ms'][path]:>19.1f} ms" for path in PATHS)
+              + f" {result['process_ms']:>6.0f} ms")
+    print(f"  Deferred modules loaded after these requests: {', '.join(results['warm']['lazy_modules_loaded']) or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'runs': args.runs, 'python_startup_ms': round(baseline, 1), 'modes': results}, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    return 1 if any(status >= 500 for result in results.values() for status in result['statuses'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# eventhive/benchmarks/suite.py
+"""
+Load and latency benchmark suite.
+
+Seeds a throwaway database with synthetic data (see benchmarks.seed), then runs
+each scenario through the Flask test client or a locally started gunicorn and
+reports p50/p95/p99 latency, throughput and queries per request for each route.
+Results can be written to JSON and compared with an earlier run.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --driver gunicorn --workers 4 --threads 16 --output after.json
+    python -m benchmarks.suite --scenario checkin_burst --scale 2 --compare before.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+
+def parse_args():
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.seed import add_arguments
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--scenario', action='append', dest='scenarios', choices=sorted(SCENARIOS),
+                        help='Scenario to run; repeatable (defaults to all of them).')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplies the number of requests per scenario.')
+    parser.add_argument('--driver', choices=['testclient', 'gunicorn'], default='testclient',
+                        help='Send requests in-process or over HTTP to a local gunicorn.')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent client threads.')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (gunicorn driver only).')
+    parser.add_argument('--worker-class', default='sync', help='gunicorn worker class (gunicorn driver only).')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Print the change against the results in this JSON file.')
+    return parser.parse_args()
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(elapsed, samples):
+    """Aggregates one scenario's samples per route."""
+    routes = {}
+    for label, status, seconds, queries in samples:
+        route = routes.setdefault(label, {'latencies': [], 'queries': [], 'errors': 0})
+        route['latencies'].append(seconds)
+        if queries is not None:
+            route['queries'].append(queries)
+        if status == 0 or status >= 500:
+            route['errors'] += 1
+
+    summary = {}
+    for label, route in routes.items():
+        latencies = sorted(route['latencies'])
+        summary[label] = {
+            'requests': len(latencies),
+            'errors': route['errors'],
+            'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+            **{f'p{p}_ms': round(percentile(latencies, p) * 1000, 2) for p in (50, 95, 99)},
+            'queries_per_request': round(sum(route['queries']) / len(route['queries']), 2) if route['queries'] else None,
+        }
+    return {
+        'requests': len(samples),
+        'errors': sum(route['errors'] for route in summary.values()),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else None,
+        'routes': summary,
+    }
+
+
+def print_scenario(name, result):
+    print(f"\n{name}: {result['requests']} requests in {result['seconds']:.2f}s "
+          f"({result['throughput_rps']} req/s, {result['errors']} errors)")
+    print(f"  {'route':45} {'n':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for label, route in result['routes'].items():
+        queries = '-' if route['queries_per_request'] is None else f"{route['queries_per_request']:.1f}"
+        print(f"  {label:45} {route['requests']:>6} {route['throughput_rps']:>8} {route['p50_ms']:>8} "
+              f"{route['p95_ms']:>8} {route['p99_ms']:>8} {queries:>8}")
+
+
+def print_comparison(results, baseline):
+    """Prints p95 latency and queries per request next to those of an earlier run."""
+    print(f"\nChange against {baseline['meta'].get('git_commit') or 'baseline'}:")
+    for key in ('driver', 'threads', 'workers', 'scale', 'data', 'database'):
+        if baseline['meta'].get(key) != results['meta'].get(key):
+            print(f"  warning: {key} differs ({baseline['meta'].get(key)} then, {results['meta'].get(key)} now)")
+    print(f"  {'route':60} {'p95 ms':>18} {'queries':>14}")
+    for name, result in results['scenarios'].items():
+        before_routes = baseline['scenarios'].get(name, {}).get('routes', {})
+        for label, route in result['routes'].items():
+            before = before_routes.get(label)
+            if before is None:
+                continue
+            change = (route['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+            queries = (f"{before['queries_per_request']} -> {route['queries_per_request']}"
+                       if route['queries_per_request'] is not None else '-')
+            print(f"  {name + ' ' + label:60} {before['p95_ms']:>7} -> {route['p95_ms']:<7} ({change:+.0f}%) {queries:>14}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_environment(database_url=None):
+    """
+    Points the app at a throwaway database and cache directory. Both drivers
+    read the configuration from the environment, so call this before importing the app.
+    """
+    workdir = tempfile.mkdtemp(prefix='eventhive-bench-')
+    os.environ['DATABASE_URL'] = database_url or 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ.update(
+        RENDER_CACHE_PATH=os.path.join(workdir, 'render_cache.sqlite3'),
+        QR_CACHE_DIR=os.path.join(workdir, 'qr_cache'),
+        METRICS_DIR=os.path.join(workdir, 'metrics'),
+        SERVER_TIMING='true',
+    )
+
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = parse_args()
+
+    prepare_environment(args.database_url)
+
+    from app import app
+    from models.models import db
+    from benchmarks.drivers import GunicornDriver, TestClientDriver
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.seed import seed_database
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        data = seed_database(db, args.users, args.events, args.registrations, args.feedback,
+                             organizers=args.organizers, seed=args.seed)
+    print(f"Seeded {len(data['students'])} students, {len(data['organizers'])} organizers, "
+          f"{len(data['past_events']) + len(data['upcoming_events'])} events.")
+
+    if args.driver == 'gunicorn':
+        driver = GunicornDriver(app, args.threads, workers=args.workers, worker_class=args.worker_class)
+    else:
+        driver = TestClientDriver(app, args.threads)
+
+    rng = random.Random(args.seed)
+    results = {
+        'meta': {
+            'git_commit': git_commit(),
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'database': os.environ['DATABASE_URL'].split(':')[0],
+            'driver': driver.name,
+            'threads': args.threads,
+            'workers': args.workers if args.driver == 'gunicorn' else None,
+            'scale': args.scale,
+            'data': {'users': args.users, 'events': args.events, 'registrations': args.registrations,
+                     'feedback': args.feedback, 'seed': args.seed},
+        },
+        'scenarios': {},
+    }
+    try:
+        for name in args.scenarios or list(SCENARIOS):
+            with app.app_context():
+                requests = SCENARIOS[name](db, data, rng, args.scale)
+            elapsed, samples = driver.run(requests)
+            results['scenarios'][name] = summarize(elapsed, samples)
+            print_scenario(name, results['scenarios'][name])
+    finally:
+        driver.close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+    return 1 if any(result['errors'] for result in results['scenarios'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
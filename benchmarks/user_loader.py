@@ -0,0 +1,91 @@
+# eventhive/benchmarks/user_loader.py
+"""
+User-loader cache benchmark.
+
+Replays the same authenticated requests with the per-worker user cache
+disabled and enabled, and reports queries per request and latency for each.
+
+    python -m benchmarks.user_loader --requests 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and mode.')
+    parser.add_argument('--database-url', default=None,
+                        help='Database to run against (defaults to a throwaway SQLite file). Its tables are dropped.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'loader.db')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from sqlalchemy import event as sa_event
+    from app import app
+    from models.models import db, User, Event, EventStats
+    from utils.qr_utils import qr_payload
+    import utils.user_cache as user_cache
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        organizer = User(username='bench-organizer', email='organizer@bench.test', role='Organizer')
+        student = User(username='bench-student', email='student@bench.test', role='Student')
+        db.session.add_all([organizer, student])
+        db.session.flush()
+        event = Event(title='Bench Event', description='Benchmark event', location='Lab',
+                      event_date=datetime.now() + timedelta(days=1), organizer_id=organizer.id,
+                      stats=EventStats())
+        db.session.add(event)
+        db.session.commit()
+        student.register_for(event)
+        db.session.commit()
+        token = qr_payload(student.id, event.id)
+        organizer_id, student_id = organizer.id, student.id
+
+        queries = [0]
+        sa_event.listen(db.engine, 'before_cursor_execute', lambda *a: queries.__setitem__(0, queries[0] + 1))
+
+    scenarios = [
+        ('scanner check-in', organizer_id, 'post', '/qr/verify_attendance', {'json': {'qr_data': token}}),
+        ('student dashboard', student_id, 'get', '/student_dashboard', {}),
+        ('events list', student_id, 'get', '/events', {}),
+    ]
+
+    print(f"{'scenario':<20} {'cache':<6} {'queries/req':>12} {'ms/req':>8}")
+    for name, user_id, method, path, kwargs in scenarios:
+        results = {}
+        for ttl in (0, 60):
+            app.config['USER_CACHE_TTL'] = ttl
+            user_cache._cache.reset()
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+            getattr(client, method)(path, **kwargs)  # warm-up, fills the cache
+
+            queries[0] = 0
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                getattr(client, method)(path, **kwargs)
+            elapsed = time.perf_counter() - started
+            results[ttl] = queries[0] / args.requests
+            print(f"{name:<20} {'on' if ttl else 'off':<6} {results[ttl]:>12.2f} {elapsed / args.requests * 1000:>8.2f}")
+        print(f"{'':<20} saved {results[0] - results[60]:.2f} queries per request")
+
+    with app.app_context():
+        print(f"cache stats: {user_cache.user_cache_stats()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
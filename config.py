@@ -7,9 +7,25 @@ from dotenv import load_dotenv
 basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, '.env'))
 
+
+def pool_options(threads, workers, max_connections, pools=1, background=1):
+    """
+    Sizes one connection pool of a worker: a connection per request thread plus
+    `background` for background threads (such as the event purger), with room to
+    overflow, while the `pools` pools of every worker together stay within the
+    database's max_connections.
+    """
+    budget = max(1, max_connections // max(1, workers * pools))
+    pool_size = min(threads + background, budget)
+    return {'pool_size': pool_size, 'max_overflow': max(0, min(threads, budget - pool_size))}
+
+
 class Config:
     """Base configuration settings."""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-change-in-production'
+
+    # Key for the HMAC that signs check-in QR codes
+    QR_SIGNING_KEY = os.environ.get('QR_SIGNING_KEY') or SECRET_KEY
     
     # Database configuration
     # For Render deployment with PostgreSQL, use DATABASE_URL environment variable
@@ -26,3 +42,119 @@ class Config:
         'pool_pre_ping': True,
         'pool_recycle': 3600,
     }
+
+    # Server profile from gunicorn.conf.py; under 'asgi' every worker also opens the
+    # pool of the async check-in engine (asgi.py), ASYNC_POOL_SIZE connections
+    SERVER_PROFILE = os.environ.get('SERVER_PROFILE', 'sync')
+    ASYNC_POOL_SIZE = int(os.environ.get('ASYNC_POOL_SIZE', 10))
+    ASYNC_POOL_OPTIONS = {'pool_size': ASYNC_POOL_SIZE, 'max_overflow': 0}
+
+    # SQLite serializes writers; wait for the write lock instead of failing under bursts
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'timeout': 30}
+    else:
+        # Size each worker's pool for the server profile in gunicorn.conf.py, within the
+        # connections the database allows (DB_MAX_CONNECTIONS, e.g. its max_connections
+        # minus those kept for migrations and consoles). Under 'asgi' the Flask app's
+        # pool and the async engine's split each worker's share
+        SQLALCHEMY_ENGINE_OPTIONS.update(pool_options(
+            threads=int(os.environ.get('GUNICORN_THREADS', 1)),
+            workers=int(os.environ.get('WEB_CONCURRENCY', 2)),
+            max_connections=int(os.environ.get('DB_MAX_CONNECTIONS', 90)),
+            pools=2 if SERVER_PROFILE == 'asgi' else 1,
+        ))
+        if SERVER_PROFILE == 'asgi':
+            ASYNC_POOL_OPTIONS = pool_options(
+                threads=ASYNC_POOL_SIZE,
+                workers=int(os.environ.get('WEB_CONCURRENCY', 2)),
+                max_connections=int(os.environ.get('DB_MAX_CONNECTIONS', 90)),
+                pools=2,
+                background=0,
+            )
+
+    # Page sizes for keyset-paginated listings
+    EVENTS_PER_PAGE = int(os.environ.get('EVENTS_PER_PAGE', 24))
+    ADMIN_ROWS_PER_PAGE = int(os.environ.get('ADMIN_ROWS_PER_PAGE', 50))
+
+    # QR code images are rendered on first request and cached in memory and on disk
+    QR_CACHE_DIR = os.environ.get('QR_CACHE_DIR') or os.path.join(basedir, 'instance', 'qr_cache')
+    QR_MEMORY_CACHE_SIZE = int(os.environ.get('QR_MEMORY_CACHE_SIZE', 512))
+
+    # Optionally pre-render QR codes on a bounded background executor at registration time
+    QR_PREGENERATE = os.environ.get('QR_PREGENERATE', 'false').lower() in ('1', 'true', 'yes')
+    QR_WORKER_KIND = os.environ.get('QR_WORKER_KIND', 'thread')  # 'thread' or 'process'
+    QR_WORKER_MAX_WORKERS = int(os.environ.get('QR_WORKER_MAX_WORKERS', 2))
+    QR_WORKER_MAX_QUEUE = int(os.environ.get('QR_WORKER_MAX_QUEUE', 1000))
+    QR_WORKER_RETRIES = int(os.environ.get('QR_WORKER_RETRIES', 2))
+
+    # Maximum number of scans accepted by one batch check-in request
+    CHECKIN_BATCH_MAX = int(os.environ.get('CHECKIN_BATCH_MAX', 500))
+
+    # Async check-in endpoints served by asgi.py: the async database URL (derived from
+    # DATABASE_URL with aiosqlite or asyncpg when empty; its pool is sized above), and
+    # the threads each worker gives the Flask app for every other request
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL', '')
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 10))
+
+    # Number of per-event check-in rosters each worker keeps in memory
+    ROSTER_CACHE_SIZE = int(os.environ.get('ROSTER_CACHE_SIZE', 64))
+
+    # Per-worker cache of logged-in users' identities (set the TTL to 0 to disable)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+
+    # Password hashing policy, as a Werkzeug method string such as 'scrypt:32768:8:1'
+    # or 'pbkdf2:sha256:600000'. Older hashes are upgraded on the user's next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+
+    # Optionally verify passwords on a bounded per-worker pool (0 checks them inline);
+    # logins beyond the pool and its pending slots are turned away with a 503
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Cache the rendered HTML of public event pages: 'sqlite' shares entries between
+    # the workers on a host, 'memory' keeps them per worker, 'none' disables the cache
+    RENDER_CACHE_BACKEND = os.environ.get('RENDER_CACHE_BACKEND', 'sqlite')
+    RENDER_CACHE_PATH = os.environ.get('RENDER_CACHE_PATH') or os.path.join(basedir, 'instance', 'render_cache.sqlite3')
+    RENDER_CACHE_SIZE = int(os.environ.get('RENDER_CACHE_SIZE', 256))
+    RENDER_CACHE_TTL = int(os.environ.get('RENDER_CACHE_TTL', 30))
+    # Roles that share cached pages (anonymous visitors always do), e.g. 'Admin,Organizer'
+    RENDER_CACHE_ROLES = [r for r in os.environ.get('RENDER_CACHE_ROLES', '').split(',') if r]
+
+    # Compiled templates are kept here for new workers to load; `flask warmup` fills it
+    # ahead of time (set to '' to compile in memory only)
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR', os.path.join(basedir, 'instance', 'jinja_cache'))
+
+    # Changes every deploy so clients revalidate pages rendered by older templates
+    ETAG_VERSION = os.environ.get('RENDER_GIT_COMMIT', '')
+
+    # Number of titles suggested by the search box while typing
+    SEARCH_AUTOCOMPLETE_LIMIT = int(os.environ.get('SEARCH_AUTOCOMPLETE_LIMIT', 8))
+
+    # Report each request's SQL, template and QR time in a Server-Timing header
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+
+    # Per-endpoint request metrics, served at /metrics in Prometheus text format. Each
+    # worker writes its counters to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds and
+    # /metrics sums them, folding the files of exited workers into one archive; clear the
+    # directory on deploy. Set METRICS_TOKEN to require 'Authorization: Bearer <token>'
+    # from the scraper; without a token, /metrics only answers requests from localhost.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(basedir, 'instance', 'metrics')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+    # N+1 query detector: 'raise' fails any request that runs one query shape more than
+    # NPLUSONE_THRESHOLD times (for tests), 'log' appends a JSON report per offending
+    # request to NPLUSONE_REPORT_PATH (for staging), 'off' disables it
+    NPLUSONE_MODE = os.environ.get('NPLUSONE_MODE', 'off').lower()
+    NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', 5))
+    NPLUSONE_REPORT_PATH = os.environ.get('NPLUSONE_REPORT_PATH', os.path.join(basedir, 'instance', 'nplusone.jsonl'))
+
+    # Events with at least this many registrations are hidden at once on delete and
+    # purged by a background thread in chunks (EVENT_PURGE_PAUSE seconds apart); run
+    # `flask purge-deleted-events` to finish purges a restarted worker left behind
+    EVENT_SOFT_DELETE_THRESHOLD = int(os.environ.get('EVENT_SOFT_DELETE_THRESHOLD', 2000))
+    EVENT_PURGE_CHUNK_SIZE = int(os.environ.get('EVENT_PURGE_CHUNK_SIZE', 1000))
+    EVENT_PURGE_PAUSE = float(os.environ.get('EVENT_PURGE_PAUSE', 0.05))
@@ -1,9 +1,9 @@
 # eventhive/forms.py
 
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, SelectField, BooleanField, TextAreaField, RadioField
+from wtforms import StringField, PasswordField, SubmitField, SelectField, BooleanField, TextAreaField, RadioField, IntegerField
 from wtforms.fields import DateTimeLocalField  # ✅ Modern DateTimeLocalField for browser compatibility
-from wtforms.validators import DataRequired, Email, EqualTo, ValidationError
+from wtforms.validators import DataRequired, Email, EqualTo, ValidationError, Optional, NumberRange
 from models.models import User
 
 # --------------------------- Registration Form --------------------------- #
@@ -59,6 +59,9 @@ class EventForm(FlaskForm):
                                     validators=[DataRequired()])
     
     location = StringField('Location', validators=[DataRequired()])
+    
+    # Seats available; leave empty for an event without a limit
+    capacity = IntegerField('Capacity', validators=[Optional(), NumberRange(min=1)])
     submit = SubmitField('Create Event')
 
 # --------------------------- Feedback Form --------------------------- #
@@ -0,0 +1,74 @@
+# eventhive/gunicorn.conf.py
+"""
+gunicorn server profiles. gunicorn reads this file from the working directory,
+so `gunicorn` alone (as in the Procfile) starts the profile chosen by the environment:
+
+    SERVER_PROFILE       sync     one request at a time per worker (app:app, the default)
+                         gthread  GUNICORN_THREADS requests at a time per worker (app:app)
+                         asgi     async check-in endpoints, Flask on a thread pool (asgi:app)
+    WEB_CONCURRENCY      worker processes (default 2)
+    GUNICORN_THREADS     request threads per gthread worker (default 4)
+    MAX_REQUESTS         requests after which a worker is replaced (default 1000, 0 disables);
+    MAX_REQUESTS_JITTER  plus a random 0..jitter, so workers do not all restart at once
+    PRELOAD_APP          import the app once in the master and fork workers from it (default true)
+
+The database pools of each worker (the async engine's too, under asgi) are sized
+from the same variables in config.py, within DB_MAX_CONNECTIONS.
+"""
+
+import os
+
+PROFILES = {
+    'sync': {'worker_class': 'sync', 'wsgi_app': 'app:app'},
+    'gthread': {'worker_class': 'gthread', 'wsgi_app': 'app:app'},
+    'asgi': {'worker_class': 'uvicorn.workers.UvicornWorker', 'wsgi_app': 'asgi:app'},
+}
+
+profile = os.environ.get('SERVER_PROFILE', 'sync')
+if profile not in PROFILES:
+    raise RuntimeError(f"SERVER_PROFILE must be one of {', '.join(PROFILES)}, not {profile!r}")
+
+wsgi_app = PROFILES[profile]['wsgi_app']
+worker_class = PROFILES[profile]['worker_class']
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4)) if profile == 'gthread' else 1
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+timeout = 60
+
+# Recycle workers to bound slow memory growth, staggered by the jitter
+max_requests = int(os.environ.get('MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', max_requests // 10))
+
+# Workers share the preloaded app's memory copy-on-write and start faster
+preload_app = os.environ.get('PRELOAD_APP', 'true').lower() in ('1', 'true', 'yes')
+
+# Let config.py size the database pool for the threads that serve Flask in this profile
+os.environ['GUNICORN_THREADS'] = str(int(os.environ.get('ASGI_WSGI_THREADS', 10)) if profile == 'asgi' else threads)
+
+
+def _engines():
+    from app import app
+    from models.models import db
+    with app.app_context():
+        return list(db.engines.values())
+
+
+def when_ready(server):
+    if preload_app:
+        # Compile every template once here; forked workers inherit them ready to render
+        from app import app
+        from utils.template_cache import precompile_templates
+        compiled, seconds = precompile_templates(app)
+        server.log.info("Compiled %d templates in %.2fs", compiled, seconds)
+
+        # The master never serves requests; close anything the preloaded app opened
+        for engine in _engines():
+            engine.dispose()
+
+
+def post_fork(server, worker):
+    # Connections inherited from the master would be shared with it and with every
+    # other worker; drop them from this worker's pool without closing the parent's sockets
+    if preload_app:
+        for engine in _engines():
+            engine.dispose(close=False)
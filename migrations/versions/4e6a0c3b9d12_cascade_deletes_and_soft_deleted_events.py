@@ -0,0 +1,90 @@
+"""Cascade deletes in the database and soft-delete events
+
+Revision ID: 4e6a0c3b9d12
+Revises: a72bb6f60907
+Create Date: 2026-10-17 21:05:18.402317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e6a0c3b9d12'
+down_revision = 'a72bb6f60907'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, referred table, ON DELETE action)
+FOREIGN_KEYS = [
+    ('registrations', 'user_id', 'user', 'CASCADE'),
+    ('registrations', 'event_id', 'event', 'CASCADE'),
+    ('waitlist', 'user_id', 'user', 'CASCADE'),
+    ('waitlist', 'event_id', 'event', 'CASCADE'),
+    ('event_stats', 'event_id', 'event', 'CASCADE'),
+    ('feedback', 'user_id', 'user', 'CASCADE'),
+    ('feedback', 'event_id', 'event', 'CASCADE'),
+    ('event', 'organizer_id', 'user', 'SET NULL'),
+]
+
+# SQLite creates foreign keys without names; this lets batch mode drop them by a derived one
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+# Recreating the event table on SQLite drops the full-text search triggers (see 7f3b9e2d4c18)
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN "
+    "INSERT INTO event_fts (rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN "
+    "INSERT INTO event_fts (event_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); END",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_au AFTER UPDATE OF title, description, location ON event BEGIN "
+    "INSERT INTO event_fts (event_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); "
+    "INSERT INTO event_fts (rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+]
+
+
+def _replace_foreign_keys(ondelete):
+    """Recreates each foreign key in FOREIGN_KEYS with the ON DELETE action ondelete() returns for it."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in dict.fromkeys(table for table, _, _, _ in FOREIGN_KEYS):
+        existing = {(fk['constrained_columns'][0], fk['referred_table']): fk['name']
+                    for fk in inspector.get_foreign_keys(table)}
+        with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referred, action in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                name = f'fk_{table}_{column}_{referred}'
+                batch_op.drop_constraint(existing.get((column, referred)) or name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete(action))
+
+    if bind.dialect.name == 'sqlite' and inspector.has_table('event_fts'):
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_event_deleted_at'), ['deleted_at'], unique=False)
+
+    _replace_foreign_keys(lambda action: action)
+
+
+def downgrade():
+    _replace_foreign_keys(lambda action: None)
+
+    # Soft-deleted events would reappear once the column is gone
+    op.execute("DELETE FROM event WHERE deleted_at IS NOT NULL")
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_event_deleted_at'))
+        batch_op.drop_column('deleted_at')
+
+    if op.get_bind().dialect.name == 'sqlite' and sa.inspect(op.get_bind()).has_table('event_fts'):
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
@@ -0,0 +1,39 @@
+"""Add event stats table
+
+Revision ID: 5b7e2c91a4d3
+Revises: ea9e4c6240e6
+Create Date: 2026-10-17 10:12:31.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2c91a4d3'
+down_revision = 'ea9e4c6240e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_stats',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('registered_count', sa.Integer(), nullable=False),
+    sa.Column('attended_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+
+    # Backfill the counters from the existing registrations
+    op.execute(
+        "INSERT INTO event_stats (event_id, registered_count, attended_count) "
+        "SELECT event.id, COUNT(registrations.user_id), "
+        "COALESCE(SUM(CASE WHEN registrations.attended THEN 1 ELSE 0 END), 0) "
+        "FROM event LEFT OUTER JOIN registrations ON registrations.event_id = event.id "
+        "GROUP BY event.id"
+    )
+
+
+def downgrade():
+    op.drop_table('event_stats')
@@ -0,0 +1,68 @@
+"""Add full-text search index over events
+
+Revision ID: 7f3b9e2d4c18
+Revises: e819099f4ff9
+Create Date: 2026-10-17 17:12:40.127503
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3b9e2d4c18'
+down_revision = 'e819099f4ff9'
+branch_labels = None
+depends_on = None
+
+
+# SQLite: an external-content FTS5 table over event, kept in sync by triggers.
+# Note that batch_alter_table recreates the event table on SQLite, which drops
+# these triggers; later migrations that do so must create them again.
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE event_fts USING fts5("
+    "title, description, location, content='event', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER event_fts_ai AFTER INSERT ON event BEGIN "
+    "INSERT INTO event_fts (rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+    "CREATE TRIGGER event_fts_ad AFTER DELETE ON event BEGIN "
+    "INSERT INTO event_fts (event_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); END",
+    "CREATE TRIGGER event_fts_au AFTER UPDATE OF title, description, location ON event BEGIN "
+    "INSERT INTO event_fts (event_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); "
+    "INSERT INTO event_fts (rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+    "INSERT INTO event_fts (event_fts) VALUES ('rebuild')",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS event_fts_au",
+    "DROP TRIGGER IF EXISTS event_fts_ad",
+    "DROP TRIGGER IF EXISTS event_fts_ai",
+    "DROP TABLE IF EXISTS event_fts",
+]
+
+# PostgreSQL: a generated, weighted tsvector column (always in sync) with a GIN index
+POSTGRES_UPGRADE = [
+    "ALTER TABLE event ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX ix_event_search_vector ON event USING GIN (search_vector)",
+]
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_event_search_vector",
+    "ALTER TABLE event DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRES_UPGRADE}.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {'sqlite': SQLITE_DOWNGRADE, 'postgresql': POSTGRES_DOWNGRADE}.get(dialect, []):
+        op.execute(statement)
@@ -0,0 +1,54 @@
+"""Add updated_at to event, event_stats and feedback
+
+Revision ID: e819099f4ff9
+Revises: d3a8f2b61c05
+Create Date: 2026-10-17 15:20:41.440570
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e819099f4ff9'
+down_revision = 'd3a8f2b61c05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Add the columns as nullable, backfill them, then tighten them to NOT NULL
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('event_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE event SET updated_at = COALESCE(date_posted, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE event_stats SET updated_at = CURRENT_TIMESTAMP")
+    op.execute("UPDATE feedback SET updated_at = COALESCE(date_posted, CURRENT_TIMESTAMP)")
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_event_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('event_stats', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_event_stats_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('event_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_event_stats_updated_at'))
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_event_updated_at'))
+        batch_op.drop_column('updated_at')
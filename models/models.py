@@ -1,36 +1,156 @@
 # eventhive/models/models.py
 
+import sqlite3
+from flask import g
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, with_loader_criteria
 from datetime import datetime
+from utils.passwords import hash_password, needs_rehash, verify_password
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 registrations = db.Table('registrations',
-    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('event_id', db.Integer, db.ForeignKey('event.id'), primary_key=True),
-    db.Column('attended', db.Boolean, default=False, nullable=False)
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('event_id', db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('attended', db.Boolean, default=False, nullable=False),
+    # The primary key only serves lookups by user; this one serves attendee lists and counts
+    db.Index('ix_registrations_event_user', 'event_id', 'user_id', 'attended')
 )
+def insert_ignoring_conflicts(table, **values):
+    """
+    Insert a row unless it violates a primary key or unique constraint.
+    :return: True if the row was inserted.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(table.insert().values(**values))
+            return True
+        except IntegrityError:
+            return False
+    return db.session.execute(insert(table).values(**values).on_conflict_do_nothing()).rowcount > 0
+
 # Define the User model
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), index=True, unique=True, nullable=False)
     email = db.Column(db.String(120), index=True, unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(256))
     role = db.Column(db.String(20), default='Student', nullable=False) # Roles: Student, Organizer, Admin
     registered_events = db.relationship(
         'Event', secondary=registrations,
         backref=db.backref('attendees', lazy='dynamic'), lazy='dynamic')
+    def registered_event_ids(self):
+        """
+        Return the set of event IDs this user is registered for.
+        The set is loaded with a single query and cached for the current request.
+        """
+        cache = g.setdefault('registered_event_ids', {})
+        if self.id not in cache:
+            rows = db.session.query(registrations.c.event_id).filter(
+                registrations.c.user_id == self.id)
+            cache[self.id] = {event_id for (event_id,) in rows}
+        return cache[self.id]
+
     def is_registered(self, event):
         """Check if the user is registered for a specific event."""
-        return self.registered_events.filter(
-            registrations.c.event_id == event.id).count() > 0
+        return event.id in self.registered_event_ids()
+
+    def waitlisted_event_ids(self):
+        """
+        Return the set of event IDs this user is waitlisted for.
+        The set is loaded with a single query and cached for the current request.
+        """
+        cache = g.setdefault('waitlisted_event_ids', {})
+        if self.id not in cache:
+            rows = db.session.query(Waitlist.event_id).filter(Waitlist.user_id == self.id)
+            cache[self.id] = {event_id for (event_id,) in rows}
+        return cache[self.id]
+
+    def is_waitlisted(self, event):
+        """Check if the user is on the waitlist of a specific event."""
+        return event.id in self.waitlisted_event_ids()
+
+    def register_for(self, event):
+        """
+        Register the user for an event, or put them on its waitlist when it is full.
+        The seat is claimed with one conditional UPDATE of the event's counter,
+        so concurrent registrations can never overbook the event.
+        :return: 'registered', 'waitlisted', 'already_registered' or 'already_waitlisted'.
+        """
+        if not EventStats.claim_seat(event.id):
+            if self._has_registration(event.id):
+                return 'already_registered'
+            if not insert_ignoring_conflicts(Waitlist.__table__, user_id=self.id, event_id=event.id,
+                                             created_at=datetime.utcnow()):
+                return 'already_waitlisted'
+            self.waitlisted_event_ids().add(event.id)
+            return 'waitlisted'
+
+        if not insert_ignoring_conflicts(registrations, user_id=self.id, event_id=event.id, attended=False):
+            # A concurrent request (e.g. a double click) registered the user first
+            EventStats.adjust(event.id, registered=-1)
+            return 'already_registered'
+
+        db.session.execute(db.delete(Waitlist).where(
+            Waitlist.user_id == self.id, Waitlist.event_id == event.id))
+        self.registered_event_ids().add(event.id)
+        self.waitlisted_event_ids().discard(event.id)
+        return 'registered'
+
+    def unregister_from(self, event):
+        """
+        Unregister the user from an event, keep the cached ID set and counters in sync,
+        and hand the freed seat to the waitlist.
+        :return: The IDs of promoted users, or None if the user was not registered.
+        """
+        attended = db.session.query(registrations.c.attended).filter(
+            registrations.c.user_id == self.id,
+            registrations.c.event_id == event.id).scalar()
+        deleted = db.session.execute(registrations.delete().where(
+            registrations.c.user_id == self.id,
+            registrations.c.event_id == event.id)).rowcount
+        if not deleted:
+            return None
+
+        self.registered_event_ids().discard(event.id)
+        EventStats.adjust(event.id, registered=-1, attended=-1 if attended else 0)
+        return event.promote_waitlist()
+
+    def leave_waitlist(self, event):
+        """Remove the user from an event's waitlist. Returns whether they were on it."""
+        deleted = db.session.execute(db.delete(Waitlist).where(
+            Waitlist.user_id == self.id, Waitlist.event_id == event.id)).rowcount
+        self.waitlisted_event_ids().discard(event.id)
+        return deleted > 0
+
+    def _has_registration(self, event_id):
+        return db.session.query(db.exists().where(
+            registrations.c.user_id == self.id,
+            registrations.c.event_id == event_id)).scalar()
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """
+        Checks a password against the stored hash.
+        :raises VerifierBusy: If the bounded password verifier is saturated.
+        """
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Whether the stored hash predates the configured PASSWORD_HASH_METHOD."""
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -42,11 +162,237 @@ class Event(db.Model):
     description = db.Column(db.Text, nullable=False)
     date_posted = db.Column(db.DateTime, index=True, default=datetime.utcnow)
     event_date = db.Column(db.DateTime, index=True, nullable=False)
+    updated_at = db.Column(db.DateTime, index=True, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     location = db.Column(db.String(100), nullable=False)
-    organizer_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    organizer_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'))
+    capacity = db.Column(db.Integer, nullable=True)  # None means unlimited seats
+    # Set when a large event is deleted; queries stop seeing it while a background job purges its rows
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    __table_args__ = (db.Index('ix_event_organizer_event_date', 'organizer_id', 'event_date'),)
+
+    # Denormalized registration/attendance counters, deleted along with the event
+    stats = db.relationship('EventStats', uselist=False, cascade='all, delete-orphan')
+
+    def promote_waitlist(self):
+        """
+        Move waitlisted users into free seats, oldest first.
+        :return: The IDs of the promoted users.
+        """
+        return Event.promote_waitlists([self.id]).get(self.id, [])
+
+    @classmethod
+    def promote_waitlists(cls, event_ids):
+        """
+        Moves waitlisted users into the free seats of several events, oldest first,
+        with a fixed number of set-based statements however many seats are freed.
+        The counters of the events are locked first, so concurrent registrations
+        and promotions wait instead of claiming the same seats.
+        :return: A dict mapping each event with promotions to the promoted user IDs.
+        """
+        event_ids = set(event_ids)
+        if not event_ids:
+            return {}
+
+        locked = db.session.execute(
+            db.update(EventStats)
+            .where(EventStats.event_id.in_(event_ids))
+            .values(registered_count=EventStats.registered_count, updated_at=EventStats.updated_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if locked < len(event_ids):
+            # Events created before the counters existed get their rows first
+            counted = {event_id for (event_id,) in
+                       db.session.query(EventStats.event_id).filter(EventStats.event_id.in_(event_ids))}
+            EventStats.rebuild(list(event_ids - counted))
+
+        # Number the waiting users of each event in FIFO order, and keep as many as it has free seats
+        registered = db.exists().where(registrations.c.user_id == Waitlist.user_id,
+                                       registrations.c.event_id == Waitlist.event_id)
+        queue = (
+            db.select(Waitlist.id, Waitlist.user_id, Waitlist.event_id,
+                      db.func.row_number().over(partition_by=Waitlist.event_id, order_by=Waitlist.id)
+                      .label('position'))
+            .where(Waitlist.event_id.in_(event_ids), ~registered)
+            .subquery()
+        )
+        heads = db.session.execute(
+            db.select(queue.c.id, queue.c.user_id, queue.c.event_id)
+            .join(cls, cls.id == queue.c.event_id)
+            .join(EventStats, EventStats.event_id == queue.c.event_id)
+            .where(db.or_(cls.capacity.is_(None),
+                          queue.c.position <= cls.capacity - EventStats.registered_count))
+        ).all()
+        if not heads:
+            return {}
+
+        promoted = {}
+        for head in heads:
+            promoted.setdefault(head.event_id, []).append(head.user_id)
+        head_ids = [head.id for head in heads]
+        db.session.execute(registrations.insert().from_select(
+            ['user_id', 'event_id', 'attended'],
+            db.select(Waitlist.user_id, Waitlist.event_id, db.false()).where(Waitlist.id.in_(head_ids))
+        ))
+        db.session.execute(db.delete(Waitlist).where(Waitlist.id.in_(head_ids))
+                           .execution_options(synchronize_session=False))
+        EventStats.adjust_many({event_id: len(user_ids) for event_id, user_ids in promoted.items()})
+        return promoted
+
+    @classmethod
+    def delete_with_dependents(cls, event_id):
+        """
+        Deletes an event with its registrations, waitlist, feedback and counters
+        in a few set-based statements; the caller commits them as one transaction.
+        The foreign keys cascade too, but deleting the children explicitly also
+        covers databases that do not enforce them.
+        """
+        for statement in (
+            db.delete(registrations).where(registrations.c.event_id == event_id),
+            db.delete(Waitlist).where(Waitlist.event_id == event_id),
+            db.delete(Feedback).where(Feedback.event_id == event_id),
+            db.delete(EventStats).where(EventStats.event_id == event_id),
+            db.delete(cls).where(cls.id == event_id),
+        ):
+            db.session.execute(statement.execution_options(synchronize_session=False))
 
     def __repr__(self):
         return f'<Event {self.title}>'
+
+# Define the Waitlist model
+class Waitlist(db.Model):
+    """Users waiting for a seat at a full event; promoted in ID (FIFO) order."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'event_id', name='uq_waitlist_user_event'),)
+
+    def __repr__(self):
+        return f'<Waitlist User {self.user_id} for Event {self.event_id}>'
+
+# Define the EventStats model
+class EventStats(db.Model):
+    """
+    Per-event registration and attendance counters, maintained incrementally
+    in the same transaction as every change to the registrations table.
+    """
+    __tablename__ = 'event_stats'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), primary_key=True)
+    registered_count = db.Column(db.Integer, default=0, nullable=False)
+    attended_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, index=True, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def adjust(cls, event_id, registered=0, attended=0):
+        """
+        Atomically adds the given deltas to an event's counters.
+        Creates the row from the registrations table if it does not exist yet.
+        """
+        result = db.session.execute(
+            db.update(cls)
+            .where(cls.event_id == event_id)
+            .values(registered_count=cls.registered_count + registered,
+                    attended_count=cls.attended_count + attended)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.session.flush()
+            db.session.execute(db.insert(cls).from_select(
+                ['event_id', 'registered_count', 'attended_count'],
+                cls._counts_query().where(registrations.c.event_id == event_id)
+                .group_by(registrations.c.event_id)
+            ))
+
+    @classmethod
+    def adjust_many(cls, registered):
+        """
+        Atomically adds per-event deltas to the registration counters with one UPDATE.
+        :param registered: A dict mapping event IDs to the number of seats taken (or freed, if negative).
+        """
+        db.session.execute(
+            db.update(cls)
+            .where(cls.event_id.in_(registered))
+            .values(registered_count=cls.registered_count + db.case(registered, value=cls.event_id, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    def claim_seat(cls, event_id):
+        """
+        Atomically takes one seat of an event if it has room left.
+        The capacity check and the increment are one conditional UPDATE, so it holds
+        under concurrent writers (row lock on PostgreSQL, write lock on SQLite).
+        :return: True if a seat was taken.
+        """
+        capacity = db.select(Event.capacity).where(Event.id == event_id).scalar_subquery()
+        stmt = (
+            db.update(cls)
+            .where(cls.event_id == event_id,
+                   db.or_(capacity.is_(None), cls.registered_count < capacity))
+            .values(registered_count=cls.registered_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.execute(stmt).rowcount:
+            return True
+        if db.session.get(cls, event_id) is not None:
+            return False
+
+        # Events created before the counters existed get their row first
+        cls.rebuild([event_id])
+        return db.session.execute(stmt).rowcount > 0
+
+    @classmethod
+    def remove_user(cls, user_id):
+        """Subtracts every registration of a user from the counters of the affected events."""
+        attended = db.select(db.case((registrations.c.attended, 1), else_=0)).where(
+            registrations.c.user_id == user_id,
+            registrations.c.event_id == cls.event_id).scalar_subquery()
+        db.session.execute(
+            db.update(cls)
+            .where(cls.event_id.in_(
+                db.select(registrations.c.event_id).where(registrations.c.user_id == user_id)))
+            .values(registered_count=cls.registered_count - 1,
+                    attended_count=cls.attended_count - attended)
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    def rebuild(cls, event_ids=None):
+        """Recomputes the counters of the given events (or of every event) from scratch."""
+        for statement in cls.rebuild_statements(event_ids):
+            db.session.execute(statement)
+
+    @classmethod
+    def rebuild_statements(cls, event_ids=None):
+        """Returns the DELETE and INSERT ... SELECT that rebuild() runs, for callers with their own session."""
+        delete = db.delete(cls)
+        counts = db.select(
+            Event.id,
+            db.func.count(registrations.c.user_id),
+            db.func.coalesce(db.func.sum(db.case((registrations.c.attended, 1), else_=0)), 0),
+        ).select_from(Event).outerjoin(registrations, registrations.c.event_id == Event.id)
+        if event_ids is not None:
+            delete = delete.where(cls.event_id.in_(event_ids))
+            counts = counts.where(Event.id.in_(event_ids))
+
+        return (
+            delete.execution_options(synchronize_session=False),
+            db.insert(cls).from_select(['event_id', 'registered_count', 'attended_count'], counts.group_by(Event.id)),
+        )
+
+    @staticmethod
+    def _counts_query():
+        return db.select(
+            registrations.c.event_id,
+            db.func.count(),
+            db.func.coalesce(db.func.sum(db.case((registrations.c.attended, 1), else_=0)), 0),
+        )
+
+    def __repr__(self):
+        return f'<EventStats for Event {self.event_id}>'
 # eventhive/models/models.py
 # ... (keep all existing imports and models)
 
@@ -55,14 +401,38 @@ class Feedback(db.Model):
     rating = db.Column(db.Integer, nullable=False) # e.g., 1-5 stars
     comment = db.Column(db.Text, nullable=True)
     date_posted = db.Column(db.DateTime, index=True, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys to link feedback to a user and an event
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), nullable=False)
     
     # Relationships
     author = db.relationship('User')
     event = db.relationship('Event')
 
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'event_id', name='uq_feedback_user_event'),
+        db.Index('ix_feedback_event_date_posted', 'event_id', 'date_posted'),
+    )
+
     def __repr__(self):
-        return f'<Feedback for Event {self.event_id} by User {self.user_id}>'
\ No newline at end of file
+        return f'<Feedback for Event {self.event_id} by User {self.user_id}>'
+
+
+@sa_event.listens_for(Session, 'do_orm_execute')
+def _hide_deleted_events(execute_state):
+    """Filters soft-deleted events out of every ORM query, unless it asks for include_deleted."""
+    if (execute_state.is_select and not execute_state.is_column_load and not execute_state.is_relationship_load
+            and not execute_state.execution_options.get('include_deleted', False)):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Event, Event.deleted_at.is_(None), include_aliases=True))
+
+
+@sa_event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores foreign keys, and so their ON DELETE actions, unless asked per connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
@@ -0,0 +1,248 @@
+# eventhive/routes/async_qr.py
+
+import json
+import logging
+from collections import Counter
+from itsdangerous import BadSignature
+from sqlalchemy import select, tuple_, update
+from werkzeug.http import parse_cookie
+from models.models import Event, EventStats, User, registrations
+from routes.qr import SUCCESS_STATUSES, check_in_message, parse_scans, report_outcomes
+from utils.async_db import get_async_sessionmaker
+from utils.qr_utils import parse_qr_payload
+from utils.roster import get_roster_cache
+from utils.user_cache import get_user_cache
+
+logger = logging.getLogger(__name__)
+
+# Larger request bodies are refused; a full batch of signed tokens is far smaller
+MAX_BODY_BYTES = 1024 * 1024
+
+# The Flask views this app serves, by endpoint
+ENDPOINTS = ('qr.verify_attendance', 'qr.verify_attendance_batch')
+
+
+class HTTPError(Exception):
+    """Ends a request early with a JSON error body."""
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = list(headers)
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise HTTPError(400, 'The client went away.')
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, 'Request body too large.')
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode('ascii')), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def check_in(session, pairs):
+    """
+    Async counterpart of routes.qr.check_in, with the same outcomes.
+
+    It does not use the roster cache: registrations are read with one query per
+    request, which costs little while the event loop serves other scanners.
+    :return: A dict mapping each pair to a (status, username, event title) tuple.
+    """
+    outcomes = {}
+    if not pairs:
+        return outcomes
+    pairs = list(pairs)
+    key = tuple_(registrations.c.user_id, registrations.c.event_id)
+
+    # One read for both the event titles and the registrations of the scanned pairs
+    result = await session.execute(
+        select(Event.id, Event.title, registrations.c.user_id, User.username, registrations.c.attended)
+        .outerjoin(registrations, (registrations.c.event_id == Event.id) & key.in_(pairs))
+        .outerjoin(User, User.id == registrations.c.user_id)
+        .where(Event.id.in_({event_id for _, event_id in pairs})))
+    titles = {}
+    registered = {}
+    for event_id, title, user_id, username, attended in result:
+        titles[event_id] = title
+        if user_id is not None:
+            registered[(user_id, event_id)] = (username, attended)
+
+    to_mark = {}
+    for pair in pairs:
+        title = titles.get(pair[1])
+        username, attended = registered.get(pair, (None, False))
+        if title is None:
+            outcomes[pair] = ('not_registered', None, None)
+        elif username is None:
+            outcomes[pair] = ('not_registered', None, title)
+        elif attended:
+            outcomes[pair] = ('already_checked_in', username, title)
+        else:
+            to_mark[pair] = (username, title)
+
+    if not to_mark:
+        return outcomes
+
+    updated = (await session.execute(
+        update(registrations)
+        .where(key.in_(list(to_mark)), registrations.c.attended == False)  # noqa: E712
+        .values(attended=True)
+    )).rowcount
+
+    per_event = Counter(event_id for _, event_id in to_mark)
+    existing = set(to_mark)
+    recount = updated != len(to_mark)
+    if recount:
+        # Another scanner checked some of them in first, or a registration is gone
+        # since it was read; resolve those pairs before reporting them
+        result = await session.execute(
+            select(registrations.c.user_id, registrations.c.event_id).where(key.in_(list(to_mark))))
+        existing = {tuple(row) for row in result}
+    else:
+        for event_id, count in per_event.items():
+            result = await session.execute(
+                update(EventStats)
+                .where(EventStats.event_id == event_id)
+                .values(attended_count=EventStats.attended_count + count)
+                .execution_options(synchronize_session=False))
+            recount = recount or result.rowcount == 0
+    if recount:
+        # Fewer rows were updated than scanned, or an event has no counters yet
+        for statement in EventStats.rebuild_statements(list(per_event)):
+            await session.execute(statement)
+
+    for pair, (username, title) in to_mark.items():
+        outcomes[pair] = ('checked_in' if pair in existing else 'not_registered', username, title)
+    return outcomes
+
+
+class CheckinApp:
+    """
+    An ASGI app serving the scanner's check-in endpoints of routes/qr.py with
+    async SQLAlchemy, so one worker can keep hundreds of scans in flight while
+    they wait on the database. Organizers are recognised by the Flask app's
+    session cookie; where the Flask views would redirect to a page, this app
+    answers 401 or 403 with a JSON message.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+        handlers = {'qr.verify_attendance': self.verify_attendance,
+                    'qr.verify_attendance_batch': self.verify_attendance_batch}
+        self.routes = {rule.rule: handlers[rule.endpoint]
+                       for rule in flask_app.url_map.iter_rules() if rule.endpoint in ENDPOINTS}
+
+    def handles(self, scope):
+        return scope['type'] == 'http' and scope['path'] in self.routes
+
+    async def __call__(self, scope, receive, send):
+        try:
+            if scope['method'] != 'POST':
+                raise HTTPError(405, 'Method not allowed.', [(b'allow', b'POST')])
+            await self.authenticate(scope)
+            status, payload = await self.routes[scope['path']](await read_body(receive))
+            headers = []
+        except HTTPError as e:
+            status, payload, headers = e.status, {'success': False, 'message': e.message}, e.headers
+        except Exception:
+            logger.exception("Check-in request to %s failed", scope['path'])
+            status, payload, headers = 500, {'success': False, 'message': 'An error occurred.'}, []
+        await send_json(send, status, payload, headers)
+
+    async def authenticate(self, scope):
+        """
+        Returns the cached (id, username, email, role) of the logged-in organizer, or raises HTTPError.
+        Users are cached in the Flask app's per-worker user cache, so deleting a
+        user in this worker (see invalidate_user) revokes their access at once.
+        """
+        cookie = '; '.join(value.decode('latin-1') for name, value in scope['headers'] if name == b'cookie')
+        value = parse_cookie(cookie).get(self.config['SESSION_COOKIE_NAME'])
+        try:
+            max_age = int(self.config['PERMANENT_SESSION_LIFETIME'].total_seconds())
+            session = self.serializer.loads(value, max_age=max_age) if value else {}
+        except BadSignature:
+            session = {}
+        user_id = session.get('_user_id')
+        if not user_id:
+            raise HTTPError(401, 'Please log in to access this page.')
+
+        user_id = int(user_id)
+        with self.flask_app.app_context():
+            cache = get_user_cache()
+        user = cache.get(user_id) if cache is not None else None
+        if user is None:
+            async with get_async_sessionmaker(self.config)() as db_session:
+                row = (await db_session.execute(
+                    select(User.id, User.username, User.email, User.role).where(User.id == user_id))).first()
+            if row is None:
+                raise HTTPError(401, 'Please log in to access this page.')
+            user = tuple(row)
+            if cache is not None:
+                cache.set(user_id, user)
+
+        if user[3] != 'Organizer':
+            raise HTTPError(403, 'Access denied. You need to be an Organizer to view this page.')
+        return user
+
+    async def check_in(self, pairs):
+        async with get_async_sessionmaker(self.config)() as session:
+            async with session.begin():
+                outcomes = await check_in(session, pairs)
+
+        # The Flask views in this worker may still have these registrations cached
+        with self.flask_app.app_context():
+            rosters = get_roster_cache()
+            for pair, (status, _, _) in outcomes.items():
+                if status == 'not_registered':
+                    rosters.discard(*pair)
+        return outcomes
+
+    async def verify_attendance(self, body):
+        """Verifies a scanned QR token and marks the attendance."""
+        try:
+            # Token signatures are checked with the Flask app's key
+            with self.flask_app.app_context():
+                pair = parse_qr_payload(json.loads(body).get('qr_data'))
+        except (AttributeError, TypeError, ValueError):
+            return 200, {'success': False, 'message': 'Invalid QR Code.'}
+
+        status = (await self.check_in({pair}))[pair]
+        return 200, {'success': status[0] in SUCCESS_STATUSES, 'message': check_in_message(*status)}
+
+    async def verify_attendance_batch(self, body):
+        """Verifies a batch of queued scans with at most one set-based UPDATE."""
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        scans = data.get('scans') if isinstance(data, dict) else None
+        if not isinstance(scans, list):
+            return 400, {'success': False, 'message': 'Expected a list of scans.'}
+        if len(scans) > self.config['CHECKIN_BATCH_MAX']:
+            return 413, {'success': False, 'message': 'Too many scans in one batch.'}
+
+        with self.flask_app.app_context():
+            results, pairs = parse_scans(scans)
+        report_outcomes(results, await self.check_in(pairs))
+        return 200, {'success': True, 'results': results}
@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, flash, redirect, url_for, request
 from flask_login import login_user, logout_user, current_user
-from forms import LoginForm, RegistrationForm
 from models.models import db, User
+from utils.passwords import VerifierBusy
 
 # Create a Blueprint
 auth_bp = Blueprint('auth', __name__)
@@ -14,13 +14,26 @@ def login():
     if current_user.is_authenticated:
         return redirect(url_for('events.index'))
     
+    from forms import LoginForm
+    
     form = LoginForm()
     if form.validate_on_submit():
         # Find the user by email
         user = User.query.filter_by(email=form.email.data).first()
         
-        # Verify credentials
-        if user and user.check_password(form.password.data):
+        # Verify credentials; under a login storm the bounded verifier may turn us away
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+        except VerifierBusy:
+            flash('Too many people are signing in right now. Please try again in a moment.', 'warning')
+            return render_template('login.html', title='Login', form=form), 503
+
+        if valid:
+            # Upgrade hashes made under an older policy while the password is at hand
+            if user.password_needs_rehash():
+                user.set_password(form.password.data)
+                db.session.commit()
+
             login_user(user, remember=form.remember_me.data)
             flash('Logged in successfully!', 'success')
             
@@ -48,6 +61,8 @@ def register():
     if current_user.is_authenticated:
         return redirect(url_for('events.index'))
         
+    from forms import RegistrationForm
+        
     form = RegistrationForm()
     if form.validate_on_submit():
         # ✅ Updated: include the role from the dropdown
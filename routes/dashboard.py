@@ -1,35 +1,68 @@
 # eventhive/routes/dashboard.py
 
-from flask import Blueprint, render_template, redirect, url_for, flash, abort
+from flask import Blueprint, render_template, redirect, url_for, flash, abort, request, current_app, jsonify
 from flask_login import login_required, current_user
+from utils.conditional import conditional_get
 from utils.decorators import role_required
-from models.models import User, Event, db, registrations, Feedback
+from utils.export import stream_export
+from utils.pagination import paginate_keyset
+from utils.qr_utils import qr_payload, qr_digest
+from utils.qr_worker import get_qr_worker
+from utils.render_cache import invalidate_render_cache, render_cache_stats
+from utils.roster import get_roster_cache
+from utils.user_cache import invalidate_user, user_cache_stats
+from models.models import User, Event, EventStats, db, registrations, Feedback
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 
 # --------------------------- Blueprint --------------------------- #
 dashboard_bp = Blueprint('dashboard', __name__)
 
 # --------------------------- ADMIN DASHBOARD --------------------------- #
+def admin_dashboard_validator():
+    """Changes whenever a user is added or removed, or an event or its counters change."""
+    return tuple(db.session.execute(db.select(
+        db.select(func.count(User.id)).scalar_subquery(),
+        db.select(func.max(User.id)).scalar_subquery(),
+        db.select(func.count(Event.id)).scalar_subquery(),
+        db.select(func.max(Event.updated_at)).scalar_subquery(),
+        db.select(func.max(EventStats.updated_at)).scalar_subquery(),
+    )).one())
+
 @dashboard_bp.route('/admin_dashboard')
 @login_required
 @role_required('Admin')
+@conditional_get(admin_dashboard_validator)
 def admin_dashboard():
-    # Keep existing queries
-    users = User.query.all()
-    events = Event.query.order_by(Event.date_posted.desc()).all()
+    per_page = current_app.config['ADMIN_ROWS_PER_PAGE']
+
+    # Totals for the stat cards come from COUNT, not from loading every row
+    total_users = db.session.query(func.count(User.id)).scalar()
+    total_events = db.session.query(func.count(Event.id)).scalar()
+
+    # Keyset-paginated column projections for the management tables
+    users = paginate_keyset(
+        db.session.query(User.id, User.username, User.email, User.role),
+        [User.id],
+        after=request.args.get('users_after'),
+        before=request.args.get('users_before'),
+        per_page=per_page,
+    )
+    events = paginate_keyset(
+        db.session.query(Event.id, Event.title, Event.location, Event.event_date),
+        [Event.id],
+        after=request.args.get('events_after'),
+        before=request.args.get('events_before'),
+        per_page=per_page,
+        descending=True,
+    )
     
-    # --- THIS IS THE NEW, MORE EXPLICIT QUERY ---
+    # Registration counts are read from the denormalized event_stats table
     event_analytics = db.session.query(
         Event.title, 
-        func.count(registrations.c.user_id) # Count user IDs from the registration table
-    ).select_from(Event).join(
-        registrations, 
-        registrations.c.event_id == Event.id, # Explicitly state the join
-        isouter=True # This makes it a LEFT JOIN (to include events with 0)
-    ).group_by(Event.id, Event.title).all()
-    
-    print(f"DEBUG: Chart data is: {event_analytics}")
+        func.coalesce(EventStats.registered_count, 0)
+    ).select_from(Event).outerjoin(EventStats).order_by(Event.id).all()
     
     # Prepare data for Chart.js
     chart_labels = [event[0] for event in event_analytics]
@@ -40,41 +73,47 @@ def admin_dashboard():
                            title='Admin Dashboard', 
                            users=users, 
                            events=events,
+                           total_users=total_users,
+                           total_events=total_events,
                            chart_labels=chart_labels, 
                            chart_data=chart_data)
 
+@dashboard_bp.route('/admin_dashboard/cache_stats')
+@login_required
+@role_required('Admin')
+def cache_stats():
+    """Returns hit/miss counters of this worker's in-process caches."""
+    return jsonify({'user_loader': user_cache_stats(), 'render': render_cache_stats()})
+
 # --------------------------- ORGANIZER DASHBOARD --------------------------- #
+def organizer_dashboard_validator():
+    """Changes whenever one of the organizer's events or its counters change."""
+    return tuple(db.session.query(
+        func.count(Event.id), func.max(Event.updated_at), func.max(EventStats.updated_at)
+    ).select_from(Event).outerjoin(EventStats).filter(Event.organizer_id == current_user.id).one())
+
 @dashboard_bp.route('/organizer_dashboard')
 @login_required
 @role_required('Organizer')
+@conditional_get(organizer_dashboard_validator)
 def organizer_dashboard():
     """Organizer dashboard displaying events created by the current organizer."""
     events = (
-        Event.query.filter_by(organizer_id=current_user.id)
+        Event.query.options(joinedload(Event.stats))
+        .filter_by(organizer_id=current_user.id)
         .order_by(Event.event_date.desc())
         .all()
     )
 
-    # Prepare attendee + feedback data for each event
-    event_data = []
-    for event in events:
-        # Registered attendees
-        attendees = (
-            db.session.query(User, registrations.c.attended)
-            .join(registrations, User.id == registrations.c.user_id)
-            .filter(registrations.c.event_id == event.id)
-            .all()
-        )
-
-        # Feedback for this event
-        feedbacks = Feedback.query.filter_by(event_id=event.id).all()
-
-        # Combine all event data
-        event_data.append({
+    # Attendee and feedback panels are fetched per accordion on demand
+    event_data = [
+        {
             'event': event,
-            'attendees': attendees,
-            'feedbacks': feedbacks
-        })
+            'registered_count': event.stats.registered_count if event.stats else 0,
+            'attended_count': event.stats.attended_count if event.stats else 0,
+        }
+        for event in events
+    ]
 
     return render_template(
         'organizer_dashboard.html',
@@ -82,18 +121,153 @@ def organizer_dashboard():
         event_data=event_data
     )
 
+def event_panel_validator(event_id):
+    """Changes whenever someone registers, unregisters or checks in, or feedback arrives."""
+    return tuple(db.session.execute(db.select(
+        db.select(EventStats.updated_at).where(EventStats.event_id == event_id).scalar_subquery(),
+        db.select(func.count(Feedback.id)).where(Feedback.event_id == event_id).scalar_subquery(),
+        db.select(func.max(Feedback.updated_at)).where(Feedback.event_id == event_id).scalar_subquery(),
+    )).one())
+
+@dashboard_bp.route('/organizer_dashboard/events/<int:event_id>/panel')
+@login_required
+@role_required('Organizer')
+@conditional_get(event_panel_validator)
+def organizer_event_panel(event_id):
+    """Renders the attendee and feedback panel for one of the organizer's events."""
+    event = Event.query.get_or_404(event_id)
+    if event.organizer_id != current_user.id:
+        abort(403)
+
+    attendees, feedbacks = load_event_panels([event.id])
+    return render_template(
+        'organizer_event_panel.html',
+        event_id=event.id,
+        attendees=attendees[event.id],
+        feedbacks=feedbacks[event.id]
+    )
+
+def own_event_or_404(event_id):
+    """Returns the title of one of the current organizer's events, aborting otherwise."""
+    event = db.session.query(Event.organizer_id, Event.title).filter(Event.id == event_id).first()
+    if event is None:
+        abort(404)
+    if event.organizer_id != current_user.id:
+        abort(403)
+    return event.title
+
+@dashboard_bp.route('/organizer_dashboard/events/<int:event_id>/attendees.<any(csv, jsonl):fmt>')
+@login_required
+@role_required('Organizer')
+def export_attendees(event_id, fmt):
+    """Streams an event's attendee list, with check-in status, as CSV or JSON lines (?gzip=1 to compress)."""
+    own_event_or_404(event_id)
+    statement = (
+        db.select(User.id, User.username, User.email, registrations.c.attended)
+        .join(registrations, registrations.c.user_id == User.id)
+        .where(registrations.c.event_id == event_id)
+        .order_by(registrations.c.user_id)
+    )
+    return stream_export(statement, ['user_id', 'username', 'email', 'attended'], fmt,
+                         f"event{event_id}_attendees", compress=request.args.get('gzip') == '1')
+
+@dashboard_bp.route('/organizer_dashboard/events/<int:event_id>/feedback.<any(csv, jsonl):fmt>')
+@login_required
+@role_required('Organizer')
+def export_feedback(event_id, fmt):
+    """Streams an event's feedback, newest first, as CSV or JSON lines (?gzip=1 to compress)."""
+    own_event_or_404(event_id)
+    statement = (
+        db.select(Feedback.id, Feedback.date_posted, Feedback.rating, Feedback.comment, User.username)
+        .join(User, User.id == Feedback.user_id)
+        .where(Feedback.event_id == event_id)
+        .order_by(Feedback.date_posted.desc())
+    )
+    return stream_export(statement, ['feedback_id', 'date_posted', 'rating', 'comment', 'username'], fmt,
+                         f"event{event_id}_feedback", compress=request.args.get('gzip') == '1')
+
+def load_event_panels(event_ids):
+    """
+    Loads attendees and feedback for several events with two batched queries.
+    :param event_ids: The IDs of the events to load.
+    :return: Two dicts mapping each event ID to its attendee rows and Feedback objects.
+    """
+    attendees = {event_id: [] for event_id in event_ids}
+    feedbacks = {event_id: [] for event_id in event_ids}
+    if not event_ids:
+        return attendees, feedbacks
+
+    attendee_rows = (
+        db.session.query(registrations.c.event_id, User.username, User.email, registrations.c.attended)
+        .join(User, User.id == registrations.c.user_id)
+        .filter(registrations.c.event_id.in_(event_ids))
+        .order_by(registrations.c.event_id, User.username)
+        .all()
+    )
+    for row in attendee_rows:
+        attendees[row.event_id].append(row)
+
+    feedback_rows = (
+        Feedback.query.options(joinedload(Feedback.author))
+        .filter(Feedback.event_id.in_(event_ids))
+        .order_by(Feedback.date_posted.desc())
+        .all()
+    )
+    for fb in feedback_rows:
+        feedbacks[fb.event_id].append(fb)
+
+    return attendees, feedbacks
+
 # --------------------------- STUDENT DASHBOARD --------------------------- #
+def student_dashboard_validator():
+    """Changes whenever the student's registrations or their events change, or an event finishes."""
+    # The IDs themselves, not a count: swapping one registration for another keeps the count
+    registered = (
+        db.session.query(Event.id, Event.updated_at, Event.event_date)
+        .join(registrations, registrations.c.event_id == Event.id)
+        .filter(registrations.c.user_id == current_user.id)
+        .order_by(Event.id)
+        .all()
+    )
+    now = datetime.now()
+    return (
+        tuple(row.id for row in registered),
+        max((row.updated_at for row in registered), default=None),
+        sum(1 for row in registered if row.event_date < now),
+    )
+
 @dashboard_bp.route('/student_dashboard')
 @login_required
 @role_required('Student')
+@conditional_get(student_dashboard_validator)
 def student_dashboard():
     """Student dashboard showing registered events."""
-    registered_events = current_user.registered_events.order_by(Event.event_date.asc()).all()
+    registered_events = (
+        Event.query.join(registrations, registrations.c.event_id == Event.id)
+        .filter(registrations.c.user_id == current_user.id)
+        .order_by(Event.event_date.asc())
+        .all()
+    )
+
+    # Content digests version the QR image URLs so they can be cached forever
+    qr_payloads = {
+        event.id: qr_payload(current_user.id, event.id)
+        for event in registered_events
+    }
+    qr_versions = {event_id: qr_digest(data) for event_id, data in qr_payloads.items()}
+
+    # Images still queued on the background worker are shown as placeholders
+    qr_pending = set()
+    if current_app.config['QR_PREGENERATE']:
+        worker = get_qr_worker()
+        qr_pending = {event_id for event_id, data in qr_payloads.items() if worker.status(data) == 'pending'}
 
     return render_template(
         'student_dashboard.html',
         title='My Dashboard',
         events=registered_events,
+        qr_versions=qr_versions,
+        qr_pending=qr_pending,
         datetime=datetime  # Pass datetime to template for comparisons
     )
 
@@ -110,15 +284,23 @@ def delete_user(user_id):
         flash('You cannot delete your own account.', 'danger')
         abort(403)
 
-    # Delete associated feedbacks
-    Feedback.query.filter_by(user_id=user.id).delete()
+    # Take the user's registrations out of the event counters
+    event_ids = [event_id for (event_id,) in
+                 db.session.query(registrations.c.event_id).filter_by(user_id=user.id)]
+    EventStats.remove_user(user.id)
+
+    # One statement; the database cascades it to the user's registrations, waitlist
+    # entries and feedback, and leaves the events they organized without an organizer
+    username = user.username
+    db.session.execute(db.delete(User).where(User.id == user.id).execution_options(synchronize_session=False))
 
-    # Remove from registrations
-    db.session.query(registrations).filter_by(user_id=user.id).delete()
+    # Hand the freed seats to the waitlists, all events at once
+    Event.promote_waitlists(event_ids)
 
-    # Delete the user
-    db.session.delete(user)
     db.session.commit()
+    invalidate_user(user_id)
+    get_roster_cache().invalidate()
+    invalidate_render_cache()
 
-    flash(f'User {user.username} has been deleted successfully.', 'success')
+    flash(f'User {username} has been deleted successfully.', 'success')
     return redirect(url_for('dashboard.admin_dashboard'))
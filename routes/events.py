@@ -1,17 +1,24 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, current_app, abort
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app, abort, request, jsonify
 from flask_login import login_required, current_user
-from models.models import db, Event,Feedback
-from forms import EventForm,FeedbackForm
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from models.models import db, Event, EventStats, Feedback, Waitlist
 from datetime import datetime
+from utils.conditional import conditional_get
 from utils.decorators import role_required
-from utils.qr_utils import generate_qr_code
-from utils.decorators import role_required
+from utils.pagination import paginate_keyset
+from utils.purge import get_event_purger, soft_delete_event
+from utils.qr_utils import generate_qr_code, qr_payload
+from utils.render_cache import cached_page, invalidate_render_cache
+from utils.roster import get_roster_cache
+from utils.search import autocomplete_titles, search_events_query
 # Create a Blueprint
 events_bp = Blueprint('events', __name__)
 
 # ------------------------- HOMEPAGE -------------------------
 @events_bp.route('/')
 @events_bp.route('/index')
+@cached_page(shared_roles=('Admin', 'Organizer', 'Student'))
 def index():
     """Renders the homepage with a few upcoming events."""
     events = Event.query.order_by(Event.event_date.asc()).limit(3).all()
@@ -19,11 +26,74 @@ def index():
 
 
 # ------------------------- EVENT LIST -------------------------
+def events_list_validator():
+    """Changes whenever an event or its seat count changes, or the student's waitlist does."""
+    columns = [
+        db.select(func.count(Event.id)).scalar_subquery(),
+        db.select(func.max(Event.updated_at)).scalar_subquery(),
+        db.select(func.max(EventStats.updated_at)).scalar_subquery(),
+    ]
+    if current_user.is_authenticated and current_user.role == 'Student':
+        own_waitlist = db.select(func.max(Waitlist.id)).where(Waitlist.user_id == current_user.id)
+        columns += [own_waitlist.with_only_columns(func.count(Waitlist.id)).scalar_subquery(),
+                    own_waitlist.scalar_subquery()]
+    return tuple(db.session.execute(db.select(*columns)).one())
+
+
 @events_bp.route('/events')
+@conditional_get(events_list_validator)
+@cached_page(shared_roles=('Admin', 'Organizer'))
 def events_list():
-    """Renders the full list of events."""
-    all_events = Event.query.order_by(Event.event_date.asc()).all()
-    return render_template('events_list.html', title='Upcoming Events', events=all_events)
+    """Renders the list of events, one keyset page at a time."""
+    # Only the columns the cards show; the description is truncated in SQL.
+    query = db.session.query(
+        Event.id,
+        Event.title,
+        Event.location,
+        Event.event_date,
+        Event.capacity,
+        func.substr(Event.description, 1, 101).label('description'),
+        func.coalesce(EventStats.registered_count, 0).label('registered_count'),
+    ).outerjoin(EventStats)
+    page = paginate_keyset(
+        query, [Event.event_date, Event.id],
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=current_app.config['EVENTS_PER_PAGE'],
+    )
+    return render_template('events_list.html', title='Upcoming Events', events=page.items, page=page)
+
+
+# ------------------------- SEARCH -------------------------
+@events_bp.route('/events/search')
+@conditional_get(events_list_validator)
+def search():
+    """Renders the events matching a full-text query, best matches first."""
+    text = request.args.get('q', '').strip()
+    query, ranked = search_events_query(text)
+    if query is None:
+        return redirect(url_for('events.events_list'))
+
+    page = paginate_keyset(
+        query, [ranked.c.rank, ranked.c.id],
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=current_app.config['EVENTS_PER_PAGE'],
+    )
+    return render_template('events_list.html', title=f'Search: {text}', events=page.items, page=page,
+                           search_query=text)
+
+
+@events_bp.route('/events/autocomplete')
+def autocomplete():
+    """Returns event titles starting with the typed words, for the search box."""
+    text = request.args.get('q', '')
+    suggestions = autocomplete_titles(text, current_app.config['SEARCH_AUTOCOMPLETE_LIMIT']) if len(text.strip()) >= 2 else []
+    response = jsonify(suggestions)
+    # Keystrokes repeat the same prefixes; let the browser reuse answers briefly
+    response.cache_control.public = True
+    response.cache_control.max_age = 30
+    return response
 
 
 # ------------------------- CREATE EVENT -------------------------
@@ -32,6 +102,7 @@ def events_list():
 @role_required('Admin', 'Organizer')
 def create_event():
     """Handles event creation."""
+    from forms import EventForm
     form = EventForm()
     if form.validate_on_submit():
         event = Event(
@@ -39,10 +110,13 @@ def create_event():
             description=form.description.data,
             event_date=form.event_date.data,
             location=form.location.data,
-            organizer_id=current_user.id
+            organizer_id=current_user.id,
+            capacity=form.capacity.data,
+            stats=EventStats()
         )
         db.session.add(event)
         db.session.commit()
+        invalidate_render_cache()
         flash('Your event has been created!', 'success')
         return redirect(url_for('events.events_list'))
     
@@ -61,6 +135,8 @@ def edit_event(event_id):
         flash('You do not have permission to edit this event.', 'danger')
         abort(403)
 
+    from forms import EventForm
+
     form = EventForm(obj=event)  # Pre-fill with existing event data
 
     if form.validate_on_submit():
@@ -69,8 +145,17 @@ def edit_event(event_id):
         event.description = form.description.data
         event.event_date = form.event_date.data
         event.location = form.location.data
+        event.capacity = form.capacity.data
+
+        # A larger capacity hands the new seats to the waitlist straight away
+        db.session.flush()
+        promoted = event.promote_waitlist()
         
         db.session.commit()
+        invalidate_render_cache()
+        # Promoted users are not in the cached roster; their first scan looks them up
+        get_roster_cache().rename(event.id, event.title)
+        pregenerate_qr_codes(promoted, event.id)
         flash('Your event has been updated successfully!', 'success')
 
         # Redirect to appropriate dashboard
@@ -94,13 +179,19 @@ def delete_event(event_id):
         flash('You do not have permission to delete this event.', 'danger')
         abort(403)
 
-    # Remove all registrations (attendees) to avoid foreign key conflicts
-    event.attendees = []  
-    db.session.commit()
-
-    # Now delete the event
-    db.session.delete(event)
+    # Large events are hidden at once and purged in chunks in the background, so the
+    # request never holds the database for as long as deleting every row would take
+    registered = db.session.query(EventStats.registered_count).filter_by(event_id=event.id).scalar() or 0
+    deferred = registered >= current_app.config['EVENT_SOFT_DELETE_THRESHOLD']
+    if deferred:
+        soft_delete_event(event.id)
+    else:
+        Event.delete_with_dependents(event.id)
     db.session.commit()
+    get_roster_cache().invalidate(event_id)
+    invalidate_render_cache()
+    if deferred:
+        get_event_purger().submit(event_id)
 
     flash('The event has been deleted successfully.', 'success')
 
@@ -119,17 +210,26 @@ def register(event_id):
     """Handles event registration for a student."""
     event = Event.query.get_or_404(event_id)
 
-    if current_user.is_registered(event):
-        flash('You are already registered for this event.', 'info')
-    else:
-        current_user.registered_events.append(event)
-        db.session.commit()
+    # Seat allocation is atomic, so a double click or a registration rush is safe here
+    status = current_user.register_for(event)
+    db.session.commit()
 
-        # Generate a QR code for event registration
-        qr_data = f"user_id:{current_user.id},event_id:{event.id},event_title:{event.title}"
-        generate_qr_code(qr_data, current_user.id, event.id, current_app)
+    if status == 'registered':
+        get_roster_cache().admit(current_user.id, event.id, current_user.username)
+        # Cached event lists show the seat count
+        invalidate_render_cache()
 
+        # The QR code is rendered lazily by qr.qr_code on first view,
+        # or queued on the background worker when pre-generation is enabled
+        if current_app.config['QR_PREGENERATE']:
+            generate_qr_code(qr_payload(current_user.id, event.id))
         flash('You have successfully registered for the event!', 'success')
+    elif status == 'waitlisted':
+        flash('This event is full. You have been added to the waitlist and will be registered automatically when a seat frees up.', 'info')
+    elif status == 'already_waitlisted':
+        flash('You are already on the waitlist for this event.', 'info')
+    else:
+        flash('You are already registered for this event.', 'info')
     
     return redirect(url_for('events.events_list'))
 
@@ -139,17 +239,33 @@ def register(event_id):
 @login_required
 @role_required('Student')
 def unregister(event_id):
-    """Handles event unregistration for a student."""
+    """Handles event unregistration (or leaving the waitlist) for a student."""
     event = Event.query.get_or_404(event_id)
 
-    if not current_user.is_registered(event):
-        flash('You are not registered for this event.', 'info')
-    else:
-        current_user.registered_events.remove(event)
+    promoted = current_user.unregister_from(event)
+    if promoted is not None:
         db.session.commit()
+        # Promoted users are not in the roster yet; their first scan looks them up
+        get_roster_cache().discard(current_user.id, event.id)
+        invalidate_render_cache()
+        pregenerate_qr_codes(promoted, event.id)
         flash('You have successfully unregistered from the event.', 'success')
+    elif current_user.leave_waitlist(event):
+        db.session.commit()
+        flash('You have left the waitlist for this event.', 'success')
+    else:
+        flash('You are not registered for this event.', 'info')
     
     return redirect(url_for('events.events_list'))
+
+
+def pregenerate_qr_codes(user_ids, event_id):
+    """Queues QR codes for users promoted from a waitlist, if pre-generation is enabled."""
+    if current_app.config['QR_PREGENERATE']:
+        for user_id in user_ids:
+            generate_qr_code(qr_payload(user_id, event_id))
+
+
 @events_bp.route('/feedback/<int:event_id>', methods=['GET', 'POST'])
 @login_required
 @role_required('Student')
@@ -174,6 +290,8 @@ def submit_feedback(event_id):
         flash('You have already submitted feedback for this event.', 'info')
         return redirect(url_for('dashboard.student_dashboard'))
 
+    from forms import FeedbackForm
+
     form = FeedbackForm()
     if form.validate_on_submit():
         feedback = Feedback(
@@ -183,7 +301,13 @@ def submit_feedback(event_id):
             event_id=event.id
         )
         db.session.add(feedback)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent submission won the (user, event) unique constraint
+            db.session.rollback()
+            flash('You have already submitted feedback for this event.', 'info')
+            return redirect(url_for('dashboard.student_dashboard'))
         flash('Thank you for your feedback!', 'success')
         return redirect(url_for('dashboard.student_dashboard'))
 
@@ -0,0 +1,30 @@
+# eventhive/routes/metrics.py
+
+import hmac
+from flask import Blueprint, Response, abort, current_app, request
+from utils.metrics import get_metrics_registry, render_prometheus
+
+metrics_bp = Blueprint('metrics', __name__)
+
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Exposes the request metrics of every worker on this host in Prometheus text format."""
+    registry = get_metrics_registry()
+    if registry is None:
+        abort(404)
+
+    # With METRICS_TOKEN set, scrapers must send it as a bearer token; without
+    # one, only a scraper on this host is answered
+    token = current_app.config['METRICS_TOKEN']
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+            abort(401)
+    elif request.remote_addr not in LOOPBACK_ADDRESSES:
+        abort(403)
+
+    # Publish this worker's latest numbers before merging everyone's
+    registry.flush()
+    counters, histograms = registry.collect()
+    return Response(render_prometheus(counters, histograms), mimetype='text/plain; version=0.0.4')
@@ -1,10 +1,14 @@
 # eventhive/routes/qr.py
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, abort, make_response, current_app
 from flask_login import login_required, current_user
-from models.models import db, User, Event,registrations
+from models.models import db, Event, EventStats, registrations
+from sqlalchemy import tuple_
 from utils.decorators import role_required
-import json
+from utils.qr_utils import qr_payload, qr_digest, get_qr_png, parse_qr_payload
+from utils.qr_worker import get_qr_worker
+from utils.roster import get_roster_cache
+from datetime import datetime, timedelta
 
 qr_bp = Blueprint('qr', __name__)
 
@@ -13,47 +17,224 @@ qr_bp = Blueprint('qr', __name__)
 @role_required('Organizer')
 def scan():
     """Renders the QR code scanner page for organizers."""
+    # Warm the rosters of the organizer's current events so scans need no reads
+    recent = datetime.now() - timedelta(days=1)
+    event_ids = [
+        event_id for (event_id,) in db.session.query(Event.id)
+        .filter(Event.organizer_id == current_user.id, Event.event_date >= recent)
+        .order_by(Event.event_date.asc())
+        .limit(current_app.config['ROSTER_CACHE_SIZE'])
+    ]
+    get_roster_cache().warm(event_ids)
     return render_template('scan.html', title='Scan QR Code')
 
+@qr_bp.route('/code/<int:event_id>.png')
+@login_required
+@role_required('Student')
+def qr_code(event_id):
+    """Serves the current student's check-in QR code, rendering it on first request."""
+    event = Event.query.get_or_404(event_id)
+    if not current_user.is_registered(event):
+        abort(404)
+
+    data = qr_payload(current_user.id, event.id)
+    digest = qr_digest(data)
+
+    # The digest is a strong validator, so a revalidating client never costs an encode
+    if digest in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        response = make_response(get_qr_png(data))
+        response.mimetype = 'image/png'
+
+    response.set_etag(digest)
+    response.cache_control.private = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+@qr_bp.route('/code/<int:event_id>/status')
+@login_required
+@role_required('Student')
+def qr_code_status(event_id):
+    """Reports whether the current student's QR code has been rendered yet."""
+    event = Event.query.get_or_404(event_id)
+    if not current_user.is_registered(event):
+        abort(404)
+
+    status = get_qr_worker().status(qr_payload(current_user.id, event.id))
+    return jsonify({'status': status})
+
+@qr_bp.route('/worker_stats')
+@login_required
+@role_required('Admin')
+def worker_stats():
+    """Returns queue depth, job counters and latency of this worker's QR executor."""
+    return jsonify(get_qr_worker().stats())
+
 @qr_bp.route('/verify_attendance', methods=['POST'])
 @login_required
 @role_required('Organizer')
 def verify_attendance():
-    """Verifies the scanned QR code data against the database."""
+    """Verifies a scanned QR token and marks the attendance."""
     try:
         data = request.get_json()
         qr_data_str = data.get('qr_data')
-        
-        # The QR data is a string like: "user_id:1,event_id:2,event_title:Workshop"
-        # We need to parse it to get the user_id and event_id
-        parts = qr_data_str.split(',')
-        user_id = int(parts[0].split(':')[1])
-        event_id = int(parts[1].split(':')[1])
-
-        user = User.query.get(user_id)
-        event = Event.query.get(event_id)
-
-        if not user or not event:
-            return jsonify({'success': False, 'message': 'Invalid QR Code: User or Event not found.'})
-
-        # Check if the user is actually registered for this event
-        if not user.is_registered(event):
-            return jsonify({'success': False, 'message': f'{user.username} is not registered for {event.title}.'})
-        
-        # --- (Future Step): Mark attendance in the database ---
-        # For now, we just confirm the registration is valid.
-        stmt = db.update(registrations).where(
-            registrations.c.user_id == user_id,
-            registrations.c.event_id == event_id
-        ).values(attended=True)
-        
-        # Execute the statement and commit
-        db.session.execute(stmt)
-        db.session.commit()
-        return jsonify({
-            'success': True, 
-            'message': f'Success! Attendance confirmed for {user.username} at {event.title}.'
-        })
+
+        try:
+            pair = parse_qr_payload(qr_data_str)
+        except (AttributeError, ValueError):
+            return jsonify({'success': False, 'message': 'Invalid QR Code.'})
+
+        status = check_in([pair])[pair]
+        return jsonify({'success': status[0] in SUCCESS_STATUSES, 'message': check_in_message(*status)})
 
     except Exception as e:
-        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'})
\ No newline at end of file
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'})
+
+@qr_bp.route('/verify_attendance_batch', methods=['POST'])
+@login_required
+@role_required('Organizer')
+def verify_attendance_batch():
+    """
+    Verifies a batch of queued scans with at most one set-based UPDATE.
+    Re-scans are idempotent: rows already marked as attended are never rewritten.
+    """
+    data = request.get_json(silent=True) or {}
+    scans = data.get('scans')
+    if not isinstance(scans, list):
+        return jsonify({'success': False, 'message': 'Expected a list of scans.'}), 400
+    if len(scans) > current_app.config['CHECKIN_BATCH_MAX']:
+        return jsonify({'success': False, 'message': 'Too many scans in one batch.'}), 413
+
+    results, pairs = parse_scans(scans)
+    report_outcomes(results, check_in(pairs))
+    return jsonify({'success': True, 'results': results})
+
+# --------------------------- CHECK-IN --------------------------- #
+SUCCESS_STATUSES = ('checked_in', 'already_checked_in')
+
+def parse_scans(scans):
+    """
+    Parses a batch of scans; each may be a raw QR string or {"id": ..., "qr_data": ...}.
+    :return: One result dict per scan (invalid ones already filled in) and the set of valid pairs.
+    """
+    results = []
+    pairs = set()
+    for scan in scans:
+        scan_id, qr_data = (scan.get('id'), scan.get('qr_data')) if isinstance(scan, dict) else (None, scan)
+        try:
+            pair = parse_qr_payload(qr_data)
+        except (AttributeError, TypeError, ValueError):
+            results.append({'id': scan_id, 'status': 'invalid', 'success': False,
+                            'message': 'Invalid QR Code.'})
+            continue
+        pairs.add(pair)
+        results.append({'id': scan_id, 'pair': pair})
+    return results, pairs
+
+def report_outcomes(results, outcomes):
+    """Fills the results of parse_scans in from the check-in outcome of each pair."""
+    reported = set()
+    for result in results:
+        pair = result.pop('pair', None)
+        if pair is None:
+            continue
+        status, username, title = outcomes[pair]
+        if status == 'checked_in' and pair in reported:
+            # Only the first scan of a pair in this batch performs the check-in
+            status = 'already_checked_in'
+        reported.add(pair)
+        result.update(status=status, success=status in SUCCESS_STATUSES,
+                      message=check_in_message(status, username, title))
+
+def check_in_message(status, username, title):
+    """Builds the message shown on the scanner for a check-in outcome."""
+    if title is None:
+        return 'Invalid QR Code: Event not found.'
+    if status == 'checked_in':
+        return f'Success! Attendance confirmed for {username} at {title}.'
+    if status == 'already_checked_in':
+        return f'{username} is already checked in for {title}.'
+    return f'{username or "This user"} is not registered for {title}.'
+
+def check_in(pairs):
+    """
+    Marks attendance for a set of (user_id, event_id) pairs taken from signed tokens.
+
+    Registrations are resolved from the per-event roster cache, so on the
+    happy path the only statement is one guarded, set-based UPDATE. Pairs the
+    roster already shows as attended are confirmed with one read, since the
+    registration may have been deleted through another worker.
+    :return: A dict mapping each pair to a (status, username, event title) tuple.
+    """
+    cache = get_roster_cache()
+    outcomes = {}
+    to_mark = {}
+    attended = {}
+
+    # Rosters not cached yet are loaded together, and users missing from them are looked up with one query
+    rosters = cache.get_many({event_id for _, event_id in pairs})
+    usernames = cache.lookup([pair for pair in pairs if pair[1] in rosters], rosters)
+
+    for pair in pairs:
+        user_id, event_id = pair
+        roster = rosters.get(event_id)
+        if roster is None:
+            outcomes[pair] = ('not_registered', None, None)
+            continue
+        username = usernames.get(pair)
+        if username is None:
+            outcomes[pair] = ('not_registered', None, roster.title)
+        elif user_id in roster.attended:
+            attended[pair] = (roster, username)
+        else:
+            to_mark[pair] = (roster, username)
+
+    if not to_mark and not attended:
+        return outcomes
+
+    updated = db.session.execute(
+        db.update(registrations)
+        .where(tuple_(registrations.c.user_id, registrations.c.event_id).in_(list(to_mark)),
+               registrations.c.attended == False)  # noqa: E712
+        .values(attended=True)
+    ).rowcount if to_mark else 0
+
+    per_event = {}
+    for _, event_id in to_mark:
+        per_event[event_id] = per_event.get(event_id, 0) + 1
+
+    if updated == len(to_mark):
+        for event_id, count in per_event.items():
+            EventStats.adjust(event_id, attended=count)
+        existing = set(to_mark)
+        unconfirmed = list(attended)
+    else:
+        # Another worker checked some of them in first, or a registration is gone
+        # since the roster was cached; resolve those pairs and recount the events
+        existing = set()
+        unconfirmed = list(to_mark) + list(attended)
+        EventStats.rebuild(list(per_event))
+    if unconfirmed:
+        existing |= {
+            (row.user_id, row.event_id)
+            for row in db.session.query(registrations.c.user_id, registrations.c.event_id)
+            .filter(tuple_(registrations.c.user_id, registrations.c.event_id).in_(unconfirmed))
+        }
+    db.session.commit()
+
+    for pair, (roster, username) in to_mark.items():
+        if pair in existing:
+            roster.mark_attended(pair[0])
+            outcomes[pair] = ('checked_in', username, roster.title)
+        else:
+            roster.remove(pair[0])
+            outcomes[pair] = ('not_registered', username, roster.title)
+    for pair, (roster, username) in attended.items():
+        if pair in existing:
+            outcomes[pair] = ('already_checked_in', username, roster.title)
+        else:
+            roster.remove(pair[0])
+            outcomes[pair] = ('not_registered', username, roster.title)
+    return outcomes
@@ -0,0 +1,78 @@
+# eventhive/tests/conftest.py
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from models.models import db, Event, EventStats, User, registrations
+from utils import render_cache, roster, user_cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    """
+    An app on an empty SQLite database, with the disk caches and metrics turned off
+    and the N+1 query detector raising.
+    No app context stays pushed: test client requests would share its ``g``, and
+    with it the logged-in user. Tests open ``with app.app_context()`` for their own queries.
+    """
+    class TestConfig(Config):
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        QR_CACHE_DIR = str(tmp_path / 'qr_cache')
+        RENDER_CACHE_BACKEND = 'none'
+        JINJA_BYTECODE_CACHE_DIR = ''
+        METRICS_ENABLED = False
+        NPLUSONE_MODE = 'raise'
+        NPLUSONE_THRESHOLD = 3
+        NPLUSONE_REPORT_PATH = str(tmp_path / 'nplusone.jsonl')
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+    # The per-process caches outlive an app; every test gets new ones from its own config
+    for process_local in (roster._cache, user_cache._cache, render_cache._cache):
+        process_local.reset()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client_for(app):
+    """Returns a test client logged in as the given user."""
+    def client_for(user):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        return client
+    return client_for
+
+
+@pytest.fixture
+def registration(app):
+    """An organizer, and a student registered for one of the organizer's events."""
+    with app.app_context():
+        organizer = User(username='organizer', email='organizer@example.com', role='Organizer')
+        student = User(username='student', email='student@example.com', role='Student')
+        db.session.add_all([organizer, student])
+        db.session.flush()
+        event = Event(title='Hackathon', description='A day of building things.', location='Hall A',
+                      event_date=datetime.utcnow() + timedelta(days=7), organizer_id=organizer.id)
+        db.session.add(event)
+        db.session.flush()
+        db.session.execute(registrations.insert().values(user_id=student.id, event_id=event.id, attended=False))
+        EventStats.rebuild([event.id])
+        db.session.commit()
+        # Load the attributes now; the objects outlive the session
+        for obj in (organizer, student, event):
+            db.session.refresh(obj)
+    return organizer, student, event
@@ -0,0 +1,78 @@
+# eventhive/tests/test_async_check_in.py
+
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+
+from models.models import db, EventStats, User, registrations
+from routes.async_qr import CheckinApp, HTTPError, check_in
+from utils.async_db import dispose_async_engine, get_async_sessionmaker
+
+
+def run(coroutine):
+    """Runs a coroutine on a new event loop and closes the async engine it opened."""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await dispose_async_engine()
+    return asyncio.run(main())
+
+
+class UnregisteringSession:
+    """Deletes a registration right after the first read, as a concurrent unregister would."""
+
+    def __init__(self, session, pair):
+        self.session = session
+        self.pair = pair
+
+    async def execute(self, statement, *args, **kwargs):
+        result = await self.session.execute(statement, *args, **kwargs)
+        if self.pair is not None:
+            user_id, event_id = self.pair
+            self.pair = None
+            await self.session.execute(delete(registrations).where(
+                registrations.c.user_id == user_id, registrations.c.event_id == event_id))
+        return result
+
+
+def test_registration_deleted_during_check_in(app, registration):
+    _, student, event = registration
+    with app.app_context():
+        other = User(username='other', email='other@example.com', role='Student')
+        db.session.add(other)
+        db.session.flush()
+        db.session.execute(registrations.insert().values(user_id=other.id, event_id=event.id, attended=False))
+        db.session.commit()
+        kept, gone = (student.id, event.id), (other.id, event.id)
+
+    async def scan():
+        async with get_async_sessionmaker(app.config)() as session:
+            async with session.begin():
+                return await check_in(UnregisteringSession(session, gone), {kept, gone})
+
+    outcomes = run(scan())
+    assert outcomes == {kept: ('checked_in', 'student', 'Hackathon'),
+                        gone: ('not_registered', 'other', 'Hackathon')}
+    with app.app_context():
+        assert db.session.get(EventStats, event.id).attended_count == 1
+
+
+def test_deleted_organizer_loses_access(app, registration, client_for):
+    organizer, _, _ = registration
+    with app.app_context():
+        admin = User(username='admin', email='admin@example.com', role='Admin')
+        db.session.add(admin)
+        db.session.commit()
+        db.session.refresh(admin)
+
+    checkin_app = CheckinApp(app)
+    session = app.session_interface.get_signing_serializer(app).dumps({'_user_id': str(organizer.id)})
+    scope = {'headers': [(b'cookie', f"{app.config['SESSION_COOKIE_NAME']}={session}".encode())]}
+    assert run(checkin_app.authenticate(scope))[1] == 'organizer'
+
+    client_for(admin).post(f'/delete_user/{organizer.id}')
+    with pytest.raises(HTTPError) as error:
+        run(checkin_app.authenticate(scope))
+    assert error.value.status == 401
@@ -0,0 +1,54 @@
+# eventhive/tests/test_bulk_import.py
+
+import json
+
+from sqlalchemy.exc import OperationalError
+
+from models.models import db, User, registrations
+from utils.bulk_import import RegistrationImporter, UserImporter, run_import
+
+
+def reject_first_write(monkeypatch, importer):
+    """Makes the database reject the first batch the importer writes."""
+    write = importer.write
+    calls = []
+
+    def flaky_write(self, values):
+        calls.append(len(values))
+        if len(calls) == 1:
+            raise OperationalError('INSERT', {}, Exception('database is locked'))
+        return write(self, values)
+    monkeypatch.setattr(importer, 'write', flaky_write)
+
+
+def write_jsonl(path, rows):
+    path.write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    return str(path)
+
+
+def test_rows_of_a_rejected_batch_can_be_imported_later(app, tmp_path, monkeypatch):
+    reject_first_write(monkeypatch, UserImporter)
+    rows = [{'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'pbkdf2:sha256:1$salt$hash'}
+            for i in range(2)]
+    with app.app_context():
+        report = run_import('users', write_jsonl(tmp_path / 'users.jsonl', rows + rows), batch_size=2)
+
+        assert report.imported == 2
+        assert [error['line'] for error in report.errors] == [1, 2]
+        assert all(error['error'].startswith('Batch rejected by the database') for error in report.errors)
+        assert db.session.query(User).count() == 2
+
+
+def test_seats_of_a_rejected_batch_are_given_back(app, registration, tmp_path, monkeypatch):
+    _, student, event = registration
+    reject_first_write(monkeypatch, RegistrationImporter)
+    row = {'user': 'other', 'event_id': event.id}
+    with app.app_context():
+        db.session.merge(event).capacity = 2
+        db.session.add(User(username='other', email='other@example.com', role='Student'))
+        db.session.commit()
+
+        report = run_import('registrations', write_jsonl(tmp_path / 'registrations.jsonl', [row, row]), batch_size=1)
+
+        assert report.imported == 1
+        assert db.session.query(registrations).filter_by(event_id=event.id).count() == 2
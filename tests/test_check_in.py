@@ -0,0 +1,85 @@
+# eventhive/tests/test_check_in.py
+
+from models.models import db, User, registrations
+from utils.purge import soft_delete_event
+from utils.qr_utils import qr_payload
+from utils.roster import get_roster_cache
+
+
+def test_scan_checks_in(app, registration, client_for):
+    organizer, student, event = registration
+    with app.app_context():
+        qr_data = qr_payload(student.id, event.id)
+    response = client_for(organizer).post('/qr/verify_attendance', json={'qr_data': qr_data})
+    assert response.get_json() == {'success': True,
+                                   'message': 'Success! Attendance confirmed for student at Hackathon.'}
+
+
+def test_scan_for_soft_deleted_event(app, registration, client_for):
+    organizer, student, event = registration
+    with app.app_context():
+        soft_delete_event(event.id)
+        db.session.commit()
+        qr_data = qr_payload(student.id, event.id)
+    client = client_for(organizer)
+
+    response = client.post('/qr/verify_attendance', json={'qr_data': qr_data})
+    assert response.get_json() == {'success': False, 'message': 'Invalid QR Code: Event not found.'}
+
+    response = client.post('/qr/verify_attendance_batch',
+                           json={'scans': [{'id': 1, 'qr_data': qr_data}]})
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'id': 1, 'status': 'not_registered', 'success': False,
+                                               'message': 'Invalid QR Code: Event not found.'}]
+
+
+def test_rescan_after_unregister_through_another_worker(app, registration, client_for):
+    organizer, student, event = registration
+    with app.app_context():
+        qr_data = qr_payload(student.id, event.id)
+    client = client_for(organizer)
+
+    client.post('/qr/verify_attendance', json={'qr_data': qr_data})
+    response = client.post('/qr/verify_attendance', json={'qr_data': qr_data})
+    assert response.get_json() == {'success': True, 'message': 'student is already checked in for Hackathon.'}
+
+    # Deleted behind this worker's roster cache, which still shows the student as attended
+    with app.app_context():
+        db.session.execute(registrations.delete().where(registrations.c.user_id == student.id))
+        db.session.commit()
+    response = client.post('/qr/verify_attendance', json={'qr_data': qr_data})
+    assert response.get_json() == {'success': False, 'message': 'student is not registered for Hackathon.'}
+
+
+def test_registrations_update_the_cached_roster(app, registration, client_for):
+    organizer, student, event = registration
+    with app.app_context():
+        other = User(username='other', email='other@example.com', role='Student')
+        db.session.add(other)
+        db.session.commit()
+        db.session.refresh(other)
+        roster = get_roster_cache().get(event.id)
+
+    client_for(other).post(f'/register/{event.id}')
+    client_for(student).post(f'/unregister/{event.id}')
+
+    with app.app_context():
+        assert get_roster_cache().get(event.id) is roster
+    assert roster.users == {other.id: 'other'}
+
+
+def test_batch_resolves_roster_misses_together(app, registration, client_for):
+    organizer, _, event = registration
+    with app.app_context():
+        get_roster_cache().get(event.id)
+        # Registered behind this worker's cached roster
+        students = [User(username=f'late{i}', email=f'late{i}@example.com', role='Student') for i in range(5)]
+        db.session.add_all(students)
+        db.session.flush()
+        db.session.execute(registrations.insert(), [
+            {'user_id': student.id, 'event_id': event.id, 'attended': False} for student in students])
+        db.session.commit()
+        scans = [{'id': i, 'qr_data': qr_payload(student.id, event.id)} for i, student in enumerate(students)]
+
+    response = client_for(organizer).post('/qr/verify_attendance_batch', json={'scans': scans})
+    assert [result['status'] for result in response.get_json()['results']] == ['checked_in'] * 5
@@ -0,0 +1,74 @@
+# eventhive/tests/test_conditional.py
+
+from datetime import datetime, timedelta
+
+from models.models import db, Event, User, registrations
+
+
+def test_etag_revalidation(registration, client_for):
+    organizer, _, _ = registration
+    client = client_for(organizer)
+    etag = client.get('/events').headers['ETag']
+    assert client.get('/events', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_unregister_changes_events_page(registration, client_for):
+    _, student, event = registration
+    client = client_for(student)
+    first = client.get('/events')
+
+    client.post(f'/unregister/{event.id}')
+    client.get('/')  # shows the flash message
+
+    assert client.get('/events', headers={'If-None-Match': first.headers['ETag']}).status_code == 200
+
+    # Last-Modified cannot see deletions, so If-Modified-Since alone never gives a 304
+    tomorrow = (datetime.utcnow() + timedelta(days=1)).strftime('%a, %d %b %Y %H:%M:%S GMT')
+    assert client.get('/events', headers={'If-Modified-Since': tomorrow}).status_code == 200
+
+
+def test_swapped_registration_changes_student_dashboard(app, registration, client_for):
+    organizer, student, event = registration
+    with app.app_context():
+        # Older than the Hackathon, so MAX(updated_at) and the count stay as they were
+        older = [Event(title=title, description='Hands-on.', location='Hall B', event_date=event.event_date,
+                       organizer_id=organizer.id, updated_at=event.updated_at - timedelta(days=1))
+                 for title in ('Workshop', 'Meetup')]
+        db.session.add_all(older)
+        db.session.flush()
+        workshop, meetup = (older_event.id for older_event in older)
+        db.session.execute(registrations.insert().values(user_id=student.id, event_id=workshop, attended=False))
+        db.session.commit()
+    client = client_for(student)
+    first = client.get('/student_dashboard')
+    assert 'Workshop' in first.get_data(as_text=True)
+
+    with app.app_context():
+        db.session.execute(registrations.delete().where(registrations.c.event_id == workshop))
+        db.session.execute(registrations.insert().values(user_id=student.id, event_id=meetup, attended=False))
+        db.session.commit()
+
+    response = client.get('/student_dashboard', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert 'Meetup' in response.get_data(as_text=True)
+
+
+def test_render_cache_hit_matches_its_etag(app, registration, client_for):
+    organizer, _, event = registration
+    app.config.update(RENDER_CACHE_BACKEND='memory', RENDER_CACHE_TTL=3600)
+    with app.app_context():
+        db.session.get(Event, event.id).capacity = 2
+        other = User(username='other', email='other@example.com', role='Student')
+        db.session.add(other)
+        db.session.commit()
+        db.session.refresh(other)
+    visitor = app.test_client()
+    first = visitor.get('/events')
+    assert '1 / 2 registered' in first.get_data(as_text=True)
+
+    client_for(other).post(f'/register/{event.id}')
+
+    response = visitor.get('/events', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert '2 / 2 registered' in response.get_data(as_text=True)
+    assert visitor.get('/events', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
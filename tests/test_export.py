@@ -0,0 +1,21 @@
+# eventhive/tests/test_export.py
+
+from models.models import db, User
+
+
+def test_only_the_organizer_can_export(app, registration, client_for):
+    organizer, student, event = registration
+    with app.app_context():
+        other = User(username='other', email='other@example.com', role='Organizer')
+        db.session.add(other)
+        db.session.commit()
+        db.session.refresh(other)
+    url = f'/organizer_dashboard/events/{event.id}/attendees.csv'
+
+    response = client_for(organizer).get(url)
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).splitlines() == [
+        'user_id,username,email,attended', f'{student.id},student,student@example.com,False']
+
+    assert client_for(other).get(url).status_code == 403
+    assert client_for(student).get(url).status_code == 302
@@ -0,0 +1,61 @@
+# eventhive/tests/test_metrics.py
+
+import json
+import subprocess
+import sys
+
+from utils.metrics import MetricsRegistry
+
+REQUESTS = 'eventhive_http_requests_total'
+
+
+def exited_pid():
+    """The PID of a process that has already exited."""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def total(registry):
+    counters, _ = registry.collect()
+    return counters[(REQUESTS, ())]
+
+
+def test_exited_workers_are_archived(tmp_path):
+    dead = tmp_path / f'worker-{exited_pid()}-0123456789ab.json'
+    dead.write_text(json.dumps({'counters': [[REQUESTS, {}, 5]], 'histograms': []}))
+    registry = MetricsRegistry(str(tmp_path), flush_interval=60)
+    registry.inc(REQUESTS, {}, 2)
+    registry.flush()
+
+    assert total(registry) == 7
+    assert not dead.exists()
+    assert total(registry) == 7
+
+    registry.inc(REQUESTS, {})
+    registry.flush()
+    assert total(registry) == 8
+
+
+def test_workers_with_the_same_pid_keep_their_own_files(tmp_path):
+    first = MetricsRegistry(str(tmp_path), flush_interval=60)
+    second = MetricsRegistry(str(tmp_path), flush_interval=60)
+    first.inc(REQUESTS, {}, 3)
+    second.inc(REQUESTS, {}, 1)
+    first.flush()
+    second.flush()
+    assert total(second) == 4
+
+
+def test_metrics_endpoint_needs_a_token_or_localhost(app, tmp_path):
+    app.config.update(METRICS_ENABLED=True, METRICS_DIR=str(tmp_path / 'metrics'), METRICS_TOKEN='')
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'}).status_code == 403
+
+    app.config['METRICS_TOKEN'] = 'secret'
+    public = {'REMOTE_ADDR': '203.0.113.7'}
+    assert client.get('/metrics', environ_base=public).status_code == 401
+    response = client.get('/metrics', environ_base=public, headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert REQUESTS in response.get_data(as_text=True)
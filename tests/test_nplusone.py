@@ -0,0 +1,52 @@
+# eventhive/tests/test_nplusone.py
+
+import json
+
+import pytest
+
+from models.models import db, Feedback, User
+from utils.nplusone import NPlusOneError, normalize_statement
+
+
+@pytest.fixture
+def feedback_authors(app, registration):
+    """Registers a view that loads each feedback's author lazily, one query per row."""
+    _, _, event = registration
+    with app.app_context():
+        for i in range(5):
+            author = User(username=f'author{i}', email=f'author{i}@example.com', role='Student')
+            db.session.add(author)
+            db.session.flush()
+            db.session.add(Feedback(rating=5, user_id=author.id, event_id=event.id))
+        db.session.commit()
+
+    @app.route('/test/feedback_authors')
+    def feedback_authors():
+        return ', '.join(feedback.author.username for feedback in Feedback.query.all())
+    return app.test_client()
+
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT * FROM user\n WHERE id IN (?, ?, ?) AND name = 'o''k' LIMIT 10") == \
+        'SELECT * FROM user WHERE id IN (?) AND name = ? LIMIT ?'
+
+
+def test_lazy_load_per_row_raises(feedback_authors):
+    with pytest.raises(NPlusOneError, match='ran the same query 5 times'):
+        feedback_authors.get('/test/feedback_authors')
+
+
+def test_log_mode_writes_a_report(app, feedback_authors):
+    app.config['NPLUSONE_MODE'] = 'log'
+    assert feedback_authors.get('/test/feedback_authors').status_code == 200
+
+    with open(app.config['NPLUSONE_REPORT_PATH']) as f:
+        [report] = [json.loads(line) for line in f]
+    assert report['endpoint'] == 'feedback_authors'
+    assert report['threshold'] == 3
+    [offender] = report['offenders']
+    assert offender['count'] == 5
+    assert offender['statement'].startswith('SELECT user.id AS user_id')
+    [site] = offender['call_sites']
+    assert site['view'].startswith('tests/test_nplusone.py:')
+    assert site['view'].endswith(' in feedback_authors')
@@ -0,0 +1,43 @@
+# eventhive/tests/test_process_local.py
+
+import os
+import threading
+
+from utils.process_local import ProcessLocal
+
+
+def test_racing_threads_share_one_object():
+    local = ProcessLocal()
+    created = []
+    barrier = threading.Barrier(8)
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    def first_use():
+        barrier.wait()
+        results.append(local.get(factory))
+
+    results = []
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(result is created[0] for result in results)
+
+
+def test_forked_child_creates_its_own():
+    local = ProcessLocal()
+    parent = local.get(object)
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        child = local.get(object)
+        os.write(write, b'1' if child is not parent and local.peek() is child else b'0')
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b'1'
+    assert local.get(object) is parent
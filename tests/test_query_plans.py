@@ -0,0 +1,7 @@
+# eventhive/tests/test_query_plans.py
+
+from benchmarks.query_plans import check_plans
+
+
+def test_hot_queries_use_indexes(app):
+    assert check_plans(app, users=500, events=300, registrations=2500, feedback=1000) == 0
@@ -0,0 +1,31 @@
+# eventhive/tests/test_render_cache.py
+
+from models.models import db, Event, User
+from utils.render_cache import get_render_cache
+
+
+def version(app):
+    with app.app_context():
+        return get_render_cache().backend.version()
+
+
+def test_seat_count_changes_invalidate(app, registration, client_for):
+    _, student, event = registration
+    app.config.update(RENDER_CACHE_BACKEND='memory', RENDER_CACHE_TTL=3600)
+    with app.app_context():
+        db.session.get(Event, event.id).capacity = 2
+        others = [User(username=f'other{i}', email=f'other{i}@example.com', role='Student') for i in range(2)]
+        db.session.add_all(others)
+        db.session.commit()
+        for other in others:
+            db.session.refresh(other)
+    start = version(app)
+
+    client_for(others[0]).post(f'/register/{event.id}')
+    assert version(app) == start + 1
+
+    client_for(others[1]).post(f'/register/{event.id}')  # waitlisted; the count stays
+    assert version(app) == start + 1
+
+    client_for(student).post(f'/unregister/{event.id}')
+    assert version(app) == start + 2
@@ -0,0 +1,81 @@
+# eventhive/tests/test_waitlist.py
+
+from datetime import datetime, timedelta
+
+from models.models import db, Event, EventStats, User, Waitlist, registrations
+
+
+def add_students(count, prefix='waiting'):
+    students = [User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', role='Student')
+                for i in range(count)]
+    db.session.add_all(students)
+    db.session.flush()
+    return [student.id for student in students]
+
+
+def registered_users(event_id):
+    return {user_id for (user_id,) in
+            db.session.query(registrations.c.user_id).filter(registrations.c.event_id == event_id)}
+
+
+def test_unregister_promotes_the_oldest_waiting(app, registration, client_for):
+    _, student, event = registration
+    with app.app_context():
+        db.session.get(Event, event.id).capacity = 1
+        waiting = add_students(3)
+        db.session.add_all(Waitlist(user_id=user_id, event_id=event.id) for user_id in waiting)
+        db.session.commit()
+
+    client_for(student).post(f'/unregister/{event.id}')
+
+    with app.app_context():
+        assert registered_users(event.id) == {waiting[0]}
+        assert [user_id for (user_id,) in db.session.query(Waitlist.user_id).order_by(Waitlist.id)] == waiting[1:]
+        assert db.session.get(EventStats, event.id).registered_count == 1
+
+
+def test_deleting_a_user_promotes_every_event(app, registration, client_for):
+    organizer, student, _ = registration
+    with app.app_context():
+        admin = User(username='admin', email='admin@example.com', role='Admin')
+        db.session.add(admin)
+        waiting = add_students(8)
+        events = [Event(title=f'Talk {i}', description='A talk.', location='Hall B', capacity=1,
+                        event_date=datetime.utcnow() + timedelta(days=3), organizer_id=organizer.id)
+                  for i in range(8)]
+        db.session.add_all(events)
+        db.session.flush()
+        event_ids = [event.id for event in events]
+        db.session.execute(registrations.insert(), [
+            {'user_id': student.id, 'event_id': event_id, 'attended': False} for event_id in event_ids])
+        db.session.add_all(Waitlist(user_id=user_id, event_id=event_id)
+                           for user_id, event_id in zip(waiting, event_ids))
+        EventStats.rebuild(event_ids)
+        db.session.commit()
+        db.session.refresh(admin)
+
+    client_for(admin).post(f'/delete_user/{student.id}')
+
+    with app.app_context():
+        assert [registered_users(event_id) for event_id in event_ids] == [{user_id} for user_id in waiting]
+        assert db.session.query(Waitlist).count() == 0
+        assert {stats.registered_count for stats in EventStats.query.filter(EventStats.event_id.in_(event_ids))} == {1}
+
+
+def test_raising_the_capacity_promotes_the_waitlist(app, registration, client_for):
+    organizer, student, event = registration
+    with app.app_context():
+        db.session.get(Event, event.id).capacity = 1
+        waiting = add_students(10)
+        db.session.add_all(Waitlist(user_id=user_id, event_id=event.id) for user_id in waiting)
+        db.session.commit()
+
+    response = client_for(organizer).post(f'/edit_event/{event.id}', data={
+        'title': 'Hackathon', 'description': 'A day of building things.', 'location': 'Hall A',
+        'event_date': '2031-01-01T10:00', 'capacity': '8'})
+    assert response.status_code == 302
+
+    with app.app_context():
+        assert registered_users(event.id) == {student.id, *waiting[:7]}
+        assert [user_id for (user_id,) in db.session.query(Waitlist.user_id).order_by(Waitlist.id)] == waiting[7:]
+        assert db.session.get(EventStats, event.id).registered_count == 8
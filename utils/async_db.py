@@ -0,0 +1,50 @@
+# eventhive/utils/async_db.py
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from utils.process_local import ProcessLocal
+
+# Async drivers for the database URLs the Flask app is configured with
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url):
+    """Returns the async-driver form of a sync database URL, e.g. sqlite:/// -> sqlite+aiosqlite:///."""
+    scheme, sep, rest = url.partition('://')
+    driver = ASYNC_DRIVERS.get(scheme.split('+')[0])
+    if driver is None:
+        raise ValueError(f'No async driver is known for {scheme!r}; set ASYNC_DATABASE_URL.')
+    return driver + sep + rest
+
+
+def create_async_sessionmaker(config):
+    """Creates an async engine, and a sessionmaker on it, from the Flask app config."""
+    url = config['ASYNC_DATABASE_URL'] or async_database_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.startswith('sqlite'):
+        # Same as the sync engine: wait for SQLite's write lock instead of failing under bursts.
+        # SQLite has a single writer, so requests queue for one connection in the pool
+        # rather than in its busy handler, which retries by sleeping
+        options = {'connect_args': {'timeout': 30}, 'pool_size': 1, 'max_overflow': 0}
+    else:
+        # Sized in config.py so that, under the asgi profile, it counts against DB_MAX_CONNECTIONS
+        options = {'pool_pre_ping': True, 'pool_recycle': 3600, **config['ASYNC_POOL_OPTIONS']}
+    engine = create_async_engine(url, **options)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+_sessionmaker = ProcessLocal()
+
+
+def get_async_sessionmaker(config):
+    """Returns this process's async sessionmaker, creating its engine on first use."""
+    return _sessionmaker.get(lambda: create_async_sessionmaker(config))
+
+
+async def dispose_async_engine():
+    """Closes the pooled connections of this process's async engine, if it has one."""
+    sessionmaker = _sessionmaker.peek()
+    if sessionmaker is not None:
+        _sessionmaker.reset()
+        await sessionmaker.kw['bind'].dispose()
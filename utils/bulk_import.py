@@ -0,0 +1,345 @@
+# eventhive/utils/bulk_import.py
+
+import csv
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from email_validator import EmailNotValidError, validate_email
+from flask import current_app
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.security import generate_password_hash
+from models.models import db, User, Event, EventStats, Waitlist, registrations
+
+
+class RowError(ValueError):
+    """Raised when an input row cannot be imported; the message is reported for its line."""
+
+
+def read_rows(path, fmt=None):
+    """
+    Streams the rows of a CSV (with a header line) or JSONL file.
+    :param fmt: 'csv' or 'jsonl'; guessed from the file extension when omitted.
+    :return: An iterator of (line number, dict) pairs. Unparseable JSONL lines yield a RowError instead of a dict.
+    """
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson', '.json')) else 'csv')
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError('not a JSON object')
+            except ValueError as e:
+                row = RowError(f'Invalid JSON: {e}')
+            yield line_number, row
+
+
+def _chunks(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(row, field, required=True, max_length=None):
+    value = row.get(field)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(f'{field} is required.')
+    if max_length and len(value) > max_length:
+        raise RowError(f'{field} is longer than {max_length} characters.')
+    return value
+
+
+def _flag(row, field):
+    value = row.get(field)
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _hash(job):
+    password, method = job
+    return generate_password_hash(password, method=method)
+
+
+class UserImporter:
+    """
+    Imports accounts. Uniqueness is checked against the usernames and emails
+    loaded up front plus those seen earlier in the file, so no row costs a query;
+    passwords are hashed on a process pool, a batch at a time.
+    """
+
+    roles = ('Student', 'Organizer')
+
+    def __init__(self, processes=None):
+        self.processes = processes
+        self._pool = None
+        self.usernames = {username for (username,) in db.session.query(User.username)}
+        self.emails = {email for (email,) in db.session.query(User.email)}
+        self.hash_seconds = 0.0
+        self._batch = []
+
+    def start_batch(self):
+        self._batch = []
+
+    def discard_batch(self):
+        """Forgets the usernames and emails of a batch the database rejected, so later rows may use them."""
+        for username, email in self._batch:
+            self.usernames.discard(username)
+            self.emails.discard(email)
+        self._batch = []
+
+    def validate(self, row):
+        username = _text(row, 'username', max_length=64)
+        email = _text(row, 'email', max_length=120)
+        try:
+            validate_email(email, check_deliverability=False)
+        except EmailNotValidError as e:
+            raise RowError(f'Invalid email address: {e}')
+        role = _text(row, 'role', required=False) or 'Student'
+        if role not in self.roles:
+            raise RowError(f"role must be one of {', '.join(self.roles)}.")
+        password = _text(row, 'password', required=False)
+        password_hash = _text(row, 'password_hash', required=False, max_length=256)
+        if not password and '$' not in password_hash:
+            raise RowError('A password or a Werkzeug password_hash is required.')
+        if username in self.usernames:
+            raise RowError('That username is already taken.')
+        if email in self.emails:
+            raise RowError('That email is already registered.')
+
+        self.usernames.add(username)
+        self.emails.add(email)
+        self._batch.append((username, email))
+        return {'username': username, 'email': email, 'role': role,
+                'password': password or None, 'password_hash': password_hash or None}
+
+    def write(self, values):
+        to_hash = [value for value in values if value['password']]
+        if to_hash:
+            started = time.perf_counter()
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.processes)
+            method = current_app.config['PASSWORD_HASH_METHOD']
+            jobs = [(value['password'], method) for value in to_hash]
+            hashes = self._pool.map(_hash, jobs, chunksize=max(1, len(jobs) // (4 * (self.processes or os.cpu_count() or 1))))
+            for value, password_hash in zip(to_hash, hashes):
+                value['password_hash'] = password_hash
+            self.hash_seconds += time.perf_counter() - started
+
+        db.session.execute(db.insert(User), [
+            {'username': v['username'], 'email': v['email'], 'role': v['role'], 'password_hash': v['password_hash']}
+            for v in values
+        ])
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+
+class EventImporter:
+    """Imports events, each owned by an organizer given by username or email."""
+
+    def __init__(self, processes=None):
+        self.organizers = {}
+        for user_id, username, email in db.session.query(User.id, User.username, User.email).filter_by(role='Organizer'):
+            self.organizers[username] = self.organizers[email] = user_id
+
+    def start_batch(self):
+        pass
+
+    def discard_batch(self):
+        pass
+
+    def validate(self, row):
+        title = _text(row, 'title', max_length=140)
+        description = _text(row, 'description')
+        location = _text(row, 'location', max_length=100)
+        try:
+            event_date = datetime.fromisoformat(_text(row, 'event_date'))
+        except ValueError:
+            raise RowError('event_date must be an ISO 8601 date and time, e.g. 2025-03-01T18:30.')
+        organizer_id = self.organizers.get(_text(row, 'organizer'))
+        if organizer_id is None:
+            raise RowError(f"No organizer with username or email {row.get('organizer')!r}.")
+        capacity = _text(row, 'capacity', required=False)
+        if capacity:
+            try:
+                capacity = int(capacity)
+            except ValueError:
+                raise RowError('capacity must be a whole number.')
+            if capacity < 1:
+                raise RowError('capacity must be at least 1.')
+        return {'title': title, 'description': description, 'location': location,
+                'event_date': event_date.replace(tzinfo=None), 'organizer_id': organizer_id,
+                'capacity': capacity or None}
+
+    def write(self, values):
+        event_ids = db.session.execute(db.insert(Event).returning(Event.id), values).scalars().all()
+        db.session.execute(db.insert(EventStats), [
+            {'event_id': event_id, 'registered_count': 0, 'attended_count': 0} for event_id in event_ids
+        ])
+
+    def close(self):
+        from utils.render_cache import invalidate_render_cache
+        invalidate_render_cache()
+
+
+class RegistrationImporter:
+    """
+    Registers students (by username or email) for events (by ID). Seats are
+    counted against each event's capacity; rows beyond it are reported, not waitlisted.
+    """
+
+    def __init__(self, processes=None):
+        self.students = {}
+        for user_id, username, email in db.session.query(User.id, User.username, User.email).filter_by(role='Student'):
+            self.students[username] = self.students[email] = user_id
+        self.seats = {
+            event_id: None if capacity is None else capacity - (registered or 0)
+            for event_id, capacity, registered in db.session.query(
+                Event.id, Event.capacity, EventStats.registered_count).outerjoin(EventStats)
+        }
+        self.pairs = set(db.session.query(registrations.c.user_id, registrations.c.event_id))
+        self._batch = []
+
+    def start_batch(self):
+        self._batch = []
+
+    def discard_batch(self):
+        """Gives back the pairs and seats taken by a batch the database rejected."""
+        for user_id, event_id in self._batch:
+            self.pairs.discard((user_id, event_id))
+            if self.seats[event_id] is not None:
+                self.seats[event_id] += 1
+        self._batch = []
+
+    def validate(self, row):
+        user_id = self.students.get(_text(row, 'user'))
+        if user_id is None:
+            raise RowError(f"No student with username or email {row.get('user')!r}.")
+        try:
+            event_id = int(_text(row, 'event_id'))
+        except ValueError:
+            raise RowError('event_id must be a whole number.')
+        if event_id not in self.seats:
+            raise RowError(f'Event {event_id} does not exist.')
+        if (user_id, event_id) in self.pairs:
+            raise RowError('That student is already registered for the event.')
+        if self.seats[event_id] is not None:
+            if self.seats[event_id] <= 0:
+                raise RowError(f'Event {event_id} is full.')
+            self.seats[event_id] -= 1
+
+        self.pairs.add((user_id, event_id))
+        self._batch.append((user_id, event_id))
+        return {'user_id': user_id, 'event_id': event_id, 'attended': _flag(row, 'attended')}
+
+    def write(self, values):
+        db.session.execute(db.insert(registrations), values)
+        pairs = [(value['user_id'], value['event_id']) for value in values]
+        # A registered student no longer waits for a seat
+        db.session.execute(db.delete(Waitlist).where(tuple_(Waitlist.user_id, Waitlist.event_id).in_(pairs))
+                           .execution_options(synchronize_session=False))
+        EventStats.rebuild(sorted({event_id for _, event_id in pairs}))
+
+    def close(self):
+        pass
+
+
+IMPORTERS = {
+    'users': UserImporter,
+    'events': EventImporter,
+    'registrations': RegistrationImporter,
+}
+
+
+class ImportReport:
+    """Counts rows and keeps the per-row errors of an import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.batches = 0
+        self.errors = []
+        self.hash_seconds = 0.0
+        self.started = time.perf_counter()
+
+    def error(self, line_number, message, row):
+        # Rejected rows are printed and saved, so plain-text passwords are left out
+        if row is not None and 'password' in row:
+            row = dict(row, password='***')
+        self.errors.append({'line': line_number, 'error': message, 'row': row})
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def run_import(kind, path, fmt=None, batch_size=1000, dry_run=False, processes=None, progress=None):
+    """
+    Validates and imports a file of users, events or registrations, committing
+    one transaction per batch. A batch the database rejects is rolled back and
+    its rows are reported as errors; later batches still run, and may contain
+    the same usernames, emails or registrations again.
+
+    :param kind: 'users', 'events' or 'registrations'.
+    :param dry_run: Validate every row without hashing or writing anything.
+    :param progress: Called with the report after each batch.
+    :return: An ImportReport.
+    """
+    report = ImportReport()
+    importer = IMPORTERS[kind](processes=processes)
+    try:
+        for batch in _chunks(read_rows(path, fmt), batch_size):
+            values, lines = [], []
+            importer.start_batch()
+            for line_number, row in batch:
+                report.rows += 1
+                try:
+                    if isinstance(row, RowError):
+                        raise row
+                    values.append(importer.validate(row))
+                    lines.append((line_number, row))
+                except RowError as e:
+                    report.error(line_number, str(e), row if isinstance(row, dict) else None)
+
+            if values and not dry_run:
+                try:
+                    importer.write(values)
+                    db.session.commit()
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    importer.discard_batch()
+                    message = f'Batch rejected by the database: {e.__class__.__name__}: {getattr(e, "orig", e)}'
+                    for line_number, row in lines:
+                        report.error(line_number, message, row)
+                    values = []
+            report.imported += len(values)
+            report.batches += 1
+            if progress:
+                progress(report)
+    finally:
+        if not dry_run:
+            importer.close()
+    report.hash_seconds = getattr(importer, 'hash_seconds', 0.0)
+    return report
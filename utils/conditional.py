@@ -0,0 +1,45 @@
+# eventhive/utils/conditional.py
+
+import hashlib
+from functools import wraps
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+
+
+def conditional_get(validator):
+    """
+    Answers a GET with 304 Not Modified, without running the view, when the
+    client's copy is still current. The validator is a cheap query whose result
+    changes whenever the page would, e.g. MAX(updated_at) and row counts.
+
+    Only If-None-Match is honoured. A deletion can leave MAX(updated_at) as
+    it was, so a Last-Modified date alone cannot tell that the page changed.
+
+    :param validator: Called with the view's arguments; returns a tuple of values.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # A pending flash message is part of the next page, so it must be rendered
+            if request.method != 'GET' or '_flashes' in session:
+                return view(*args, **kwargs)
+
+            values = validator(*args, **kwargs)
+            # The render cache keys its entries on these too, so a cached body matches its ETag
+            g.conditional_values = values
+            viewer = (current_user.id, current_user.role) if current_user.is_authenticated else None
+            fingerprint = repr((current_app.config['ETAG_VERSION'], viewer, request.full_path, values))
+            etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+            response.set_etag(etag, weak=True)
+            # Browsers must revalidate every time; the page differs per logged-in user
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,92 @@
+# eventhive/utils/export.py
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from flask import Response, stream_with_context
+
+# Rows are fetched from the database and flushed to the client this many at a time
+EXPORT_BATCH_ROWS = 1000
+# Output is sent in pieces of roughly this many bytes
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def _csv_cell(value):
+    # Spreadsheets run cells starting with these characters as formulas
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _encode(rows, columns, fmt):
+    """Yields the rows as CSV (with a header) or JSON lines, in pieces of about EXPORT_CHUNK_BYTES."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+    for row in rows:
+        if writer:
+            writer.writerow([_csv_cell(value) for value in row])
+        else:
+            buffer.write(json.dumps({column: _json_value(value) for column, value in zip(columns, row)}) + '\n')
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes a gzip header
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(statement, columns, fmt, filename, compress=False):
+    """
+    Streams the result of a SELECT as a file download without loading it into memory.
+    Rows are fetched EXPORT_BATCH_ROWS at a time (with a server-side cursor where the
+    database supports one) and encoded as they arrive, so memory use does not grow with
+    the number of rows.
+
+    :param statement: A select() whose columns match columns, in order.
+    :param fmt: 'csv' or 'jsonl'.
+    :param filename: Download name without extension.
+    :param compress: Gzip the output and add '.gz' to the name.
+    """
+    from models.models import db
+
+    def rows():
+        result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        try:
+            for partition in result.partitions():
+                yield from partition
+        finally:
+            result.close()
+
+    body = _encode(rows(), columns, fmt)
+    name = f"{filename}.{fmt}"
+    if compress:
+        body = _gzip(body)
+        name += '.gz'
+    response = Response(stream_with_context(body), mimetype='application/gzip' if compress else FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}"'
+    response.headers['Cache-Control'] = 'private, no-store'
+    # Ask reverse proxies to pass the pieces on as they come instead of buffering the whole file
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,355 @@
+# eventhive/utils/metrics.py
+
+import atexit
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+from utils.process_local import ProcessLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows, where only the single-process development server runs
+    fcntl = None
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+METRICS = {
+    'eventhive_http_requests_total': ('counter', 'Requests handled, by endpoint, method and status.'),
+    'eventhive_http_request_duration_seconds': ('histogram', 'Time spent handling a request.'),
+    'eventhive_db_queries_per_request': ('histogram', 'SQL statements executed per request.'),
+    'eventhive_db_queries_total': ('counter', 'SQL statements executed while handling requests.'),
+    'eventhive_db_duration_seconds_total': ('counter', 'Time spent executing SQL while handling requests.'),
+    'eventhive_template_render_seconds_total': ('counter', 'Time spent rendering templates.'),
+    'eventhive_qr_render_seconds_total': ('counter', 'Time spent encoding QR code images.'),
+}
+
+
+WORKER_FILE = re.compile(r'worker-(\d+)(-[0-9a-f]+)?\.json$')
+
+
+def _merge(counters, histograms, snapshot):
+    """Adds a snapshot's counters and histograms to the merged ones, in place."""
+    for name, labels, value in snapshot['counters']:
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, h in snapshot['histograms']:
+        key = (name, tuple(sorted(labels.items())))
+        merged = histograms.setdefault(key, {'buckets': h['buckets'], 'counts': [0] * len(h['buckets']),
+                                             'sum': 0.0, 'count': 0})
+        merged['counts'] = [a + b for a, b in zip(merged['counts'], h['counts'])]
+        merged['sum'] += h['sum']
+        merged['count'] += h['count']
+
+
+def _to_snapshot(counters, histograms):
+    return {
+        'counters': [[name, dict(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, dict(labels), dict(h, counts=list(h['counts']))]
+                       for (name, labels), h in histograms.items()],
+    }
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    """Writes via a temporary file so readers never see a partial file."""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms of one worker. Each worker periodically writes a
+    snapshot to its own file in a directory shared by the workers on the host;
+    /metrics sums the snapshots of every worker, so totals stay monotonic
+    even after a worker has been restarted.
+
+    File names carry a random suffix besides the PID, so a worker never
+    overwrites the file of an earlier one whose PID it was given. Files of
+    exited workers are folded into archive.json when metrics are collected,
+    which keeps the directory from growing as workers are recycled.
+    """
+
+    def __init__(self, directory, flush_interval):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.path = os.path.join(directory, f"worker-{os.getpid()}-{uuid.uuid4().hex[:12]}.json")
+        self.archive_path = os.path.join(directory, 'archive.json')
+        self.lock_path = os.path.join(directory, 'archive.lock')
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._flushed_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': list(buckets), 'counts': [0] * len(buckets),
+                                                     'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram['counts'][i] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return _to_snapshot(self._counters, self._histograms)
+
+    def maybe_flush(self):
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Writes this worker's snapshot to its file."""
+        self._flushed_at = time.monotonic()
+        _write_json(self.path, self.snapshot())
+
+    def collect(self):
+        """
+        Merges the archived totals with the latest snapshot of every living
+        worker, first folding the files of exited workers into the archive.
+        Runs under a lock on the directory, so that a scrape in another worker
+        never sees a file both in the archive and on its own, or in neither.
+        """
+        with open(self.lock_path, 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                archive = _read_json(self.archive_path) or {'counters': [], 'histograms': [], 'folded': []}
+                counters, histograms = {}, {}
+                _merge(counters, histograms, archive)
+
+                live, dead = [], []
+                for path in glob.glob(os.path.join(self.directory, 'worker-*.json')):
+                    name = os.path.basename(path)
+                    match = WORKER_FILE.match(name)
+                    if name in archive['folded']:
+                        # Already archived by a collect that stopped before deleting it
+                        dead.append(path)
+                    elif match and fcntl is not None and not _process_exists(int(match.group(1))):
+                        snapshot = _read_json(path)
+                        if snapshot is not None:
+                            _merge(counters, histograms, snapshot)
+                        dead.append(path)
+                    else:
+                        live.append(path)
+
+                if dead:
+                    # The archive names the files it absorbed until they are gone, so they are never counted twice
+                    _write_json(self.archive_path, dict(_to_snapshot(counters, histograms),
+                                                        folded=[os.path.basename(path) for path in dead]))
+                    for path in dead:
+                        try:
+                            os.remove(path)
+                        except FileNotFoundError:
+                            pass
+
+                for path in live:
+                    snapshot = _read_json(path)
+                    if snapshot is not None:
+                        _merge(counters, histograms, snapshot)
+                return counters, histograms
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(counters, histograms):
+    """Formats merged counters and histograms in the Prometheus text exposition format."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+        for (metric, labels), h in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(h['buckets'], h['counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {h['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(h['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {h['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+_registry = ProcessLocal()
+
+
+def _create_registry(config):
+    registry = MetricsRegistry(config['METRICS_DIR'], config['METRICS_FLUSH_INTERVAL'])
+    atexit.register(registry.flush)
+    return registry
+
+
+def get_metrics_registry():
+    """Returns this process's metrics registry, or None when METRICS_ENABLED is off."""
+    config = current_app.config
+    if not config['METRICS_ENABLED']:
+        return None
+    return _registry.get(lambda: _create_registry(config))
+
+
+# --------------------------- Per-request timing --------------------------- #
+class RequestTiming:
+    """Accumulates where one request spends its time."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.render = 0.0
+        self.qr = 0.0
+        self._render_starts = []
+
+    def server_timing(self, total):
+        queries = '1 query' if self.queries == 1 else f'{self.queries} queries'
+        parts = [f'db;dur={self.db * 1000:.1f};desc="{queries}"']
+        if self.render:
+            parts.append(f'render;dur={self.render * 1000:.1f}')
+        if self.qr:
+            parts.append(f'qr;dur={self.qr * 1000:.1f}')
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def current_timing():
+    """Returns the timing of the request being handled, or None outside of one."""
+    return g.get('request_timing') if has_request_context() else None
+
+
+@contextmanager
+def timed(section):
+    """
+    Adds the time spent in the block to a section ('render' or 'qr') of the
+    current request's timing. Does nothing outside of a request.
+    """
+    timing = current_timing()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timing is not None:
+            setattr(timing, section, getattr(timing, section) + time.perf_counter() - started)
+
+
+@sa_event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._timing_started = time.perf_counter()
+
+
+@sa_event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = current_timing()
+    if timing is not None and context is not None:
+        timing.queries += 1
+        timing.db += time.perf_counter() - context._timing_started
+
+
+def _before_render(sender, template, context, **extra):
+    timing = current_timing()
+    if timing is not None:
+        timing._render_starts.append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    timing = current_timing()
+    if timing is not None and timing._render_starts:
+        started = timing._render_starts.pop()
+        # Only the outermost template counts, so nested render_template calls are not added twice
+        if not timing._render_starts:
+            timing.render += time.perf_counter() - started
+
+
+def _start_timing():
+    g.request_timing = RequestTiming()
+
+
+def _finish_timing(response):
+    timing = g.pop('request_timing', None)
+    if timing is None:
+        return response
+    total = time.perf_counter() - timing.started
+    config = current_app.config
+    if config['SERVER_TIMING']:
+        response.headers['Server-Timing'] = timing.server_timing(total)
+
+    registry = get_metrics_registry()
+    if registry is not None:
+        # Unmatched URLs share one label so scanners cannot blow up the series count
+        endpoint = request.url_rule.endpoint if request.url_rule else 'unmatched'
+        labels = {'endpoint': endpoint}
+        registry.inc('eventhive_http_requests_total',
+                     dict(labels, method=request.method, status=str(response.status_code)))
+        registry.observe('eventhive_http_request_duration_seconds', dict(labels, method=request.method),
+                         total, LATENCY_BUCKETS)
+        registry.observe('eventhive_db_queries_per_request', labels, timing.queries, QUERY_COUNT_BUCKETS)
+        registry.inc('eventhive_db_queries_total', labels, timing.queries)
+        registry.inc('eventhive_db_duration_seconds_total', labels, timing.db)
+        registry.inc('eventhive_template_render_seconds_total', labels, timing.render)
+        registry.inc('eventhive_qr_render_seconds_total', labels, timing.qr)
+        registry.maybe_flush()
+    return response
+
+
+def init_metrics(app):
+    """Registers the request hooks and template signals that time every request."""
+    app.before_request(_start_timing)
+    app.after_request(_finish_timing)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
@@ -0,0 +1,146 @@
+# eventhive/utils/nplusone.py
+
+import inspect
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+# Literals and bound parameter lists are stripped so that repeats of one query differ only in values
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_PARAM = re.compile(r'%\(\w+\)s|%s|:\w+|\$\d+')
+_SPACE = re.compile(r'\s+')
+
+
+class NPlusOneError(AssertionError):
+    """Raised at the end of a request that repeated a query shape more than allowed (NPLUSONE_MODE 'raise')."""
+
+
+def normalize_statement(statement):
+    """Reduces a SQL statement to its shape: parameters, literals and IN lists become '?'."""
+    shape = _STRING.sub('?', statement)
+    shape = _PARAM.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def _frame_location(frame):
+    filename = os.path.abspath(frame.f_code.co_filename)
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+def _call_site(view_code):
+    """
+    Returns where the application issued the current query: the line of the view
+    function, the innermost frame of the app's own code (a model method or helper
+    the view called), and, when it ran while rendering, the template line.
+    """
+    view = code = template = None
+    frame = sys._getframe(2)
+    while frame is not None and view is None:
+        jinja_template = frame.f_globals.get('__jinja_template__')
+        if jinja_template is not None:
+            if template is None:
+                template = f"{jinja_template.name}:{jinja_template.get_corresponding_lineno(frame.f_lineno)}"
+        elif frame.f_code is view_code:
+            view = _frame_location(frame)
+        elif code is None:
+            filename = os.path.abspath(frame.f_code.co_filename)
+            if filename.startswith(_ROOT) and filename != _THIS_FILE and 'site-packages' not in filename:
+                code = _frame_location(frame)
+        frame = frame.f_back
+    return view, code, template
+
+
+@sa_event.listens_for(Engine, 'before_cursor_execute')
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    audit = g.get('query_audit')
+    if audit is not None:
+        audit[normalize_statement(statement)][_call_site(g.query_audit_view)] += 1
+
+
+def _start_audit():
+    if current_app.config['NPLUSONE_MODE'] in ('log', 'raise'):
+        g.query_audit = defaultdict(Counter)
+        # The undecorated view function, to find its frame on the stack
+        view = current_app.view_functions.get(request.endpoint)
+        g.query_audit_view = inspect.unwrap(view).__code__ if view is not None else None
+
+
+def find_repeated_queries(audit, threshold):
+    """
+    Returns the query shapes a request issued more than threshold times, most
+    repeated first, each with the call sites that issued it.
+    """
+    offenders = []
+    for shape, sites in audit.items():
+        count = sum(sites.values())
+        if count > threshold:
+            offenders.append({
+                'statement': shape,
+                'count': count,
+                'call_sites': [{'view': view, 'code': code, 'template': template, 'count': n}
+                               for (view, code, template), n in sites.most_common()],
+            })
+    offenders.sort(key=lambda offender: offender['count'], reverse=True)
+    return offenders
+
+
+def _check_audit(response):
+    audit = g.pop('query_audit', None)
+    if not audit:
+        return response
+    config = current_app.config
+    offenders = find_repeated_queries(audit, config['NPLUSONE_THRESHOLD'])
+    if not offenders:
+        return response
+
+    report = {
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'status': response.status_code,
+        'total_queries': sum(sum(sites.values()) for sites in audit.values()),
+        'threshold': config['NPLUSONE_THRESHOLD'],
+        'offenders': offenders,
+    }
+    if config['NPLUSONE_MODE'] == 'raise':
+        worst = offenders[0]
+        site = worst['call_sites'][0]
+        raise NPlusOneError(
+            f"{request.endpoint} ran the same query {worst['count']} times "
+            f"(from {site['template'] or site['code'] or site['view']}): {worst['statement']}"
+        )
+
+    logger.warning("Repeated queries in %s: %s", request.endpoint,
+                   ', '.join(f"{o['count']}x {o['statement'][:80]}" for o in offenders))
+    path = config['NPLUSONE_REPORT_PATH']
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One JSON object per line; appends of a single line do not interleave between workers
+        with open(path, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+    return response
+
+
+def init_nplusone(app):
+    """Registers the per-request query audit; it only records while NPLUSONE_MODE is 'log' or 'raise'."""
+    app.before_request(_start_audit)
+    app.after_request(_check_audit)
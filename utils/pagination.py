@@ -0,0 +1,93 @@
+# eventhive/utils/pagination.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import abort
+from sqlalchemy import tuple_
+
+
+class KeysetPage:
+    """One page of rows plus the opaque cursors needed to fetch its neighbours."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values):
+    """Encodes a tuple of key values into a URL-safe cursor string."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decodes a cursor produced by encode_cursor back into typed key values.
+    Aborts with 400 if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(v) if col.type.python_type is datetime else col.type.python_type(v)
+            for v, col in zip(payload, columns)
+        )
+    except (ValueError, TypeError, binascii.Error):
+        abort(400)
+
+
+def paginate_keyset(query, columns, after=None, before=None, per_page=20, descending=False):
+    """
+    Paginates a query by seeking on an ordered, unique tuple of key columns
+    instead of using OFFSET, so every page costs one index range scan.
+
+    :param query: The query to paginate. Its rows must expose each key column by name.
+    :param columns: The key columns, e.g. [Event.event_date, Event.id]. The last one must be unique.
+    :param after: Cursor of the last row of the previous page (move forward).
+    :param before: Cursor of the first row of the next page (move backward).
+    :param per_page: Maximum number of rows per page.
+    :param descending: Whether the natural ordering is descending.
+    :return: A KeysetPage.
+    """
+    key = tuple_(*columns)
+    backwards = before is not None
+    # Walking backwards flips the ordering; the rows are reversed again below.
+    reverse = descending != backwards
+
+    cursor = before if backwards else after
+    if cursor is not None:
+        bound = decode_cursor(cursor, columns)
+        query = query.filter(key < bound if reverse else key > bound)
+
+    ordering = [col.desc() if reverse else col.asc() for col in columns]
+    rows = query.order_by(*ordering).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def cursor_of(row):
+        return encode_cursor(tuple(getattr(row, col.key) for col in columns))
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if backwards:
+            next_cursor = cursor_of(rows[-1])
+            prev_cursor = cursor_of(rows[0]) if has_more else None
+        else:
+            next_cursor = cursor_of(rows[-1]) if has_more else None
+            prev_cursor = cursor_of(rows[0]) if after is not None else None
+
+    return KeysetPage(rows, next_cursor, prev_cursor)
@@ -0,0 +1,100 @@
+# eventhive/utils/passwords.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+from utils.process_local import ProcessLocal
+
+
+class VerifierBusy(Exception):
+    """Raised when a password check cannot be scheduled or does not finish in time."""
+
+
+class PasswordVerifier:
+    """
+    Runs password hash checks on a small bounded thread pool.
+
+    At most max_workers hashes are computed at once and at most max_pending
+    more may wait; further checks are refused immediately instead of queuing,
+    so a login storm is shed rather than allowed to occupy every request thread.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, timeout=10):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self.timeout = timeout
+
+    def verify(self, pwhash, password):
+        """
+        Checks a password against a hash on the pool.
+        :raises VerifierBusy: If the pool is saturated or the check times out.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise VerifierBusy("Too many password checks in progress")
+        try:
+            future = self._executor.submit(check_password_hash, pwhash, password)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise VerifierBusy("Password check timed out") from None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def normalize_hash_method(method):
+    """
+    Expands a Werkzeug hash method to the full form stored in hashes,
+    e.g. 'scrypt' to 'scrypt:32768:8:1' and 'pbkdf2' to 'pbkdf2:sha256:1000000'.
+    :raises ValueError: If the method is not scrypt or pbkdf2.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = (args + [''] * 3)[:3]
+        return f"scrypt:{n or 2 ** 15}:{r or 8}:{p or 1}"
+    if name == 'pbkdf2':
+        hash_name, iterations = (args + [''] * 2)[:2]
+        return f"pbkdf2:{hash_name or 'sha256'}:{iterations or DEFAULT_PBKDF2_ITERATIONS}"
+    raise ValueError(f"Unsupported password hash method: {method!r}")
+
+
+def hash_password(password):
+    """Hashes a password under the configured PASSWORD_HASH_METHOD."""
+    return generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def needs_rehash(pwhash):
+    """Returns whether a hash was made under a different policy than the configured one."""
+    method = pwhash.split('$', 1)[0]
+    return method != normalize_hash_method(current_app.config['PASSWORD_HASH_METHOD'])
+
+
+_verifier = ProcessLocal()
+
+
+def get_password_verifier():
+    """Returns this process's password verifier, or None when PASSWORD_HASH_WORKERS is 0."""
+    config = current_app.config
+    if config['PASSWORD_HASH_WORKERS'] <= 0:
+        return None
+    return _verifier.get(lambda: PasswordVerifier(
+        max_workers=config['PASSWORD_HASH_WORKERS'],
+        max_pending=config['PASSWORD_HASH_MAX_PENDING'],
+        timeout=config['PASSWORD_HASH_TIMEOUT'],
+    ))
+
+
+def verify_password(pwhash, password):
+    """
+    Checks a password against its hash, on the bounded verifier when one is configured.
+    :raises VerifierBusy: If the verifier is saturated.
+    """
+    verifier = get_password_verifier()
+    if verifier is None:
+        return check_password_hash(pwhash, password)
+    return verifier.verify(pwhash, password)
@@ -0,0 +1,44 @@
+# eventhive/utils/process_local.py
+
+import os
+import threading
+
+
+class ProcessLocal:
+    """
+    Holds one object per process, such as a cache or an executor, created on first use.
+
+    gunicorn forks workers from a master that may already have imported the app
+    (PRELOAD_APP), so an object inherited from the parent is replaced in the child.
+    Creation is locked: request threads that race on first use share one object.
+    """
+
+    def __init__(self):
+        self._entry = None  # (pid, object), read and replaced as a whole
+        self._lock = threading.Lock()
+        # A lock held by another thread at fork time would stay held in the child
+        os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def get(self, factory):
+        """Returns this process's object, calling factory() to create it the first time."""
+        entry = self._entry
+        if entry is not None and entry[0] == os.getpid():
+            return entry[1]
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[0] != os.getpid():
+                entry = self._entry = (os.getpid(), factory())
+            return entry[1]
+
+    def peek(self):
+        """Returns this process's object, or None if it has not been created yet."""
+        entry = self._entry
+        return entry[1] if entry is not None and entry[0] == os.getpid() else None
+
+    def reset(self):
+        """Forgets the object, so the next get() creates a new one (e.g. after a config change)."""
+        with self._lock:
+            self._entry = None
@@ -0,0 +1,115 @@
+# eventhive/utils/purge.py
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from models.models import db, Event, Feedback, Waitlist, registrations
+from utils.process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+
+def soft_delete_event(event_id):
+    """Hides an event from every query at once; its rows are removed later by purge_event. The caller commits."""
+    db.session.execute(
+        db.update(Event).where(Event.id == event_id).values(deleted_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def purge_event(event_id, chunk_size=1000, pause=0.0):
+    """
+    Deletes a soft-deleted event's registrations, waitlist and feedback in
+    chunks, committing after each, and then the event itself. Short
+    transactions keep writers such as registrations for other events from
+    queuing behind one huge DELETE.
+
+    :param pause: Seconds to sleep between chunks, to let other writers in.
+    :return: The number of rows deleted.
+    """
+    chunks = [
+        (registrations, registrations.c.event_id, registrations.c.user_id),
+        (Waitlist.__table__, Waitlist.event_id, Waitlist.id),
+        (Feedback.__table__, Feedback.event_id, Feedback.id),
+    ]
+    deleted = 0
+    for table, event_column, key in chunks:
+        while True:
+            batch = db.select(key).where(event_column == event_id).limit(chunk_size)
+            count = db.session.execute(
+                db.delete(table).where(event_column == event_id, key.in_(batch))
+            ).rowcount
+            db.session.commit()
+            deleted += count
+            if count < chunk_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+    Event.delete_with_dependents(event_id)
+    db.session.commit()
+    return deleted + 1
+
+
+def purge_deleted_events(chunk_size=1000, pause=0.0):
+    """Purges every soft-deleted event. Returns the IDs of the purged events."""
+    event_ids = db.session.execute(
+        db.select(Event.id).where(Event.deleted_at.isnot(None)).execution_options(include_deleted=True)
+    ).scalars().all()
+    for event_id in event_ids:
+        purge_event(event_id, chunk_size, pause)
+    return event_ids
+
+
+class EventPurger:
+    """
+    Purges soft-deleted events one at a time on a background thread, so the
+    request that deleted them returns immediately. Events left behind by a
+    worker that exits mid-purge stay hidden until `flask purge-deleted-events`.
+    """
+
+    def __init__(self, app, chunk_size, pause):
+        self.app = app
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='event-purger', daemon=True)
+        self._thread.start()
+
+    def submit(self, event_id):
+        self._queue.put(event_id)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def join(self):
+        """Blocks until every submitted event is purged."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            event_id = self._queue.get()
+            started = time.monotonic()
+            try:
+                with self.app.app_context():
+                    try:
+                        rows = purge_event(event_id, self.chunk_size, self.pause)
+                        logger.info("Purged event %s (%d rows) in %.1fs", event_id, rows, time.monotonic() - started)
+                    except Exception:
+                        db.session.rollback()
+                        logger.exception("Could not purge event %s", event_id)
+            finally:
+                self._queue.task_done()
+
+
+_purger = ProcessLocal()
+
+
+def get_event_purger():
+    """Returns this process's event purger, starting its thread on first use."""
+    config = current_app.config
+    return _purger.get(lambda: EventPurger(current_app._get_current_object(),
+                                           config['EVENT_PURGE_CHUNK_SIZE'], config['EVENT_PURGE_PAUSE']))
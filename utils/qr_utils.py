@@ -1,32 +1,161 @@
 # eventhive/utils/qr_utils.py
 
-import qrcode
+import base64
+import hashlib
+import hmac
+import io
 import os
+import threading
+from collections import OrderedDict
+from flask import current_app
+from utils.metrics import timed
+from utils.process_local import ProcessLocal
 
-def generate_qr_code(data, user_id, event_id, app_instance):
+
+class LRUCache:
+    """A small thread-safe least-recently-used cache for encoded QR images."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Encoded PNG bytes keyed by content digest, shared by every request in this worker
+_memory_cache = ProcessLocal()
+
+
+def get_memory_cache():
+    """Returns this worker's in-memory QR image cache."""
+    return _memory_cache.get(lambda: LRUCache(current_app.config['QR_MEMORY_CACHE_SIZE']))
+
+
+# Signed tokens look like "EH1:1F:2:<signature>". Every character is in the QR
+# alphanumeric set, which encodes denser (and scans faster) than byte mode.
+QR_TOKEN_PREFIX = 'EH1'
+_BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _to_base36(number):
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = _BASE36[remainder] + digits
+        if number == 0:
+            return digits
+
+
+def _sign(message):
+    key = current_app.config['QR_SIGNING_KEY'].encode('utf-8')
+    mac = hmac.new(key, message.encode('ascii'), hashlib.sha256).digest()
+    # 80 bits of HMAC is plenty against forgery and keeps the code small
+    return base64.b32encode(mac[:10]).decode('ascii')
+
+
+def qr_payload(user_id, event_id):
+    """Builds the HMAC-signed token encoded in a registration's QR code."""
+    body = f"{QR_TOKEN_PREFIX}:{_to_base36(user_id)}:{_to_base36(event_id)}"
+    return f"{body}:{_sign(body)}"
+
+
+def parse_qr_payload(data):
     """
-    Generates a QR code for a user's event registration.
-    
+    Verifies a scanned token and extracts the user and event IDs from it.
+    :raises ValueError: If the text is not a validly signed registration token.
+    """
+    parts = data.strip().upper().split(':')
+    if len(parts) != 4 or parts[0] != QR_TOKEN_PREFIX:
+        raise ValueError(f"Not a registration QR code: {data!r}")
+    body, signature = ':'.join(parts[:3]), parts[3]
+    if not hmac.compare_digest(signature, _sign(body)):
+        raise ValueError(f"Invalid QR code signature: {data!r}")
+    return int(parts[1], 36), int(parts[2], 36)
+
+
+def qr_digest(data):
+    """Returns the content address (and strong ETag) of the QR code for the given data."""
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def qr_cache_path(digest):
+    """Returns the on-disk path of a cached QR image, sharded by the first digest bytes."""
+    return os.path.join(current_app.config['QR_CACHE_DIR'], digest[:2], digest[2:4], f"{digest}.png")
+
+
+def render_qr_png(data):
+    """Encodes the given data as a QR code and returns the PNG bytes."""
+    # qrcode and Pillow are slow to import and most workers only serve cached images
+    import qrcode
+    buffer = io.BytesIO()
+    qrcode.make(data).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def get_qr_png(data):
+    """
+    Returns the PNG bytes of the QR code for the given data.
+    Looks in the in-memory LRU first, then in the on-disk cache, and only
+    renders the image (and stores it in both caches) on a miss.
+    """
+    digest = qr_digest(data)
+    memory_cache = get_memory_cache()
+
+    png = memory_cache.get(digest)
+    if png is not None:
+        return png
+
+    path = qr_cache_path(digest)
+    try:
+        with open(path, 'rb') as f:
+            png = f.read()
+    except FileNotFoundError:
+        with timed('qr'):
+            png = render_qr_png(data)
+        write_cache_file(path, png)
+
+    memory_cache.set(digest, png)
+    return png
+
+
+def generate_qr_code(data):
+    """
+    Queues a QR code on the background worker so it is rendered ahead of its first request.
+    If the queue is full the image is simply rendered lazily by qr.qr_code instead.
+
     :param data: The unique data to encode (e.g., a confirmation string).
-    :param user_id: The ID of the user.
-    :param event_id: The ID of the event.
-    :param app_instance: The current Flask app instance to get the path.
-    :return: The filename of the generated QR code.
+    :return: The content digest of the QR code.
     """
-    # Define the filename for the QR code image
-    filename = f"event{event_id}_user{user_id}.png"
-    
-    # Define the path to save the QR code image
-    # It will be saved in the 'static/qr_codes/' folder
-    qr_code_dir = os.path.join(app_instance.root_path, 'static', 'qr_codes')
-    
-    # Create the directory if it doesn't exist
-    os.makedirs(qr_code_dir, exist_ok=True)
-    
-    filepath = os.path.join(qr_code_dir, filename)
-
-    # Generate the QR code image
-    img = qrcode.make(data)
-    img.save(filepath)
-    
-    return filename
\ No newline at end of file
+    from utils.qr_worker import get_qr_worker
+    get_qr_worker().submit(data)
+    return qr_digest(data)
+
+
+def write_cache_file(path, content):
+    """Writes a cache file via a temporary file so concurrent readers never see a partial image."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
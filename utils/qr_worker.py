@@ -0,0 +1,136 @@
+# eventhive/utils/qr_worker.py
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from flask import current_app
+from utils.qr_utils import qr_digest, qr_cache_path, render_qr_png, get_memory_cache, write_cache_file
+from utils.process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+
+class QRWorker:
+    """
+    A bounded background executor that pre-renders QR images into the caches.
+
+    Jobs are deduplicated by content digest while they are in flight,
+    failed encodes are retried, and queue depth and latency are tracked.
+    """
+
+    def __init__(self, kind='thread', max_workers=2, max_queue=1000, retries=2, latency_window=1000):
+        executor_class = ProcessPoolExecutor if kind == 'process' else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=max_workers)
+        self.max_queue = max_queue
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._failed = set()
+        self._latencies = deque(maxlen=latency_window)
+        self._counters = {
+            'submitted': 0, 'deduplicated': 0, 'rejected': 0,
+            'completed': 0, 'retried': 0, 'failed': 0,
+        }
+
+    def submit(self, data):
+        """
+        Queues a QR image for rendering.
+        :return: True if the job is queued (or already in flight), False if the queue is full.
+        """
+        digest = qr_digest(data)
+        with self._lock:
+            if digest in self._in_flight:
+                self._counters['deduplicated'] += 1
+                return True
+            if len(self._in_flight) >= self.max_queue:
+                self._counters['rejected'] += 1
+                return False
+            self._in_flight[digest] = time.monotonic()
+            self._failed.discard(digest)
+            self._counters['submitted'] += 1
+
+        # Resolve app-bound state now; completion callbacks run outside the app context
+        try:
+            self._dispatch(data, digest, qr_cache_path(digest), get_memory_cache(), attempt=0)
+        except Exception:
+            with self._lock:
+                self._in_flight.pop(digest, None)
+                self._counters['rejected'] += 1
+            logger.exception("Could not queue QR code %s", digest)
+            return False
+        return True
+
+    def status(self, data):
+        """Returns 'ready', 'pending', 'failed' or 'missing' for the QR image of the given data."""
+        digest = qr_digest(data)
+        with self._lock:
+            if digest in self._in_flight:
+                return 'pending'
+            if digest in self._failed:
+                return 'failed'
+        if get_memory_cache().get(digest) is not None or os.path.exists(qr_cache_path(digest)):
+            return 'ready'
+        return 'missing'
+
+    def stats(self):
+        """Returns the worker's counters, current queue depth and job latency percentiles (in ms)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self._counters, queue_depth=len(self._in_flight))
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        stats.update(latency_ms={'p50': percentile(0.50), 'p95': percentile(0.95), 'max': percentile(1.0)})
+        return stats
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _dispatch(self, data, digest, path, memory_cache, attempt):
+        future = self._executor.submit(render_qr_png, data)
+        future.add_done_callback(
+            lambda f: self._on_done(f, data, digest, path, memory_cache, attempt))
+
+    def _on_done(self, future, data, digest, path, memory_cache, attempt):
+        try:
+            png = future.result()
+            write_cache_file(path, png)
+            memory_cache.set(digest, png)
+        except Exception:
+            if attempt < self.retries:
+                with self._lock:
+                    self._counters['retried'] += 1
+                self._dispatch(data, digest, path, memory_cache, attempt + 1)
+                return
+            with self._lock:
+                self._in_flight.pop(digest, None)
+                self._failed.add(digest)
+                self._counters['failed'] += 1
+            logger.exception("Giving up on QR code %s after %d attempts", digest, attempt + 1)
+            return
+
+        with self._lock:
+            started = self._in_flight.pop(digest, None)
+            self._counters['completed'] += 1
+            if started is not None:
+                self._latencies.append(time.monotonic() - started)
+
+
+_worker = ProcessLocal()
+
+
+def get_qr_worker():
+    """Returns this process's QR worker, creating it from the app config on first use."""
+    config = current_app.config
+    return _worker.get(lambda: QRWorker(
+        kind=config['QR_WORKER_KIND'],
+        max_workers=config['QR_WORKER_MAX_WORKERS'],
+        max_queue=config['QR_WORKER_MAX_QUEUE'],
+        retries=config['QR_WORKER_RETRIES'],
+    ))
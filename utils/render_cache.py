@@ -0,0 +1,221 @@
+# eventhive/utils/render_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, request, session
+from flask_login import current_user
+from utils.qr_utils import LRUCache
+from utils.process_local import ProcessLocal
+
+
+class MemoryBackend:
+    """Keeps rendered pages in this worker's memory. Invalidation only reaches this worker."""
+
+    def __init__(self, maxsize):
+        self._entries = LRUCache(maxsize)
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def version(self):
+        return self._version
+
+    def bump_version(self):
+        with self._lock:
+            self._version += 1
+        self._entries.clear()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, entry):
+        self._entries.set(key, entry)
+
+
+class SQLiteBackend:
+    """
+    Keeps rendered pages in a SQLite file shared by every worker on the host,
+    so one worker's invalidation is seen by all of them. The oldest entries
+    are evicted first once maxsize is reached.
+    """
+
+    def __init__(self, path, maxsize):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS version (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO version (id, value) VALUES (1, 0)")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, body TEXT NOT NULL, "
+                         "stored_at REAL NOT NULL, render_ms REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_stored_at ON entries (stored_at)")
+
+    def _connect(self):
+        # sqlite3 connections must not cross threads or forks
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def version(self):
+        return self._connect().execute("SELECT value FROM version WHERE id = 1").fetchone()[0]
+
+    def bump_version(self):
+        with self._connect() as conn:
+            conn.execute("UPDATE version SET value = value + 1 WHERE id = 1")
+            conn.execute("DELETE FROM entries")
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT body, stored_at, render_ms FROM entries WHERE key = ?", (key,)).fetchone()
+        return tuple(row) if row else None
+
+    def set(self, key, entry):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries (key, body, stored_at, render_ms) VALUES (?, ?, ?, ?)",
+                         (key, *entry))
+            conn.execute("DELETE FROM entries WHERE key NOT IN "
+                         "(SELECT key FROM entries ORDER BY stored_at DESC LIMIT ?)", (self.maxsize,))
+
+
+class RenderCache:
+    """
+    Caches the HTML of public pages, keyed by a version counter that every event
+    write bumps, and every change to an event's seat count too, since the event
+    list shows it. Entries also expire after ttl seconds, a bound for writes that
+    reach the database without going through the app.
+    """
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.render_ms = 0.0
+        self.saved_ms = 0.0
+        self._lock = threading.Lock()
+
+    def key(self, variant):
+        # Under conditional_get, the validator values the ETag was built from; an
+        # entry rendered before they changed is never served with the newer ETag
+        validator = g.get('conditional_values')
+        if validator is not None:
+            variant = f"{variant}:{hashlib.sha1(repr(validator).encode('utf-8')).hexdigest()}"
+        return f"{self.backend.version()}:{variant}:{request.full_path}"
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        if entry is not None and entry[1] + self.ttl > time.time():
+            with self._lock:
+                self.hits += 1
+                self.saved_ms += entry[2]
+            return entry[0]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, body, render_ms):
+        with self._lock:
+            self.render_ms += render_ms
+        self.backend.set(key, (body, time.time(), render_ms))
+
+    def invalidate(self):
+        self.backend.bump_version()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': type(self.backend).__name__,
+                'version': self.backend.version(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'render_ms': round(self.render_ms, 2),
+                'saved_ms': round(self.saved_ms, 2),
+            }
+
+
+_cache = ProcessLocal()
+
+
+def _create_render_cache(config):
+    if config['RENDER_CACHE_BACKEND'] == 'sqlite':
+        backend = SQLiteBackend(config['RENDER_CACHE_PATH'], config['RENDER_CACHE_SIZE'])
+    else:
+        backend = MemoryBackend(config['RENDER_CACHE_SIZE'])
+    return RenderCache(backend, config['RENDER_CACHE_TTL'])
+
+
+def get_render_cache():
+    """Returns this process's render cache, or None when RENDER_CACHE_BACKEND is 'none'."""
+    config = current_app.config
+    if config['RENDER_CACHE_BACKEND'] == 'none':
+        return None
+    return _cache.get(lambda: _create_render_cache(config))
+
+
+def invalidate_render_cache():
+    """Drops every cached page; call after committing a change to events or their seat counts."""
+    cache = get_render_cache()
+    if cache is not None:
+        cache.invalidate()
+
+
+def render_cache_stats():
+    """Returns hit/miss counters and render time saved by this worker's render cache."""
+    cache = get_render_cache()
+    if cache is None:
+        return {'enabled': False}
+    return dict(cache.stats(), enabled=True, ttl=cache.ttl)
+
+
+def cache_variant(shared_roles):
+    """
+    Returns the cache variant of the current visitor, or None if their page must be rendered.
+    Logged-in users share a variant per role only when the view's output does not depend on
+    who they are (shared_roles) and the role is enabled in RENDER_CACHE_ROLES.
+    """
+    # A pending flash message is shown once and must neither be cached nor hidden
+    if '_flashes' in session:
+        return None
+    if not current_user.is_authenticated:
+        return 'anonymous'
+    if current_user.role in shared_roles and current_user.role in current_app.config['RENDER_CACHE_ROLES']:
+        return current_user.role
+    return None
+
+
+def cached_page(shared_roles=()):
+    """
+    Serves a GET view from the render cache when the visitor allows it.
+    :param shared_roles: Roles whose users all see the same output of the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_render_cache()
+            variant = cache_variant(shared_roles) if cache is not None and request.method == 'GET' else None
+            if variant is None:
+                return view(*args, **kwargs)
+
+            key = cache.key(variant)
+            body = cache.get(key)
+            if body is not None:
+                return body, {'X-Render-Cache': 'hit'}
+
+            started = time.perf_counter()
+            rv = view(*args, **kwargs)
+            if isinstance(rv, str):
+                cache.set(key, rv, (time.perf_counter() - started) * 1000)
+                return rv, {'X-Render-Cache': 'miss'}
+            return rv
+        return wrapper
+    return decorator
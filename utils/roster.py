@@ -0,0 +1,155 @@
+# eventhive/utils/roster.py
+
+import threading
+from flask import current_app
+from sqlalchemy import tuple_
+from models.models import db, User, Event, registrations
+from utils.qr_utils import LRUCache
+from utils.process_local import ProcessLocal
+
+
+class EventRoster:
+    """The registered users (and who has checked in) of one event, as seen by this worker."""
+
+    def __init__(self, event_id, title, users=None, attended=None):
+        self.event_id = event_id
+        self.title = title
+        self.users = users or {}
+        self.attended = attended or set()
+        self.lock = threading.Lock()
+
+    def add(self, user_id, username, attended=False):
+        with self.lock:
+            self.users[user_id] = username
+            if attended:
+                self.attended.add(user_id)
+
+    def remove(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+            self.attended.discard(user_id)
+
+    def mark_attended(self, user_id):
+        with self.lock:
+            self.attended.add(user_id)
+
+
+class RosterCache:
+    """
+    An LRU of event rosters so a valid scan can be accepted without read queries.
+
+    Each worker keeps its own copy. A roster may therefore lag behind
+    registrations handled by other workers, so callers treat it as a hint:
+    a user missing from it is looked up once in the database, and the
+    guarded attendance UPDATE is what finally proves a registration exists.
+    """
+
+    def __init__(self, maxsize):
+        self._rosters = LRUCache(maxsize)
+
+    def get(self, event_id):
+        """Returns the roster of an event, loading it on a miss, or None if the event does not exist."""
+        roster = self._rosters.get(event_id)
+        if roster is None:
+            rosters = self.warm([event_id])
+            roster = rosters.get(event_id)
+        return roster
+
+    def get_many(self, event_ids):
+        """Returns the rosters of several events, loading the missing ones together; unknown events are left out."""
+        rosters = {}
+        for event_id in event_ids:
+            roster = self._rosters.get(event_id)
+            if roster is not None:
+                rosters[event_id] = roster
+        rosters.update(self.warm(set(event_ids) - set(rosters)))
+        return rosters
+
+    def warm(self, event_ids):
+        """Loads the rosters of several events with two queries and caches them."""
+        event_ids = list(event_ids)
+        if not event_ids:
+            return {}
+
+        rosters = {
+            event_id: EventRoster(event_id, title)
+            for event_id, title in db.session.query(Event.id, Event.title).filter(Event.id.in_(event_ids))
+        }
+        if not rosters:
+            return rosters
+        # Only events found above: soft-deleted ones keep their registrations until purged
+        rows = (
+            db.session.query(registrations.c.event_id, registrations.c.user_id,
+                             User.username, registrations.c.attended)
+            .join(User, User.id == registrations.c.user_id)
+            .filter(registrations.c.event_id.in_(list(rosters)))
+        )
+        for event_id, user_id, username, attended in rows:
+            rosters[event_id].add(user_id, username, attended)
+
+        for event_id, roster in rosters.items():
+            self._rosters.set(event_id, roster)
+        return rosters
+
+    def lookup(self, pairs, rosters):
+        """
+        Returns the usernames of the registered users among (user_id, event_id) pairs.
+        Pairs missing from the cached rosters are checked against the database
+        together, with one query.
+        :param rosters: The roster of each pair's event.
+        :return: A dict mapping each registered pair to its username.
+        """
+        usernames = {}
+        missing = []
+        for pair in pairs:
+            username = rosters[pair[1]].users.get(pair[0])
+            if username is None:
+                missing.append(pair)
+            else:
+                usernames[pair] = username
+        if not missing:
+            return usernames
+
+        rows = (
+            db.session.query(registrations.c.user_id, registrations.c.event_id,
+                             User.username, registrations.c.attended)
+            .join(User, User.id == registrations.c.user_id)
+            .filter(tuple_(registrations.c.user_id, registrations.c.event_id).in_(missing))
+        )
+        for user_id, event_id, username, attended in rows:
+            rosters[event_id].add(user_id, username, attended)
+            usernames[(user_id, event_id)] = username
+        return usernames
+
+    def admit(self, user_id, event_id, username):
+        """Adds a new registration to the event's roster if that roster is cached."""
+        roster = self._rosters.get(event_id)
+        if roster is not None:
+            roster.add(user_id, username)
+
+    def discard(self, user_id, event_id):
+        """Drops a registration from the event's roster if that roster is cached."""
+        roster = self._rosters.get(event_id)
+        if roster is not None:
+            roster.remove(user_id)
+
+    def rename(self, event_id, title):
+        """Updates the event title of a cached roster."""
+        roster = self._rosters.get(event_id)
+        if roster is not None:
+            roster.title = title
+
+    def invalidate(self, event_id=None):
+        """Drops one event's roster, or every roster when no event is given."""
+        if event_id is None:
+            self._rosters.clear()
+        else:
+            self._rosters.pop(event_id)
+
+
+_cache = ProcessLocal()
+
+
+def get_roster_cache():
+    """Returns this process's roster cache, creating it from the app config on first use."""
+    return _cache.get(lambda: RosterCache(current_app.config['ROSTER_CACHE_SIZE']))
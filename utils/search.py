@@ -0,0 +1,122 @@
+# eventhive/utils/search.py
+
+import re
+from sqlalchemy import event as sa_event, func
+from models.models import db, Event, EventStats
+
+# The inverted indexes themselves live in the database and are created by migration
+# 7f3b9e2d4c18. SQLite uses an external-content FTS5 table kept in sync by triggers;
+# PostgreSQL a generated tsvector column with a GIN index. create_all() builds the
+# same objects through the listener below, for databases set up without Alembic.
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5("
+    "title, description, location, content='event', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN "
+    "INSERT INTO event_fts (rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN "
+    "INSERT INTO event_fts (event_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); END",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_au AFTER UPDATE OF title, description, location ON event BEGIN "
+    "INSERT INTO event_fts (event_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); "
+    "INSERT INTO event_fts (rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+    "INSERT INTO event_fts (event_fts) VALUES ('rebuild')",
+]
+POSTGRES_DDL = [
+    "ALTER TABLE event ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_event_search_vector ON event USING GIN (search_vector)",
+]
+
+# Column weights for SQLite's bm25(), in FTS column order: title, description, location
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+@sa_event.listens_for(Event.__table__, 'after_create')
+def create_search_index(target, connection, **kw):
+    ddl = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in ddl:
+        connection.exec_driver_sql(statement)
+
+
+def search_terms(text):
+    """Splits user input into plain search terms, dropping any query-syntax characters."""
+    return _TERM.findall(text or '')[:16]
+
+
+def _match(terms, prefix, title_only):
+    """Returns the match condition and an ascending rank (best first) for the given terms."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        phrases = ['"{}"'.format(term) for term in terms]
+        if prefix:
+            phrases[-1] += '*'
+        expression = ' '.join(phrases)
+        if title_only:
+            expression = f"title : ({expression})"
+        fts = db.literal_column('event_fts')
+        return fts.op('MATCH')(expression), func.bm25(fts, *BM25_WEIGHTS)
+
+    if dialect == 'postgresql':
+        suffix = ':A' if title_only else ''
+        lexemes = [f"'{term}'{suffix}" for term in terms]
+        if prefix:
+            lexemes[-1] = f"'{terms[-1]}':*{'A' if title_only else ''}"
+        query = func.to_tsquery('english', ' & '.join(lexemes))
+        vector = db.literal_column('event.search_vector')
+        return vector.op('@@')(query), -func.ts_rank_cd(vector, query)
+
+    # Other databases fall back to an unindexed scan
+    conditions = [
+        db.or_(*(column.ilike(f'%{term}%') for column in (Event.title, Event.description, Event.location)))
+        for term in terms
+    ]
+    return db.and_(*conditions), db.literal(0.0)
+
+
+def _from_clause(query):
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return query.join(db.table('event_fts', db.column('rowid')),
+                          db.literal_column('event_fts.rowid') == Event.id)
+    return query
+
+
+def search_events_query(text):
+    """
+    Builds the ranked search over event titles, descriptions and locations.
+    :return: A query over the ranked rows, which look like those of events_list plus a
+        'rank' (lower is better), and the subquery itself to paginate on;
+        or (None, None) when the text holds no search terms.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None, None
+    condition, rank = _match(terms, prefix=True, title_only=False)
+    ranked = _from_clause(db.session.query(
+        Event.id,
+        Event.title,
+        Event.location,
+        Event.event_date,
+        Event.capacity,
+        func.substr(Event.description, 1, 101).label('description'),
+        func.coalesce(EventStats.registered_count, 0).label('registered_count'),
+        db.cast(rank, db.Float).label('rank'),
+    ).select_from(Event).outerjoin(EventStats, EventStats.event_id == Event.id)).filter(condition).subquery()
+    return db.session.query(ranked), ranked
+
+
+def autocomplete_titles(text, limit):
+    """Returns up to limit (id, title) pairs whose title words start with the typed terms."""
+    terms = search_terms(text)
+    if not terms:
+        return []
+    condition, rank = _match(terms, prefix=True, title_only=True)
+    rows = _from_clause(db.session.query(Event.id, Event.title)).filter(condition).order_by(rank, Event.id).limit(limit)
+    return [{'id': row.id, 'title': row.title} for row in rows]
@@ -0,0 +1,106 @@
+# eventhive/utils/user_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy.orm import make_transient_to_detached
+from models.models import db, User
+from utils.process_local import ProcessLocal
+
+
+class TTLCache:
+    """A thread-safe LRU cache whose entries also expire after a fixed number of seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_cache = ProcessLocal()
+
+
+def get_user_cache():
+    """Returns this process's user cache, or None when USER_CACHE_TTL is 0."""
+    ttl = current_app.config['USER_CACHE_TTL']
+    if ttl <= 0:
+        return None
+    return _cache.get(lambda: TTLCache(current_app.config['USER_CACHE_SIZE'], ttl))
+
+
+def load_cached_user(user_id):
+    """
+    Loads the user for Flask-Login, answering from the per-worker cache when possible.
+
+    Cache hits return a detached User carrying only id, username, email and role,
+    so no query is issued. Each worker caches independently: a deleted user or
+    changed role is dropped at once in the worker that made the change
+    (see invalidate_user) and within USER_CACHE_TTL seconds everywhere else.
+    """
+    cache = get_user_cache()
+    if cache is None:
+        return db.session.get(User, user_id)
+
+    record = cache.get(user_id)
+    if record is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            cache.set(user_id, (user.id, user.username, user.email, user.role))
+        return user
+
+    user_id, username, email, role = record
+    user = User(id=user_id, username=username, email=email, role=role)
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_user(user_id):
+    """Drops a user's cached identity, e.g. after deleting them or changing their role."""
+    cache = get_user_cache()
+    if cache is not None:
+        cache.pop(user_id)
+
+
+def user_cache_stats():
+    """Returns hit/miss counters of this worker's user cache."""
+    cache = get_user_cache()
+    if cache is None:
+        return {'enabled': False}
+    return dict(cache.stats(), enabled=True, ttl=cache.ttl)